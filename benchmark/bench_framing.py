@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Throughput of the framers in serial_asyncio.framing against StreamReader.
+
+The received data is fed straight into the protocols, one chunk per
+event loop iteration, so only the cost of framing is measured. Frames
+are consumed with ``async for`` from the framers, and with readuntil()
+or readexactly() from an asyncio.StreamReader, the way
+open_serial_connection() users read framed traffic.
+
+  $ python benchmark/bench_framing.py [FRAME_COUNT]
+"""
+import asyncio
+import os
+import sys
+import time
+
+# Run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from serial_asyncio import framing
+
+
+async def feed_chunks(protocol_feed, protocol_end, data, chunk_size):
+    for i in range(0, len(data), chunk_size):
+        protocol_feed(data[i:i + chunk_size])
+        await asyncio.sleep(0)
+    protocol_end()
+
+
+async def run_stream_reader(data, chunk_size, read):
+    reader = asyncio.StreamReader(limit=2 ** 24)
+    feeder = asyncio.ensure_future(feed_chunks(reader.feed_data, reader.feed_eof, data, chunk_size))
+    count = 0
+    try:
+        while True:
+            await read(reader)
+            count += 1
+    except asyncio.IncompleteReadError:
+        pass
+    await feeder
+    return count
+
+
+async def run_framer(data, chunk_size, framer):
+    feeder = asyncio.ensure_future(feed_chunks(
+        framer.data_received, lambda: framer.connection_lost(None), data, chunk_size))
+    count = 0
+    async for _ in framer:
+        count += 1
+    await feeder
+    return count
+
+
+def measure(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        start = time.perf_counter()
+        count = loop.run_until_complete(coroutine)
+        return count, time.perf_counter() - start
+    finally:
+        loop.close()
+
+
+def report(name, data, count, elapsed):
+    print('{:<64} {:>10.0f} {:>10.1f}'.format(name, count / elapsed, len(data) / elapsed / 1e6))
+
+
+async def read_line(reader):
+    return await reader.readuntil(b'\n')
+
+
+async def read_prefixed(reader):
+    length = int.from_bytes(await reader.readexactly(2), 'big')
+    return await reader.readexactly(length)
+
+
+def main(frame_count=100000):
+    print('{:<64} {:>10} {:>10}'.format('', 'frames/s', 'MB/s'))
+    for frame_size, chunk_size in ((32, 4096), (32, 16), (4096, 64)):
+        count = frame_count if frame_size < 1024 else frame_count // 100
+        payload = b'x' * (frame_size - 1)
+        lines = (payload + b'\n') * count
+        label = '{} byte frames in {} byte chunks'.format(frame_size, chunk_size)
+        report('lines, StreamReader.readuntil(), ' + label, lines,
+               *measure(run_stream_reader(lines, chunk_size, read_line)))
+        report('lines, LineFramer, ' + label, lines,
+               *measure(run_framer(lines, chunk_size, framing.LineFramer())))
+
+        prefixed = framing.LengthPrefixFramer().encode(payload) * count
+        report('prefixed, StreamReader.readexactly(), ' + label, prefixed,
+               *measure(run_stream_reader(prefixed, chunk_size, read_prefixed)))
+        report('prefixed, LengthPrefixFramer, ' + label, prefixed,
+               *measure(run_framer(prefixed, chunk_size, framing.LengthPrefixFramer())))
+
+        binary = bytes(range(256)) * (frame_size // 256) + bytes(range(frame_size % 256))
+        slip = framing.SlipFramer.encode(binary) * count
+        report('SlipFramer, ' + label, slip, *measure(run_framer(slip, chunk_size, framing.SlipFramer())))
+        cobs = framing.CobsFramer.encode(binary) * count
+        report('CobsFramer, ' + label, cobs, *measure(run_framer(cobs, chunk_size, framing.CobsFramer())))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Benchmark the CPU cost of polled ports.
+
+Opens 1, 50 and 200 loop:// ports, which have no file descriptor and are
+therefore polled, and measures the CPU time used by the process while
+the ports are idle, and while one of them echoes a message every
+millisecond.
+
+Each case runs with the shared poll scheduler, and as a baseline with
+one timer per port and direction, as polled ports were scheduled before.
+
+  $ python benchmark/bench_polling.py [SECONDS]
+"""
+import asyncio
+import os
+import sys
+import time
+
+# Run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serial_asyncio
+
+PORT_COUNTS = (1, 50, 200)
+
+
+class PerPortTimers:
+    """Polls every transport with its own call_later() handles.
+
+    A stand-in for the shared _PollScheduler, with the same interface.
+    """
+
+    def __init__(self, loop):
+        self._loop = loop
+        self._readers = {}
+        self._writers = {}
+        self.ticks = 0
+        self.polls = 0
+
+    def add_reader(self, transport, delay):
+        self.remove_reader(transport)
+        self._readers[transport] = self._loop.call_later(delay, self._poll_read, transport)
+
+    def remove_reader(self, transport):
+        handle = self._readers.pop(transport, None)
+        if handle is not None:
+            handle.cancel()
+
+    def add_writer(self, transport):
+        if transport not in self._writers:
+            self._writers[transport] = self._loop.call_soon(self._poll_write, transport)
+
+    def remove_writer(self, transport):
+        handle = self._writers.pop(transport, None)
+        if handle is not None:
+            handle.cancel()
+
+    def _poll_read(self, transport):
+        del self._readers[transport]
+        self.ticks += 1
+        self.polls += 1
+        delay = transport._poll_read()
+        if delay is not None and transport._has_reader and transport not in self._readers:
+            self.add_reader(transport, delay)
+
+    def _poll_write(self, transport):
+        self.ticks += 1
+        self.polls += 1
+        self._writers[transport] = self._loop.call_later(transport._poll_wait_time, self._poll_write, transport)
+        transport._poll_write()
+
+
+SCHEDULERS = (
+    ('shared', serial_asyncio._PollScheduler),
+    ('per-port', PerPortTimers),
+)
+
+
+class Counter(asyncio.Protocol):
+
+    def __init__(self):
+        self.received = 0
+
+    def data_received(self, data):
+        self.received += len(data)
+
+
+async def measure(scheduler_class, ports, seconds, busy):
+    loop = asyncio.get_running_loop()
+    # the ports opened next pick up this scheduler
+    scheduler = serial_asyncio._poll_schedulers[loop] = scheduler_class(loop)
+    connections = [await serial_asyncio.create_serial_connection(loop, Counter, 'loop://')
+                   for _ in range(ports)]
+    # let the ports settle to their idle poll interval
+    await asyncio.sleep(0.2)
+
+    ticks, polls = scheduler.ticks, scheduler.polls
+    cpu = time.process_time()
+    start = loop.time()
+    if busy:
+        transport, protocol = connections[0]
+        while loop.time() - start < seconds:
+            transport.write(b'ping')
+            await asyncio.sleep(0.001)
+    else:
+        await asyncio.sleep(seconds)
+    elapsed = loop.time() - start
+    cpu = time.process_time() - cpu
+    result = {
+        'ports': ports,
+        'busy': busy,
+        'cpu_percent': 100.0 * cpu / elapsed,
+        'ticks_per_second': (scheduler.ticks - ticks) / elapsed,
+        'polls_per_second': (scheduler.polls - polls) / elapsed,
+    }
+    for transport, _ in connections:
+        transport.close()
+    await asyncio.sleep(0.1)
+    return result
+
+
+async def main(seconds=2.0):
+    print('{:>9} {:>6} {:>6} {:>8} {:>12} {:>12}'.format('scheduler', 'ports', 'busy', 'cpu %', 'ticks/s',
+                                                         'polls/s'))
+    for busy in (False, True):
+        for ports in PORT_COUNTS:
+            for name, scheduler_class in SCHEDULERS:
+                result = await measure(scheduler_class, ports, seconds, busy)
+                print('{name:>9} {ports:>6} {busy!s:>6} {cpu_percent:>8.1f} {ticks_per_second:>12.0f} '
+                      '{polls_per_second:>12.0f}'.format(name=name, **result))
+
+
+if __name__ == '__main__':
+    asyncio.run(main(*map(float, sys.argv[1:])))
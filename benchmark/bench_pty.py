@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Throughput and latency benchmarks of pySerial-asyncio on pseudo terminals.
+
+Every benchmark opens os.openpty() pairs: the transport under test uses
+the slave side, the benchmark drives the master side from the same event
+loop. Measured are
+
+- round trip latency percentiles of SerialTransport against an echo peer
+- sustained write and read throughput for several chunk sizes
+- round trip latency through open_serial_connection() streams
+- the cost of read_with_timeout() for 64 KiB
+- aggregate round trips per second with many concurrent ports
+
+on the default event loop and on uvloop when it is installed. Results
+are written as JSON, so they can be compared between releases.
+
+  $ python benchmark/bench_pty.py [--quick] [--ports N] [--output FILE]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tty
+
+# Run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serial
+
+import serial_asyncio
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+class PtyPeer:
+    """The master side of a pty pair, either echoing or discarding data."""
+
+    def __init__(self, loop, echo=False):
+        self.loop = loop
+        self.echo = echo
+        self.received = 0
+        self.fd, slave = os.openpty()
+        tty.setraw(self.fd)
+        tty.setraw(slave)
+        self.device = os.ttyname(slave)
+        os.close(slave)
+        os.set_blocking(self.fd, False)
+        self._pending = bytearray()
+        loop.add_reader(self.fd, self._read_ready)
+
+    def _read_ready(self):
+        try:
+            data = os.read(self.fd, 65536)
+        except (BlockingIOError, OSError):
+            return
+        self.received += len(data)
+        if self.echo:
+            self._pending += data
+            self._flush()
+
+    def _flush(self):
+        try:
+            n = os.write(self.fd, self._pending)
+        except BlockingIOError:
+            n = 0
+        del self._pending[:n]
+        if self._pending:
+            self.loop.call_soon(self._flush)
+
+    def close(self):
+        self.loop.remove_reader(self.fd)
+        os.close(self.fd)
+
+
+class Collector(asyncio.Protocol):
+    """Protocol resolving a future once an expected amount of data arrived."""
+
+    def __init__(self):
+        self.transport = None
+        self.received = 0
+        self.expected = 0
+        self.waiter = None
+        self.can_write = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        self.received += len(data)
+        if self.waiter is not None and self.received >= self.expected and not self.waiter.done():
+            self.waiter.set_result(None)
+
+    def expect(self, n):
+        self.expected = self.received + n
+        self.waiter = asyncio.get_event_loop().create_future()
+        return self.waiter
+
+    def pause_writing(self):
+        self.can_write = asyncio.get_event_loop().create_future()
+
+    def resume_writing(self):
+        if self.can_write is not None:
+            self.can_write.set_result(None)
+            self.can_write = None
+
+
+async def open_pair(loop, echo=False):
+    peer = PtyPeer(loop, echo=echo)
+    port = serial.serial_for_url(peer.device)
+    transport, protocol = await serial_asyncio.connection_for_serial(loop, Collector, port)
+    await asyncio.sleep(0)
+    return peer, transport, protocol
+
+
+async def close_pair(peer, transport):
+    transport.abort()
+    await asyncio.sleep(0.001)
+    peer.close()
+
+
+def percentiles(samples):
+    """Summarize latency samples, in microseconds."""
+    samples = sorted(samples)
+
+    def pick(fraction):
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))] * 1e6
+
+    return {
+        'samples': len(samples),
+        'mean_us': statistics.mean(samples) * 1e6,
+        'p50_us': pick(0.50),
+        'p90_us': pick(0.90),
+        'p99_us': pick(0.99),
+        'max_us': samples[-1] * 1e6,
+    }
+
+
+async def bench_latency(loop, rounds, size=16):
+    peer, transport, protocol = await open_pair(loop, echo=True)
+    message = b'x' * size
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        waiter = protocol.expect(size)
+        transport.write(message)
+        await waiter
+        samples.append(time.perf_counter() - start)
+    await close_pair(peer, transport)
+    return dict(percentiles(samples), message_size=size)
+
+
+async def bench_write_throughput(loop, total, chunk_size):
+    peer, transport, protocol = await open_pair(loop)
+    chunk = b'w' * chunk_size
+    start = time.perf_counter()
+    for _ in range(total // chunk_size):
+        if protocol.can_write is not None:
+            await protocol.can_write
+        transport.write(chunk)
+    while peer.received < total // chunk_size * chunk_size:
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+    await close_pair(peer, transport)
+    return {'chunk_size': chunk_size, 'bytes': peer.received, 'mb_per_s': peer.received / elapsed / 1e6}
+
+
+async def bench_read_throughput(loop, total, chunk_size):
+    peer, transport, protocol = await open_pair(loop)
+    chunk = b'r' * chunk_size
+    count = total // chunk_size
+    waiter = protocol.expect(count * chunk_size)
+    start = time.perf_counter()
+    for _ in range(count):
+        view = memoryview(chunk)
+        while view:
+            try:
+                view = view[os.write(peer.fd, view):]
+            except BlockingIOError:
+                await asyncio.sleep(0)
+    await waiter
+    elapsed = time.perf_counter() - start
+    calls = transport.get_extra_info('stats').read_calls
+    await close_pair(peer, transport)
+    return {'chunk_size': chunk_size, 'bytes': count * chunk_size,
+            'mb_per_s': count * chunk_size / elapsed / 1e6, 'read_calls': calls}
+
+
+async def bench_streams(loop, rounds, size=16):
+    peer = PtyPeer(loop, echo=True)
+    reader, writer = await serial_asyncio.open_serial_connection(loop=loop, url=peer.device)
+    message = b's' * size
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        writer.write(message)
+        await reader.readexactly(size)
+        samples.append(time.perf_counter() - start)
+    writer.transport.abort()
+    await asyncio.sleep(0.001)
+    peer.close()
+    return dict(percentiles(samples), message_size=size)
+
+
+async def bench_read_with_timeout(loop, rounds, size=64 * 1024):
+    peer = PtyPeer(loop)
+    reader, writer = await serial_asyncio.open_serial_connection(loop=loop, url=peer.device, limit=2 * size)
+    payload = b't' * size
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        writer_task = loop.create_task(_write_all(peer.fd, payload))
+        data = await serial_asyncio.read_with_timeout(reader, size, 5.0)
+        samples.append(time.perf_counter() - start)
+        await writer_task
+        assert len(data) == size, len(data)
+    writer.transport.abort()
+    await asyncio.sleep(0.001)
+    peer.close()
+    return dict(percentiles(samples), read_size=size,
+                mb_per_s=size / statistics.mean(samples) / 1e6)
+
+
+async def _write_all(fd, data):
+    view = memoryview(data)
+    while view:
+        try:
+            view = view[os.write(fd, view):]
+        except BlockingIOError:
+            await asyncio.sleep(0)
+
+
+async def bench_many_ports(loop, ports, rounds):
+    pairs = [await open_pair(loop, echo=True) for _ in range(ports)]
+
+    async def ping(transport, protocol):
+        for _ in range(rounds):
+            waiter = protocol.expect(8)
+            transport.write(b'p' * 8)
+            await waiter
+
+    start = time.perf_counter()
+    await asyncio.gather(*(ping(transport, protocol) for _, transport, protocol in pairs))
+    elapsed = time.perf_counter() - start
+    for peer, transport, _ in pairs:
+        await close_pair(peer, transport)
+    return {'ports': ports, 'round_trips': ports * rounds, 'round_trips_per_s': ports * rounds / elapsed}
+
+
+async def run_all(quick, ports):
+    loop = asyncio.get_event_loop()
+    rounds = 200 if quick else 2000
+    total = (1 if quick else 8) * 1024 * 1024
+    results = {
+        'latency': await bench_latency(loop, rounds),
+        'write_throughput': [await bench_write_throughput(loop, total, size) for size in (16, 256, 4096, 65536)],
+        'read_throughput': [await bench_read_throughput(loop, total, size) for size in (16, 256, 4096, 65536)],
+        'streams_latency': await bench_streams(loop, rounds),
+        'read_with_timeout': await bench_read_with_timeout(loop, 10 if quick else 50),
+        'many_ports': [await bench_many_ports(loop, n, 10 if quick else 100) for n in sorted({1, 10, ports})],
+    }
+    return results
+
+
+def run(loop_name, quick, ports):
+    if loop_name == 'uvloop':
+        loop = uvloop.new_event_loop()
+    else:
+        loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(run_all(quick, ports))
+    finally:
+        loop.close()
+        asyncio.set_event_loop(None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help='fewer rounds and less data')
+    parser.add_argument('--ports', type=int, default=200, help='number of ports for the scaling benchmark')
+    parser.add_argument('--output', '-o', help='write the JSON results to this file instead of stdout')
+    args = parser.parse_args()
+
+    report = {
+        'pyserial_asyncio': serial_asyncio.__version__,
+        'pyserial': serial.VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.time(),
+        'quick': args.quick,
+        'loops': {},
+    }
+    report['loops']['asyncio'] = run('asyncio', args.quick, args.ports)
+    if uvloop is not None:
+        report['loops']['uvloop'] = run('uvloop', args.quick, args.ports)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Microbenchmark for SerialTransport.write() against a backed-up write queue.
+
+A pseudo terminal pair stands in for the serial port. The event loop is
+not run while writing, so nothing is drained and the queue keeps
+growing. The cost per write() call is reported for increasing queue
+depths; it should stay flat.
+
+  $ python benchmark/bench_write_buffer.py [CHUNK_SIZE]
+"""
+import asyncio
+import os
+import sys
+import time
+import tty
+
+# Run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serial
+
+import serial_asyncio
+
+DEPTHS = (0, 1000, 10000, 50000, 100000)
+BATCH = 1000
+
+
+def main(chunk_size=16):
+    master, slave = os.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    loop = asyncio.new_event_loop()
+    port = serial.serial_for_url(os.ttyname(slave))
+    transport = serial_asyncio.SerialTransport(loop, asyncio.Protocol(), port)
+    transport.set_write_buffer_limits(high=2 ** 62)
+    chunk = b'x' * chunk_size
+
+    print('chunk size: {} bytes'.format(chunk_size))
+    print('{:>12} {:>16} {:>14}'.format('queued', 'buffered bytes', 'ns/write()'))
+    for depth in DEPTHS:
+        while len(transport._write_buffer) < depth:
+            transport.write(chunk)
+        start = time.perf_counter_ns()
+        for _ in range(BATCH):
+            transport.write(chunk)
+        elapsed = time.perf_counter_ns() - start
+        print('{:>12} {:>16} {:>14.0f}'.format(
+            depth, transport.get_write_buffer_size(), elapsed / BATCH))
+
+    transport.abort()
+    loop.run_until_complete(asyncio.sleep(0.01))
+    loop.close()
+    os.close(master)
+    os.close(slave)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -10,26 +10,498 @@
 """\
 Support asyncio with serial ports.
 
-Posix platforms only, Python 3.5+ only.
+Posix platforms only, Python 3.8+ only.
 
 Windows event loops can not wait for serial ports with the current
 implementation. It should be possible to get that working though.
 """
 import asyncio
+import bisect
+import collections
+import heapq
+import itertools
+import math
 import os
+import socket
+import struct
+import sys
 import urllib.parse
+import weakref
 
 import serial
+from serial.urlhandler import protocol_socket
 from functools import partial
 import time
 
 try:
+    import fcntl
     import termios
 except ImportError:
-    termios = None
+    fcntl = termios = None
 
 __version__ = '0.7'
 
+# Upper bound for the number of queued chunks handed to a single writev() call.
+try:
+    _IOV_MAX = os.sysconf('SC_IOV_MAX')
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = 16
+if _IOV_MAX <= 0:
+    _IOV_MAX = 16
+
+
+# Errors of Serial.flush() to ignore when closing a hot-unplugged device
+if termios is not None:
+    _FLUSH_ERRORS = (serial.SerialException, termios.error)
+else:
+    _FLUSH_ERRORS = serial.SerialException
+
+
+def _selectable_fd(serial_instance):
+    """The file descriptor the event loop can wait on for serial_instance.
+
+    Returns None if the port has to be polled instead: on Windows and for
+    URL handlers (such as loop://) that do not expose a file descriptor.
+    """
+    if os.name == "nt":
+        return None
+    try:
+        return serial_instance.fileno()
+    except (AttributeError, OSError, ValueError):
+        # io.UnsupportedOperation derives from OSError and ValueError
+        return None
+
+
+def _has_native_io(serial_instance):
+    """True if serial_instance is one of pySerial's own POSIX port classes.
+
+    Those classes, and the socket:// ports connected by
+    create_serial_connection(), read and write the file descriptor
+    without any further processing, so the transport may access it
+    directly.
+    """
+    return (type(serial_instance).__module__ == serial.Serial.__module__
+            or type(serial_instance) is _SocketSerial)
+
+
+class FixedReadStrategy:
+    """Read strategy asking for the same number of bytes on every read.
+
+    Read strategies decide how many bytes SerialTransport requests from
+    the port whenever it becomes readable, and count the reads made so
+    the choice can be tuned per port.
+    """
+
+    default_max_read_size = 1024
+
+    def __init__(self, max_read_size=None):
+        if max_read_size is None:
+            max_read_size = self.default_max_read_size
+        if max_read_size <= 0:
+            raise ValueError('max_read_size must be > 0, not {!r}'.format(max_read_size))
+        self.max_read_size = max_read_size
+        self.reads = 0
+        self.bytes_requested = 0
+        self.bytes_read = 0
+        self._started = time.monotonic()
+
+    def read_size(self, serial_instance):
+        """The number of bytes to request for the next read."""
+        return self.max_read_size
+
+    def update(self, requested, received):
+        """Account a read of `received` bytes out of `requested`."""
+        self.reads += 1
+        self.bytes_requested += requested
+        self.bytes_read += received
+
+    @property
+    def average_fill(self):
+        """Average fraction of the requested size that reads returned."""
+        if not self.bytes_requested:
+            return 0.0
+        return self.bytes_read / self.bytes_requested
+
+    @property
+    def reads_per_second(self):
+        """Average number of reads per second since the strategy was created."""
+        elapsed = time.monotonic() - self._started
+        if elapsed <= 0:
+            return 0.0
+        return self.reads / elapsed
+
+    def __repr__(self):
+        return '{self.__class__.__name__}(max_read_size={self.max_read_size})'.format(self=self)
+
+
+class InWaitingReadStrategy(FixedReadStrategy):
+    """Read strategy asking for what the driver reports as in_waiting.
+
+    This costs an additional ioctl per read, but every read returns
+    everything that arrived, up to max_read_size.
+    """
+
+    default_max_read_size = 64 * 1024
+
+    def read_size(self, serial_instance):
+        return max(1, min(serial_instance.in_waiting, self.max_read_size))
+
+
+class AdaptiveReadStrategy(FixedReadStrategy):
+    """Read strategy adapting the read size to the observed fill ratio.
+
+    The read size doubles whenever a read fills the whole request and
+    halves after `shrink_after` consecutive reads that filled less than
+    a quarter of it, staying between min_read_size and max_read_size.
+    """
+
+    default_max_read_size = 64 * 1024
+
+    def __init__(self, max_read_size=None, min_read_size=64, shrink_after=8):
+        super().__init__(max_read_size)
+        if not 0 < min_read_size <= self.max_read_size:
+            raise ValueError('min_read_size must be > 0 and <= max_read_size')
+        self.min_read_size = min_read_size
+        self.shrink_after = shrink_after
+        self.current_read_size = max(min_read_size, min(1024, self.max_read_size))
+        self._underfilled = 0
+
+    def read_size(self, serial_instance):
+        return self.current_read_size
+
+    def update(self, requested, received):
+        super().update(requested, received)
+        if received >= requested:
+            self._underfilled = 0
+            self.current_read_size = min(self.current_read_size * 2, self.max_read_size)
+        elif received * 4 < requested:
+            self._underfilled += 1
+            if self._underfilled >= self.shrink_after:
+                self._underfilled = 0
+                self.current_read_size = max(self.current_read_size // 2, self.min_read_size)
+        else:
+            self._underfilled = 0
+
+
+_READ_STRATEGIES = {
+    'fixed': FixedReadStrategy,
+    'in_waiting': InWaitingReadStrategy,
+    'adaptive': AdaptiveReadStrategy,
+}
+
+
+def _make_read_strategy(read_strategy, max_read_size):
+    """Build a read strategy from a name, or pass an instance through."""
+    if read_strategy is None:
+        read_strategy = 'fixed'
+    if isinstance(read_strategy, str):
+        try:
+            factory = _READ_STRATEGIES[read_strategy]
+        except KeyError:
+            raise ValueError('unknown read_strategy {!r}, expected one of {}'.format(
+                read_strategy, ', '.join(sorted(_READ_STRATEGIES))))
+        return factory(max_read_size)
+    if max_read_size is not None:
+        raise ValueError('max_read_size can not be combined with a read strategy instance')
+    return read_strategy
+
+
+class WritePacer:
+    """Limits how fast SerialTransport hands data to the driver.
+
+    Without pacing the transport writes whatever the driver accepts,
+    and adapters with large driver buffers then delay data written
+    later, which could otherwise still be reprioritized or flushed in
+    the transport's write buffer. Two limits are available:
+
+    max_out_waiting caps the bytes queued in the driver, as reported
+    by Serial.out_waiting.
+
+    rate limits the data rate through a token bucket, in bytes per
+    second, holding up to burst bytes. rate="baudrate" derives it from
+    the current port settings.
+    """
+
+    def __init__(self, max_out_waiting=None, rate=None, burst=None):
+        if max_out_waiting is not None and max_out_waiting <= 0:
+            raise ValueError('max_out_waiting must be > 0, not {!r}'.format(max_out_waiting))
+        if rate is not None and rate != 'baudrate' and rate <= 0:
+            raise ValueError('rate must be > 0 or "baudrate", not {!r}'.format(rate))
+        self.max_out_waiting = max_out_waiting
+        self.rate = rate
+        self.burst = burst
+        self._tokens = None
+        self._updated = None
+
+    def _bucket(self, serial_instance):
+        """Refill the token bucket, returns (rate, burst) in bytes."""
+        if self.rate == 'baudrate':
+            rate = 1 / _character_time(serial_instance)
+        else:
+            rate = self.rate
+        burst = self.burst if self.burst is not None else max(1, int(rate * 0.01))
+        now = time.monotonic()
+        if self._tokens is None:
+            self._tokens = burst
+        else:
+            self._tokens = min(burst, self._tokens + (now - self._updated) * rate)
+        self._updated = now
+        return rate, burst
+
+    def allowance(self, serial_instance):
+        """The number of bytes that may be written now."""
+        allowed = None
+        if self.max_out_waiting is not None:
+            allowed = max(0, self.max_out_waiting - serial_instance.out_waiting)
+        if self.rate is not None:
+            self._bucket(serial_instance)
+            tokens = int(self._tokens)
+            allowed = tokens if allowed is None else min(allowed, tokens)
+        return allowed
+
+    def delay(self, serial_instance):
+        """Seconds to wait before more bytes may be written."""
+        delay = 0.0
+        if self.max_out_waiting is not None:
+            excess = serial_instance.out_waiting - self.max_out_waiting + 1
+            if excess > 0:
+                delay = excess * _character_time(serial_instance)
+        if self.rate is not None:
+            rate, _ = self._bucket(serial_instance)
+            if self._tokens < 1:
+                delay = max(delay, (1 - self._tokens) / rate)
+        return delay
+
+    def consumed(self, n):
+        """Account n bytes written."""
+        if self.rate is not None and self._tokens is not None:
+            self._tokens -= n
+
+    def __repr__(self):
+        return '{self.__class__.__name__}(max_out_waiting={self.max_out_waiting!r}, ' \
+               'rate={self.rate!r}, burst={self.burst!r})'.format(self=self)
+
+
+class TransportStats:
+    """Performance counters of a SerialTransport.
+
+    The counters are plain attributes updated in place by the transport,
+    cheap enough to be always on. snapshot() copies them into a dict,
+    e.g. for export to a monitoring system; as it only reads integers it
+    may also be called from another thread.
+    """
+
+    #: Upper bounds, in seconds, of the data_received() duration histogram
+    DURATION_BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 1e-1, 5e-1)
+
+    def __init__(self):
+        self.read_calls = 0
+        self.bytes_read = 0
+        self.write_calls = 0
+        self.bytes_written = 0
+        self.partial_writes = 0
+        self.eagain = 0
+        self.pause_writing = 0
+        self.resume_writing = 0
+        self.peak_write_buffer_size = 0
+        self.coalesced_writes = 0
+        self.coalesced_flushes = 0
+        # Maintained by the framers of serial_asyncio.framing
+        self.frames_received = 0
+        self.frames_dropped = 0
+        self.corrupt_frames = 0
+        self.paused_time = 0.0
+        self.paused_since = None
+        self._bucket_bounds_ns = [int(bound * 1e9) for bound in self.DURATION_BUCKETS]
+        # one counter per bucket, the last one counts durations above all bounds
+        self.data_received_buckets = [0] * (len(self.DURATION_BUCKETS) + 1)
+        self.data_received_count = 0
+        self.data_received_time = 0.0
+
+    def add_data_received_duration(self, duration_ns):
+        """Account one data_received() callback taking duration_ns."""
+        self.data_received_buckets[bisect.bisect_left(self._bucket_bounds_ns, duration_ns)] += 1
+        self.data_received_count += 1
+        self.data_received_time += duration_ns * 1e-9
+
+    def paused(self):
+        """Account the protocol being paused."""
+        self.pause_writing += 1
+        self.paused_since = time.monotonic()
+
+    def resumed(self):
+        """Account the protocol being resumed."""
+        self.resume_writing += 1
+        if self.paused_since is not None:
+            self.paused_time += time.monotonic() - self.paused_since
+            self.paused_since = None
+
+    def snapshot(self):
+        """Return a copy of all counters as a dict.
+
+        The time spent paused includes a pause still in progress. The
+        histogram is returned as cumulative counts, keyed by the upper
+        bound of each bucket with float('inf') for the last one.
+        """
+        paused_time = self.paused_time
+        paused_since = self.paused_since
+        if paused_since is not None:
+            paused_time += time.monotonic() - paused_since
+        buckets = {}
+        total = 0
+        for bound, count in zip(self.DURATION_BUCKETS + (float('inf'),), list(self.data_received_buckets)):
+            total += count
+            buckets[bound] = total
+        return {
+            'read_calls': self.read_calls,
+            'bytes_read': self.bytes_read,
+            'write_calls': self.write_calls,
+            'bytes_written': self.bytes_written,
+            'partial_writes': self.partial_writes,
+            'eagain': self.eagain,
+            'pause_writing': self.pause_writing,
+            'resume_writing': self.resume_writing,
+            'peak_write_buffer_size': self.peak_write_buffer_size,
+            'coalesced_writes': self.coalesced_writes,
+            'coalesced_flushes': self.coalesced_flushes,
+            'frames_received': self.frames_received,
+            'frames_dropped': self.frames_dropped,
+            'corrupt_frames': self.corrupt_frames,
+            'paused_time': paused_time,
+            'data_received_buckets': buckets,
+            'data_received_count': self.data_received_count,
+            'data_received_time': self.data_received_time,
+        }
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, ', '.join(
+            '{}={!r}'.format(key, value) for key, value in self.snapshot().items()
+            if key != 'data_received_buckets'))
+
+
+class _PollScheduler:
+    """Polls all transports of an event loop that have no selectable fd.
+
+    A single timer is kept per event loop, no matter how many ports are
+    polled. Each tick walks the readers that are due, in one pass, and
+    all transports with pending writes. Every reader tells how long to
+    wait before its next poll, which lets idle ports back off on their
+    own. Due times are aligned to multiples of the poll delay, so that
+    ports which backed off equally are polled in the same tick.
+
+    The loop is only referenced weakly and the transports only while
+    they are polled, so that neither is kept alive by the scheduler.
+    """
+
+    def __init__(self, loop, interval=0.0005):
+        self._loop_ref = weakref.ref(loop)
+        self._interval = interval
+        self._readers = {}  # transport -> due time
+        self._reader_heap = []  # (due time, sequence, transport), lazily pruned
+        self._writers = set()
+        self._sequence = itertools.count()
+        self._handle = None
+        self._when = None
+        self.ticks = 0
+        self.polls = 0
+
+    @property
+    def _loop(self):
+        return self._loop_ref()
+
+    def add_reader(self, transport, delay):
+        """Poll transport for input in delay seconds, replacing an earlier schedule."""
+        grid = max(delay, self._interval)
+        due = math.ceil((self._loop.time() + delay / 2) / grid) * grid
+        self._readers[transport] = due
+        heapq.heappush(self._reader_heap, (due, next(self._sequence), transport))
+        self._schedule(due)
+
+    def remove_reader(self, transport):
+        self._readers.pop(transport, None)
+        self._stop_if_idle()
+
+    def add_writer(self, transport):
+        self._writers.add(transport)
+        self._schedule(self._loop.time())
+
+    def remove_writer(self, transport):
+        self._writers.discard(transport)
+        self._stop_if_idle()
+
+    def _stop_if_idle(self):
+        """Drop the timer and the stale heap entries once nothing is polled."""
+        if self._readers or self._writers:
+            return
+        self._reader_heap.clear()
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _schedule(self, when):
+        """Make sure the timer fires no later than when."""
+        if self._handle is not None:
+            if self._when <= when:
+                return
+            self._handle.cancel()
+        self._when = when
+        self._handle = self._loop.call_at(when, self._tick)
+
+    def _tick(self):
+        self._handle = None
+        self.ticks += 1
+        now = self._loop.time()
+        for transport in list(self._writers):
+            if transport in self._writers:
+                self._call(transport._poll_write)
+
+        heap = self._reader_heap
+        readers = self._readers
+        while heap and heap[0][0] <= now:
+            due, _, transport = heapq.heappop(heap)
+            if readers.get(transport) != due:
+                continue  # stale entry, removed or rescheduled since
+            del readers[transport]
+            delay = self._call(transport._poll_read)
+            # The transport may have stopped or restarted reading meanwhile
+            if delay is not None and transport._has_reader and transport not in readers:
+                self.add_reader(transport, delay)
+
+        if len(heap) > 2 * len(readers) + 64:
+            self._reader_heap = heap = [entry for entry in heap if readers.get(entry[2]) == entry[0]]
+            heapq.heapify(heap)
+        if self._writers:
+            self._schedule(now + self._interval)
+        elif readers:
+            self._schedule(heap[0][0])
+        else:
+            heap.clear()
+
+    def _call(self, callback):
+        self.polls += 1
+        try:
+            return callback()
+        except (SystemExit, KeyboardInterrupt):
+            raise
+        except BaseException as exc:
+            self._loop.call_exception_handler({
+                'message': 'Exception while polling serial port',
+                'exception': exc,
+                'handle': callback,
+            })
+
+
+_poll_schedulers = weakref.WeakKeyDictionary()
+
+
+def _get_poll_scheduler(loop):
+    """The _PollScheduler shared by all polled transports of loop."""
+    try:
+        return _poll_schedulers[loop]
+    except KeyError:
+        scheduler = _poll_schedulers[loop] = _PollScheduler(loop)
+        return scheduler
+
 
 class SerialTransport(asyncio.Transport):
     """An asyncio transport model of a serial communication channel.
@@ -47,26 +519,75 @@ class SerialTransport(asyncio.Transport):
     calling you back when it succeeds.
     """
 
-    def __init__(self, loop, protocol, serial_instance):
+    def __init__(self, loop, protocol, serial_instance, read_strategy=None, max_read_size=None,
+                 executor=None, write_pacer=None, coalesce_window=None,
+                 batch_size=None, batch_latency=None):
         super().__init__()
         self._loop = loop
+        self._executor = executor
         self._protocol = protocol
+        self._protocol_is_buffered = isinstance(protocol, asyncio.BufferedProtocol)
+        # Protocols may ask for the time data was read along with it
+        self._timed_data_received = getattr(protocol, 'timed_data_received', None)
+        self._last_rx_time = None
         self._serial = serial_instance
         self._closing = False
         self._protocol_paused = False
-        self._max_read_size = 1024
-        self._write_buffer = []
+        self._read_strategy = _make_read_strategy(read_strategy, max_read_size)
+        self._stats = TransportStats()
+        # Received data is collected in _rx_batch and delivered once
+        # batch_size bytes or batch_latency seconds are reached, if
+        # either is given. BufferedProtocols choose their own buffers.
+        self._rx_batch = None
+        self._rx_batch_handle = None
+        self._rx_batch_time = None
+        if (batch_size is not None or batch_latency is not None) and not self._protocol_is_buffered:
+            self._rx_batch = bytearray()
+            self._rx_batch_size = 65536 if batch_size is None else batch_size
+            self._rx_batch_latency = 0.001 if batch_latency is None else batch_latency
+        # Queued chunks per priority, highest priority first, the default
+        # priority 0 lane is _write_buffer. A partially written chunk is
+        # moved to _write_head and sent before anything else.
+        self._write_buffer = collections.deque()
+        self._write_lanes = [(0, self._write_buffer)]
+        self._write_head = None
+        self._write_buffer_size = 0
+        self._flushed_waiters = []
+        self._write_pacer = write_pacer
+        self._pacer_handle = None
+        # Writes are held back while corked or until the coalescing
+        # window that the first of them opened has passed. Corking while
+        # data is being sent records in _cork_marks how many chunks of
+        # each lane were queued before, only those are sent until uncork().
+        self._corked = False
+        self._cork_marks = None
+        self._coalesce_window = coalesce_window
+        self._coalesce_handle = None
         self._set_write_buffer_limits()
         self._has_reader = False
         self._has_writer = False
         self._poll_wait_time = 0.0005
+        self._max_poll_wait_time = 0.05
+        self._poll_read_interval = self._poll_wait_time
         self._max_out_waiting = 1024
 
-        # XXX how to support url handlers too
+        # Ports without a file descriptor the event loop can wait for,
+        # i.e. all ports on Windows and URL handlers such as loop://, are
+        # polled. Data bypasses the Serial instance only for pySerial's
+        # own POSIX classes, other subclasses (e.g. spy://) may need to
+        # see every read and write.
+        self._fd = _selectable_fd(serial_instance)
+        self._native_io = self._fd is not None and _has_native_io(serial_instance)
+        self._socket_port = isinstance(serial_instance, _SocketSerial)
+        self._poller = _get_poll_scheduler(loop) if self._fd is None else None
 
         # Asynchronous I/O requires non-blocking devices
         self._serial.timeout = 0
-        self._serial.write_timeout = 0
+        if self._fd is not None or os.name == "nt":
+            # URL handlers keep their write timeout, some of them (loop://)
+            # fail every write with a zero timeout. Their writes are paced
+            # through out_waiting instead.
+            self._serial.write_timeout = 0
 
         # These two callbacks will be enqueued in a FIFO queue by asyncio
         loop.call_soon(protocol.connection_made, self)
@@ -88,10 +609,23 @@ class SerialTransport(asyncio.Transport):
     def get_extra_info(self, name, default=None):
         """Get optional transport information.
 
-        Currently only "serial" is available.
+        Available names are "serial", the underlying Serial instance,
+        "read_strategy", the read strategy including its counters,
+        "stats", the TransportStats of this transport, "polling",
+        True if the port is polled rather than waited for through a
+        file descriptor, and "last_rx_time", the time.monotonic_ns()
+        at which data was last read, or None.
         """
         if name == "serial":
             return self._serial
+        if name == "read_strategy":
+            return self._read_strategy
+        if name == "stats":
+            return self._stats
+        if name == "polling":
+            return self._fd is None
+        if name == "last_rx_time":
+            return self._last_rx_time
         return default
 
     def __repr__(self):
@@ -114,31 +648,291 @@ class SerialTransport(asyncio.Transport):
             self._close(None)
 
     def _read_ready(self):
+        if self._protocol_is_buffered:
+            self._read_ready__get_buffer()
+        else:
+            self._read_ready__data_received()
+
+    def _read_ready__data_received(self):
         try:
-            data = self._serial.read(self._max_read_size)
+            size = self._read_strategy.read_size(self._serial)
+            data = self._read(size)
+        except (BlockingIOError, InterruptedError):
+            self._stats.eagain += 1
         except serial.SerialException as e:
             self._close(exc=e)
         else:
+            self._read_strategy.update(size, len(data))
+            stats = self._stats
+            stats.read_calls += 1
             if data:
-                self._protocol.data_received(data)
+                rx_time = self._last_rx_time = time.monotonic_ns()
+                stats.bytes_read += len(data)
+                if self._rx_batch is not None:
+                    self._batch_received(data, rx_time)
+                else:
+                    self._data_received(data, rx_time)
+
+    def _data_received(self, data, rx_time):
+        """Pass data read at rx_time to the protocol."""
+        started = time.perf_counter_ns()
+        if self._timed_data_received is not None:
+            self._timed_data_received(data, rx_time)
+        else:
+            self._protocol.data_received(data)
+        self._stats.add_data_received_duration(time.perf_counter_ns() - started)
+
+    def _batch_received(self, data, rx_time):
+        """Collect received data, delivering it when the batch is complete."""
+        batch = self._rx_batch
+        if not batch:
+            self._rx_batch_time = rx_time
+        batch += data
+        if len(batch) >= self._rx_batch_size:
+            self._deliver_batch()
+        elif self._rx_batch_handle is None:
+            self._rx_batch_handle = self._loop.call_later(self._rx_batch_latency, self._deliver_batch)
+
+    def _deliver_batch(self):
+        """Pass the collected data to the protocol."""
+        self._cancel_batch_timer()
+        data = bytes(self._rx_batch)
+        del self._rx_batch[:]
+        self._data_received(data, self._rx_batch_time)
+
+    def _cancel_batch_timer(self):
+        if self._rx_batch_handle is not None:
+            self._rx_batch_handle.cancel()
+            self._rx_batch_handle = None
+
+    def _read_ready__get_buffer(self):
+        """Read straight into the buffer of an asyncio.BufferedProtocol."""
+        try:
+            buf = self._protocol.get_buffer(self._read_strategy.read_size(self._serial))
+            if not len(buf):
+                raise RuntimeError('get_buffer() returned an empty buffer')
+        except (SystemExit, KeyboardInterrupt):
+            raise
+        except BaseException as exc:
+            self._fatal_error(exc, 'Fatal error: protocol.get_buffer() call failed.')
+            return
 
-    def write(self, data):
+        stats = self._stats
+        stats.read_calls += 1
+        try:
+            n = self._readinto(buf)
+        except (BlockingIOError, InterruptedError):
+            stats.eagain += 1
+            return
+        except serial.SerialException as e:
+            self._close(exc=e)
+            return
+        self._read_strategy.update(len(buf), n)
+        stats.bytes_read += n
+        if not n:
+            return
+        self._last_rx_time = time.monotonic_ns()
+
+        try:
+            self._protocol.buffer_updated(n)
+        except (SystemExit, KeyboardInterrupt):
+            raise
+        except BaseException as exc:
+            self._fatal_error(exc, 'Fatal error: protocol.buffer_updated() call failed.')
+
+    def _read(self, size):
+        """Read up to size bytes of available data."""
+        if not self._native_io:
+            return self._serial.read(size)
+        # Serial.read() would select() the fd first, which costs a syscall
+        # and fails for file descriptors above FD_SETSIZE.
+        try:
+            data = os.read(self._fd, size)
+        except (BlockingIOError, InterruptedError):
+            raise
+        except OSError as e:
+            raise serial.SerialException('read failed: {}'.format(e))
+        if not data:
+            raise serial.SerialException(
+                'device reports readiness to read but returned no data '
+                '(device disconnected or multiple access on port?)')
+        return data
+
+    def _readinto(self, buf):
+        """Read available data into buf, returns the number of bytes read."""
+        if not self._native_io:
+            return self._serial.readinto(buf)
+        try:
+            n = os.readv(self._fd, [buf])
+        except (BlockingIOError, InterruptedError):
+            raise
+        except OSError as e:
+            raise serial.SerialException('read failed: {}'.format(e))
+        if not n:
+            # Same as pySerial: disconnected devices are always ready to
+            # read but reading returns nothing.
+            raise serial.SerialException(
+                'device reports readiness to read but returned no data '
+                '(device disconnected or multiple access on port?)')
+        return n
+
+    def write(self, data, priority=0):
         """Write some data to the transport.
 
-        This method does not block; it buffers the data and arranges
-        for it to be sent out asynchronously.  Writes made after the
-        transport has been closed will be ignored."""
+        This method does not block; if nothing is queued it hands the
+        data to the port right away, then buffers whatever could not
+        be written and arranges for it to be sent out asynchronously.
+        Writes made after the transport has been closed will be
+        ignored.
+
+        Buffered data of a higher priority is sent before data of a
+        lower priority, switching between priorities only between the
+        data of two write() calls. Data of equal priority is sent in
+        order.
+
+        While the transport is corked, or a coalescing window is
+        configured, the data is only buffered; see cork()."""
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            raise TypeError('data argument must be a bytes-like object, '
+                            'not {!r}'.format(type(data).__name__))
         if self._closing:
             return
+        if not data:
+            return
+
+        data = memoryview(data).cast('B')
+        n = 0
+        held = self._corked or self._coalesce_window is not None
+        if held:
+            self._stats.coalesced_writes += 1
+        elif not self._write_buffer_size and self._native_io:
+            # Optimization: try to send now, the writer only needs to be
+            # registered for whatever the port does not accept at once.
+            offered = len(data)
+            try:
+                if self._write_pacer is None:
+                    n = self._write_fd(data)
+                else:
+                    allowed = self._write_pacer.allowance(self._serial)
+                    if allowed is not None:
+                        offered = min(offered, allowed)
+                    n = self._write_fd(data[:offered]) if offered else 0
+                    self._write_pacer.consumed(n)
+            except (BlockingIOError, InterruptedError):
+                n = offered = 0
+            except serial.SerialException as exc:
+                self._fatal_error(exc, 'Fatal write error on serial transport')
+                return
+            if n == len(data):
+                return
+            if 0 < n < offered:
+                self._stats.partial_writes += 1
+            data = data[n:]
 
-        if self.get_write_buffer_size() == 0:
+        if not isinstance(data.obj, bytes):
+            # The caller may reuse a mutable buffer once write() returns
+            data = memoryview(data.tobytes())
+
+        if self._write_buffer_size == 0:
+            if held:
+                if not self._corked and not self._has_writer:
+                    self._coalesce_handle = self._loop.call_later(
+                        self._coalesce_window, self._coalesce_ready)
+            else:
+                self._ensure_writer()
+            if self._fd is None:
+                # A reply is likely, stop backing off the read poll
+                self._poll_read_soon()
+        if n:
+            # The rest of a chunk already on the wire goes out before
+            # any other data, whatever its priority
+            self._write_head = data
+        elif priority == 0:
             self._write_buffer.append(data)
-            self._ensure_writer()
         else:
-            self._write_buffer.append(data)
+            self._write_lane(priority).append(data)
+        self._write_buffer_size += len(data)
+        if self._write_buffer_size > self._stats.peak_write_buffer_size:
+            self._stats.peak_write_buffer_size = self._write_buffer_size
 
         self._maybe_pause_protocol()
 
+    def cork(self):
+        """Hold back all data written until uncork() is called.
+
+        Many small writes, e.g. the fields of a frame, are then sent
+        with as few system calls as possible once the transport is
+        uncorked. Data that was already being sent is not held back.
+        Calls do not nest.
+        """
+        if self._corked:
+            return
+        self._corked = True
+        if self._has_writer:
+            self._cork_marks = {priority: len(lane) for priority, lane in self._write_lanes}
+
+    def uncork(self):
+        """Send the data written since cork() was called.
+
+        The data is sent right away, even if the coalescing window has
+        not passed yet.
+        """
+        if not self._corked:
+            return
+        self._corked = False
+        self._cork_marks = None
+        self._cancel_coalescing()
+        self._release_write_buffer()
+
+    def is_corked(self):
+        """Return True if the transport is corked."""
+        return self._corked
+
+    def _coalesce_ready(self):
+        self._coalesce_handle = None
+        if not self._corked:
+            self._release_write_buffer()
+
+    def _release_write_buffer(self):
+        """Start sending data held back by cork() or the coalescing window."""
+        if not self._write_buffer_size or self._has_writer or self._closing:
+            return
+        self._stats.coalesced_flushes += 1
+        self._ensure_writer()
+        if self._fd is not None and self._pacer_handle is None:
+            # Send right away, the writer is only needed for what the
+            # port does not accept at once.
+            self._write_ready()
+
+    def _write_lane(self, priority):
+        """The queue for chunks of the given priority."""
+        for lane_priority, lane in self._write_lanes:
+            if lane_priority == priority:
+                return lane
+        lane = collections.deque()
+        self._write_lanes.append((priority, lane))
+        self._write_lanes.sort(key=lambda entry: -entry[0])
+        return lane
+
+    def _clear_write_buffer(self):
+        for _, lane in self._write_lanes:
+            lane.clear()
+        self._write_head = None
+        self._write_buffer_size = 0
+        if self._cork_marks is not None:
+            self._cork_marks = dict.fromkeys(self._cork_marks, 0)
+
+    def _sending_before_cork(self):
+        """True if data queued before cork() is left to send."""
+        return self._write_head is not None or any(self._cork_marks.values())
+
+    def _unsent_chunks(self):
+        """The buffered data not handed to the port yet, in sending order."""
+        chunks = [] if self._write_head is None else [self._write_head]
+        for _, lane in self._write_lanes:
+            chunks.extend(lane)
+        return chunks
+
     def can_write_eof(self):
         """Serial ports do not support the concept of end-of-file.
 
@@ -179,7 +973,7 @@ class SerialTransport(asyncio.Transport):
         This buffer is unbounded, so the result may be larger than the
         the high water mark.
         """
-        return sum(map(len, self._write_buffer))
+        return self._write_buffer_size
 
     def write_eof(self):
         raise NotImplementedError("Serial connections do not support end-of-file")
@@ -198,9 +992,48 @@ class SerialTransport(asyncio.Transport):
         """ clears output buffer and stops any more data being written
         """
         self._remove_writer()
-        self._write_buffer.clear()
+        self._clear_write_buffer()
+        self._wake_flushed_waiters()
         self._maybe_resume_protocol()
 
+    async def drain_to_wire(self):
+        """Wait until all data written so far has left the port.
+
+        First waits for the write buffer of the transport to be handed
+        to the driver, then polls the driver's output queue
+        (Serial.out_waiting, TIOCOUTQ on POSIX) without blocking a
+        thread. Each poll sleeps for the time the queued characters
+        take at the configured baudrate, and a final character time
+        accounts for the character in the UART's shift register.
+
+        This method is a coroutine. ConnectionResetError is raised if
+        the transport is aborted before the data was written.
+        """
+        if self._write_buffer_size:
+            waiter = self._loop.create_future()
+            self._flushed_waiters.append(waiter)
+            await waiter
+        if self._serial is None:
+            raise ConnectionResetError('Connection lost')
+        char_time = _character_time(self._serial)
+        pending = self._serial.out_waiting
+        while pending:
+            await asyncio.sleep(max(pending * char_time, self._poll_wait_time))
+            if self._serial is None:
+                raise ConnectionResetError('Connection lost')
+            pending = self._serial.out_waiting
+        await asyncio.sleep(char_time)
+
+    def _wake_flushed_waiters(self, exc=None):
+        """Resolve the drain_to_wire() waiters for the write buffer."""
+        waiters, self._flushed_waiters = self._flushed_waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                if exc is None:
+                    waiter.set_result(None)
+                else:
+                    waiter.set_exception(exc)
+
     def _maybe_pause_protocol(self):
         """To be called whenever the write-buffer size increases.
 
@@ -212,6 +1045,7 @@ class SerialTransport(asyncio.Transport):
             return
         if not self._protocol_paused:
             self._protocol_paused = True
+            self._stats.paused()
             try:
                 self._protocol.pause_writing()
             except Exception as exc:
@@ -233,6 +1067,7 @@ class SerialTransport(asyncio.Transport):
         if (self._protocol_paused and
                 self.get_write_buffer_size() <= self._low_water):
             self._protocol_paused = False
+            self._stats.resumed()
             try:
                 self._protocol.resume_writing()
             except Exception as exc:
@@ -255,91 +1090,276 @@ class SerialTransport(asyncio.Transport):
         connection_lost() method will be called with None as its
         argument.
         """
-        data = b''.join(self._write_buffer)
-        assert data, 'Write buffer should not be empty'
+        assert self._write_buffer_size, 'Write buffer should not be empty'
 
-        self._write_buffer.clear()
+        if self._cork_marks is not None and not self._sending_before_cork():
+            # Only data written after cork() is left
+            self._remove_writer()
+            return
 
         try:
-            n = self._serial.write(data)
+            limit = None
+            if self._write_pacer is not None:
+                limit = self._write_pacer.allowance(self._serial)
+                if limit == 0:
+                    self._wait_for_pacer()
+                    return
+            n = self._write_buffered(limit)
         except (BlockingIOError, InterruptedError):
-            self._write_buffer.append(data)
+            return
         except serial.SerialException as exc:
             self._fatal_error(exc, 'Fatal write error on serial transport')
+            return
+
+        if self._write_pacer is not None:
+            self._write_pacer.consumed(n)
+        self._consume_write_buffer(n)
+        if not self._native_io:
+            # _write_fd() does the accounting for native ports
+            self._stats.write_calls += 1
+            self._stats.bytes_written += n
+        if self._flushed():
+            self._remove_writer()
+            self._wake_flushed_waiters()
+            self._maybe_resume_protocol()  # May cause further writes
+            # _write_ready may have been invoked by the event loop
+            # after the transport was closed, as part of the ongoing
+            # process of flushing buffered data. If the buffer
+            # is now empty, we can close the connection
+            if self._closing and self._flushed():
+                self._close()
+            return
+
+        if self._cork_marks is not None and not self._sending_before_cork():
+            self._remove_writer()
+        self._maybe_resume_protocol()
+
+    def _wait_for_pacer(self):
+        """Stop waiting for the fd to become writable until the pacer allows writing.
+
+        Polled ports simply try again on their next poll.
+        """
+        if self._fd is None or self._pacer_handle is not None:
+            return
+        self._loop.remove_writer(self._fd)
+        delay = max(self._write_pacer.delay(self._serial), self._poll_wait_time)
+        self._pacer_handle = self._loop.call_later(delay, self._pacer_ready)
+
+    def _pacer_ready(self):
+        self._pacer_handle = None
+        if self._has_writer:
+            self._loop.add_writer(self._fd, self._write_ready)
+
+    def _write_buffered(self, limit=None):
+        """Submit queued chunks to the serial port.
+
+        For pySerial's POSIX ports the queued memoryviews are handed
+        straight to the file descriptor, several at a time through
+        writev() where available, so queued data is never joined or
+        copied. Other ports fall back to Serial.write(), joining the
+        chunks to submit if there are several.
+
+        At most limit bytes are submitted, unless limit is None.
+
+        Returns the number of bytes accepted by the port. A write the
+        port did not accept completely counts as a partial write; a
+        batch cut short by limit or _IOV_MAX does not.
+        """
+        if not self._native_io:
+            if self._fd is None:
+                # Polled ports are only written when out_waiting is below
+                # _max_out_waiting, hand them no more than that at once.
+                limit = self._max_out_waiting if limit is None else min(limit, self._max_out_waiting)
+            chunks = self._queued_chunks(limit)
+            data = chunks[0] if len(chunks) == 1 else b''.join(chunks)
+            n = self._serial.write(data)
+            offered = len(data)
         else:
-            if n == len(data):
-                assert self._flushed()
-                self._remove_writer()
-                self._maybe_resume_protocol()  # May cause further writes
-                # _write_ready may have been invoked by the event loop
-                # after the transport was closed, as part of the ongoing
-                # process of flushing buffered data. If the buffer
-                # is now empty, we can close the connection
-                if self._closing and self._flushed():
-                    self._close()
+            chunks = self._queued_chunks(limit)
+            if len(chunks) == 1 or not hasattr(os, 'writev'):
+                n = self._write_fd(chunks[0])
+                offered = len(chunks[0])
+            else:
+                n = self._write_fd(chunks)
+                offered = sum(map(len, chunks))
+        if n < offered:
+            self._stats.partial_writes += 1
+        return n
+
+    def _queued_chunks(self, limit=None):
+        """The next chunks to send, as a sequence of memoryviews.
+
+        Returns at most _IOV_MAX chunks, and no more than limit bytes
+        unless limit is None. While corked, only the chunks queued
+        before cork() are returned.
+        """
+        if self._cork_marks is not None:
+            marks = self._cork_marks
+            chunks = itertools.chain.from_iterable(
+                itertools.islice(lane, marks.get(priority, 0)) for priority, lane in self._write_lanes)
+            if self._write_head is not None:
+                chunks = itertools.chain((self._write_head,), chunks)
+        elif self._write_head is None and len(self._write_lanes) == 1:
+            chunks = self._write_buffer
+            if limit is None or limit >= self._write_buffer_size:
+                if len(chunks) <= _IOV_MAX:
+                    return chunks
+                return list(itertools.islice(chunks, _IOV_MAX))
+        else:
+            chunks = itertools.chain.from_iterable(lane for _, lane in self._write_lanes)
+            if self._write_head is not None:
+                chunks = itertools.chain((self._write_head,), chunks)
+
+        result = []
+        for chunk in itertools.islice(chunks, _IOV_MAX):
+            if limit is not None:
+                if len(chunk) >= limit:
+                    result.append(chunk[:limit])
+                    break
+                limit -= len(chunk)
+            result.append(chunk)
+        return result
+
+    def _write_fd(self, data):
+        """Write a buffer, or a sequence of buffers, to the port's fd.
+
+        Returns the number of bytes written. BlockingIOError and
+        InterruptedError are passed on to the caller, other OS errors
+        are raised as SerialException.
+        """
+        stats = self._stats
+        stats.write_calls += 1
+        try:
+            if isinstance(data, memoryview):
+                n = os.write(self._fd, data)
+            else:
+                n = os.writev(self._fd, data)
+        except (BlockingIOError, InterruptedError):
+            stats.eagain += 1
+            raise
+        except OSError as e:
+            raise serial.SerialException('write failed: {}'.format(e))
+        stats.bytes_written += n
+        return n
+
+    def _consume_write_buffer(self, n):
+        """Drop n written bytes from the head of the write buffer.
+
+        A partially written chunk is replaced by a view on its unsent
+        remainder, kept as _write_head; the underlying data is not
+        copied.
+        """
+        self._write_buffer_size -= n
+        head = self._write_head
+        if head is not None:
+            if len(head) > n:
+                self._write_head = head[n:]
+                return
+            n -= len(head)
+            self._write_head = None
+        marks = self._cork_marks
+        for priority, lane in self._write_lanes:
+            while n and lane:
+                if marks is not None:
+                    # Skip the chunks written after cork()
+                    if not marks.get(priority):
+                        break
+                    marks[priority] -= 1
+                chunk = lane.popleft()
+                if len(chunk) > n:
+                    self._write_head = chunk[n:]
+                    return
+                n -= len(chunk)
+            if not n:
                 return
 
-            assert 0 <= n < len(data)
-            data = data[n:]
-            self._write_buffer.append(data)  # Try again later
-            self._maybe_resume_protocol()
-            assert self._has_writer
+    def _poll_read(self):
+        """Poll a port without selectable file descriptor for input.
 
-    if os.name == "nt":
-        def _poll_read(self):
-            if self._has_reader and not self._closing:
-                try:
-                    self._has_reader = self._loop.call_later(self._poll_wait_time, self._poll_read)
-                    if self.serial.in_waiting:
-                        self._read_ready()
-                except serial.SerialException as exc:
-                    self._fatal_error(exc, 'Fatal write error on serial transport')
-
-        def _ensure_reader(self):
-            if not self._has_reader and not self._closing:
-                self._has_reader = self._loop.call_later(self._poll_wait_time, self._poll_read)
-
-        def _remove_reader(self):
-            if self._has_reader:
-                self._has_reader.cancel()
+        Called by the shared poll scheduler, returns the delay until the
+        next poll. The poll interval is reset to _poll_wait_time whenever
+        data is waiting and doubles, up to _max_poll_wait_time, while the
+        port stays idle.
+        """
+        if not self._has_reader or self._closing:
+            return None
+        try:
+            waiting = self._serial.in_waiting
+        except serial.SerialException as exc:
+            self._fatal_error(exc, 'Fatal read error on serial transport')
+            return None
+        if waiting:
+            self._poll_read_interval = self._poll_wait_time
+            self._read_ready()
+        else:
+            self._poll_read_interval = min(self._poll_read_interval * 2, self._max_poll_wait_time)
+        return self._poll_read_interval
+
+    def _poll_read_soon(self):
+        """Reset the read poll interval, rescheduling a backed-off poll."""
+        self._poll_read_interval = self._poll_wait_time
+        if self._has_reader and not self._closing:
+            self._poller.add_reader(self, self._poll_wait_time)
+
+    def _poll_write(self):
+        """Poll a port without selectable file descriptor for output."""
+        if not self._has_writer or self._closing:
+            return
+        try:
+            writable = self._serial.out_waiting < self._max_out_waiting
+        except serial.SerialException as exc:
+            self._fatal_error(exc, 'Fatal write error on serial transport')
+            return
+        if writable:
+            self._write_ready()
+
+    def _ensure_reader(self):
+        if (not self._has_reader) and (not self._closing):
+            if self._fd is None:
+                self._poll_read_interval = self._poll_wait_time
+                self._poller.add_reader(self, self._poll_wait_time)
+            else:
+                self._loop.add_reader(self._fd, self._read_ready)
+            self._has_reader = True
+            if self._rx_batch:
+                # Resumed reading, deliver what was held back by the pause
+                self._rx_batch_handle = self._loop.call_later(self._rx_batch_latency, self._deliver_batch)
+
+    def _remove_reader(self):
+        if self._rx_batch is not None:
+            self._cancel_batch_timer()
+        if self._has_reader:
+            if self._fd is None:
+                self._poller.remove_reader(self)
+            else:
+                self._loop.remove_reader(self._fd)
             self._has_reader = False
 
-        def _poll_write(self):
-            if self._has_writer and not self._closing:
-                self._has_writer = self._loop.call_later(self._poll_wait_time, self._poll_write)
-                if self.serial.out_waiting < self._max_out_waiting:
-                    self._write_ready()
-
-        def _ensure_writer(self):
-            if not self._has_writer and not self._closing:
-                self._has_writer = self._loop.call_soon(self._poll_write)
-
-        def _remove_writer(self):
-            if self._has_writer:
-                self._has_writer.cancel()
+    def _ensure_writer(self):
+        if (not self._has_writer) and (not self._closing):
+            if self._fd is None:
+                self._poller.add_writer(self)
+            else:
+                self._loop.add_writer(self._fd, self._write_ready)
+            self._has_writer = True
+
+    def _cancel_coalescing(self):
+        if self._coalesce_handle is not None:
+            self._coalesce_handle.cancel()
+            self._coalesce_handle = None
+
+    def _remove_writer(self):
+        self._cancel_coalescing()
+        if self._has_writer:
+            if self._fd is None:
+                self._poller.remove_writer(self)
+            elif self._pacer_handle is not None:
+                self._pacer_handle.cancel()
+                self._pacer_handle = None
+            else:
+                self._loop.remove_writer(self._fd)
             self._has_writer = False
 
-    else:
-        def _ensure_reader(self):
-            if (not self._has_reader) and (not self._closing):
-                self._loop.add_reader(self._serial.fileno(), self._read_ready)
-                self._has_reader = True
-
-        def _remove_reader(self):
-            if self._has_reader:
-                self._loop.remove_reader(self._serial.fileno())
-                self._has_reader = False
-
-        def _ensure_writer(self):
-            if (not self._has_writer) and (not self._closing):
-                self._loop.add_writer(self._serial.fileno(), self._write_ready)
-                self._has_writer = True
-
-        def _remove_writer(self):
-            if self._has_writer:
-                self._loop.remove_writer(self._serial.fileno())
-                self._has_writer = False
-
     def _set_write_buffer_limits(self, high=None, low=None):
         """Ensure consistent write-buffer limits."""
         if high is None:
@@ -378,6 +1398,11 @@ class SerialTransport(asyncio.Transport):
         method will call this _close method again when the
         buffer has been flushed completely.
         """
+        if self._corked or self._coalesce_handle is not None:
+            self._corked = False
+            self._cork_marks = None
+            self._cancel_coalescing()
+            self._release_write_buffer()
         self._closing = True
         self._remove_reader()
         if self._flushed():
@@ -398,6 +1423,14 @@ class SerialTransport(asyncio.Transport):
         self._remove_writer()  # Pending buffered data will not be written
         self._loop.create_task(self._call_connection_lost(exc))
 
+    def _output_drained(self):
+        """True if the driver has no output left to transmit."""
+        try:
+            return not self._serial.out_waiting
+        except (OSError, serial.SerialException):
+            # The device is gone, there is nothing left to wait for
+            return True
+
     async def _call_connection_lost(self, exc):
         """Close the connection.
 
@@ -407,24 +1440,161 @@ class SerialTransport(asyncio.Transport):
         assert self._closing
         assert not self._has_writer
         assert not self._has_reader
-        try:
-            await self._loop.run_in_executor(None, self._serial.flush)
-        except (serial.SerialException if os.name == "nt" else termios.error):
-            # ignore serial errors which may happen if the serial device was
-            # hot-unplugged.
-            pass
+        # Waiting for the output to drain blocks, unless there is nothing
+        # left to drain. Closing a native port whose output has drained
+        # does not block either, so neither needs a thread then. Sockets
+        # send what is queued after they were closed.
+        drained = self._socket_port or (self._native_io and self._output_drained())
+        if not drained:
+            try:
+                await self._loop.run_in_executor(self._executor, self._serial.flush)
+            except _FLUSH_ERRORS:
+                # ignore serial errors which may happen if the serial device was
+                # hot-unplugged.
+                pass
 
         try:
+            if self._rx_batch:
+                # Data read before the transport was closed
+                self._deliver_batch()
             self._protocol.connection_lost(exc)
         finally:
-            self._write_buffer.clear()
-            await self._loop.run_in_executor(None, self._serial.close)
+            self._clear_write_buffer()
+            self._wake_flushed_waiters(ConnectionResetError('Connection lost'))
+            if self._native_io or self._socket_port:
+                self._serial.close()
+            else:
+                await self._loop.run_in_executor(self._executor, self._serial.close)
             self._serial = None
             self._protocol = None
             self._loop = None
 
 
-async def create_serial_connection(loop, protocol_factory, url, *args, **kwargs):
+def _character_time(serial_instance):
+    """Seconds it takes to transmit one character with the port's settings."""
+    bits = 1 + serial_instance.bytesize + serial_instance.stopbits
+    if serial_instance.parity != serial.PARITY_NONE:
+        bits += 1
+    return bits / serial_instance.baudrate
+
+
+class _SocketSerial(protocol_socket.Serial):
+    """A socket:// port whose connection is made by the event loop.
+
+    Closing does not block for 0.3 s as pySerial's class does, and
+    out_waiting reports the bytes in the socket's send queue.
+    """
+
+    logger = None
+
+    @property
+    def out_waiting(self):
+        if not self.is_open:
+            raise serial.PortNotOpenError()
+        if fcntl is None or not hasattr(termios, 'TIOCOUTQ'):
+            return 0
+        try:
+            # TIOCOUTQ is SIOCOUTQ for sockets on Linux
+            return struct.unpack('I', fcntl.ioctl(self._socket.fileno(), termios.TIOCOUTQ, b'\0' * 4))[0]
+        except OSError:
+            return 0
+
+    def close(self):
+        if self.is_open:
+            if self._socket is not None:
+                self._socket.close()
+                self._socket = None
+            self.is_open = False
+
+
+def _socket_options(url):
+    """Split the socket options this module handles off a socket:// URL.
+
+    Returns the URL with the remaining options, for pySerial, the value
+    of TCP_NODELAY and the keepalive settings: None, or a tuple of the
+    idle time, interval and count, each of which may be None.
+    """
+    parts = urllib.parse.urlsplit(url)
+    options = urllib.parse.parse_qs(parts.query, True)
+    try:
+        nodelay = options.pop('nodelay', ['1'])[-1] not in ('0', 'false', 'no', 'off')
+        keepalive = options.pop('keepalive', None)
+        if keepalive is not None:
+            values = [int(value) if value else None for value in keepalive[-1].split(',')]
+            if len(values) > 3:
+                raise ValueError('too many keepalive values')
+            keepalive = tuple(values + [None] * (3 - len(values)))
+    except ValueError as e:
+        raise serial.SerialException(
+            'expected the options nodelay={{0|1}} and keepalive=<idle>[,<interval>[,<count>]]: {}'.format(e))
+    url = urllib.parse.urlunsplit(parts._replace(query=urllib.parse.urlencode(options, doseq=True)))
+    return url, nodelay, keepalive
+
+
+def _set_socket_options(sock, nodelay, keepalive):
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1 if nodelay else 0)
+    if keepalive is None:
+        return
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    idle, interval, count = keepalive
+    # TCP_KEEPIDLE is called TCP_KEEPALIVE on macOS
+    idle_option = getattr(socket, 'TCP_KEEPIDLE', getattr(socket, 'TCP_KEEPALIVE', None))
+    for option, value in ((idle_option, idle),
+                          (getattr(socket, 'TCP_KEEPINTVL', None), interval),
+                          (getattr(socket, 'TCP_KEEPCNT', None), count)):
+        if option is not None and value is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, option, value)
+
+
+async def _connect_socket(loop, url, host, port, nodelay, keepalive):
+    """Return a non-blocking socket connected to host and port."""
+    try:
+        infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except OSError as e:
+        raise serial.SerialException('Could not open port {}: {}'.format(url, e))
+    error = None
+    for family, type_, proto, _, address in infos:
+        sock = socket.socket(family, type_, proto)
+        try:
+            sock.setblocking(False)
+            await loop.sock_connect(sock, address)
+            _set_socket_options(sock, nodelay, keepalive)
+        except OSError as e:
+            sock.close()
+            error = e
+            continue
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+    raise serial.SerialException('Could not open port {}: {}'.format(url, error))
+
+
+async def _open_socket_port(loop, url, *args, **kwargs):
+    """Connect a socket:// port without blocking the event loop.
+
+    pySerial's class would connect in open(), blocking, so the port is
+    created closed and the socket connected here and handed to it.
+    """
+    url, nodelay, keepalive = _socket_options(url)
+    kwargs.pop('do_not_open', None)
+    serial_instance = _SocketSerial(None, *args, **kwargs)
+    serial_instance.port = url
+    host, port = serial_instance.from_url(url)
+    serial_instance._socket = await _connect_socket(loop, url, host, port, nodelay, keepalive)
+    serial_instance.is_open = True
+    return serial_instance
+
+
+def _is_local_device(url):
+    """True if url names a local device, rather than a URL handler."""
+    return os.name == "posix" and not urllib.parse.urlparse(url).scheme
+
+
+async def create_serial_connection(loop, protocol_factory, url, *args,
+                                   read_strategy=None, max_read_size=None, executor=None,
+                                   write_pacer=None, coalesce_window=None,
+                                   batch_size=None, batch_latency=None, **kwargs):
     """Create a connection to a new serial port instance.
 
     This function is a coroutine which will try to establish the
@@ -447,29 +1617,60 @@ async def create_serial_connection(loop, protocol_factory, url, *args, **kwargs)
     necessarily a class. For example, if you want to use a pre-created
     protocol instance, you can pass lambda: my_protocol.
 
-    Any additional arguments will be forwarded to the Serial constructor.
-    """
-    parsed_url = urllib.parse.urlparse(url)
+    read_strategy selects how many bytes are requested per read: "fixed"
+    (the default), "in_waiting", "adaptive" or a read strategy instance.
+    max_read_size bounds the read size of the named strategies.
+
+    Local devices on POSIX are opened right away: pySerial opens them
+    with O_NONBLOCK and configuring termios does not block either. URL
+    handlers, which may block on the network, are opened in executor,
+    which is also used to flush and close ports that may block on it.
+    It defaults to the loop's default executor.
+
+    write_pacer, a WritePacer, limits how fast data is handed to the
+    driver, keeping the remainder in the transport's write buffer.
+
+    coalesce_window, in seconds, holds back written data until that
+    much time has passed since the first write into an empty buffer,
+    so that bursts of small writes go out in a single system call.
 
-    callback = partial(serial.serial_for_url, url, *args, **kwargs)
-    serial_instance = await loop.run_in_executor(None, callback)
+    batch_size and batch_latency enable batched delivery of received
+    data: reads are collected and passed to data_received() once
+    batch_size bytes (64 KiB by default) were received or batch_latency
+    seconds (1 ms by default) after the first of them, whichever comes
+    first. They do not apply to asyncio.BufferedProtocol.
 
-    if parsed_url.scheme == "socket":
-        transport, protocol = await loop.create_connection(protocol_factory, parsed_url.hostname, parsed_url.port)
+    socket:// and rfc2217:// URLs are connected by the event loop, once,
+    and served by a SerialTransport like any other port, see
+    serial_asyncio.rfc2217 for the latter. TCP_NODELAY is set unless
+    the URL asks for nodelay=0, keepalive=<idle>[,<interval>[,<count>]]
+    enables TCP keepalive with the given times in seconds.
 
-        # To maintain API compatibility
-        transport.flush = lambda: None
-        transport.loop = loop
-        transport.serial = serial_instance
-        transport._extra["serial"] = serial_instance
-        serial_instance._socket = transport.get_extra_info("socket")._sock
+    Any additional arguments will be forwarded to the Serial constructor.
+    """
+    scheme = urllib.parse.urlparse(url).scheme
+    if scheme == "socket":
+        serial_instance = await _open_socket_port(loop, url, *args, **kwargs)
+    elif scheme == "rfc2217":
+        from serial_asyncio import rfc2217
+        serial_instance = await rfc2217.open_port(loop, url, *args, **kwargs)
+    elif _is_local_device(url):
+        serial_instance = serial.serial_for_url(url, *args, **kwargs)
     else:
-        transport, protocol = await connection_for_serial(loop, protocol_factory, serial_instance)
+        serial_instance = await loop.run_in_executor(
+            executor, partial(serial.serial_for_url, url, *args, **kwargs))
 
-    return transport, protocol
+    return await connection_for_serial(
+        loop, protocol_factory, serial_instance,
+        read_strategy=read_strategy, max_read_size=max_read_size, executor=executor,
+        write_pacer=write_pacer, coalesce_window=coalesce_window,
+        batch_size=batch_size, batch_latency=batch_latency)
 
 
-async def connection_for_serial(loop, protocol_factory, serial_instance):
+async def connection_for_serial(loop, protocol_factory, serial_instance,
+                                read_strategy=None, max_read_size=None, executor=None,
+                                write_pacer=None, coalesce_window=None,
+                                batch_size=None, batch_latency=None):
     """Create a connection to the given serial port instance.
 
     This function is a coroutine which will try to establish the
@@ -491,9 +1692,17 @@ async def connection_for_serial(loop, protocol_factory, serial_instance):
     Note:  protocol_factory can be any kind of callable, not
     necessarily a class. For example, if you want to use a pre-created
     protocol instance, you can pass lambda: my_protocol.
+
+    read_strategy, max_read_size, executor, write_pacer,
+    coalesce_window, batch_size and batch_latency are passed on to
+    SerialTransport, see create_serial_connection().
     """
     protocol = protocol_factory()
-    transport = SerialTransport(loop, protocol, serial_instance)
+    transport = SerialTransport(loop, protocol, serial_instance,
+                                read_strategy=read_strategy, max_read_size=max_read_size,
+                                executor=executor, write_pacer=write_pacer,
+                                coalesce_window=coalesce_window,
+                                batch_size=batch_size, batch_latency=batch_latency)
     return transport, protocol
 
 
@@ -528,6 +1737,18 @@ async def open_serial_connection(*,
     return reader, writer
 
 
+async def drain_to_wire(writer):
+    """Wait until everything written to a StreamWriter has left the port.
+
+    writer is a StreamWriter returned by open_serial_connection(). Waits
+    for the writer's flow control, then for SerialTransport.drain_to_wire().
+
+    This function is a coroutine.
+    """
+    await writer.drain()
+    await writer.transport.drain_to_wire()
+
+
 async def read_with_timeout(
     reader: asyncio.StreamReader,
     n: int,
@@ -536,20 +1757,80 @@ async def read_with_timeout(
     """A wrapper for the StreamReader.read method that adds a timeout support.
     It returns the bytes read during the given timeout or until n bytes reached.
 
-    reader is a StreamReader item, n is the amount of bytes, timeout is the 
+    reader is a StreamReader item, n is the amount of bytes, timeout is the
     max time that the reading can take.
 
-    The idea is to read 1 byte with a timeout every time, until the timeout is 
-    reached or it read n bytes. In any case it returns what it had read.
+    Whatever the reader has buffered is taken in bulk, waiting for more data
+    only until a single deadline computed from the monotonic loop clock. In
+    any case it returns what it had read, also when the stream ends early.
     """
-    start_t = time.time()
-    data = b''
-    while time.time() - start_t < timeout and len(data) < n:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    data = bytearray()
+    while len(data) < n:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
         try:
-            data += await asyncio.wait_for(reader.read(1), timeout=timeout)
-        except TimeoutError:
+            chunk = await asyncio.wait_for(reader.read(n - len(data)), timeout=remaining)
+        except asyncio.TimeoutError:
+            break
+        if not chunk:
             break
-    return data
+        data += chunk
+    return bytes(data)
+
+
+async def readexactly_with_timeout(
+    reader: asyncio.StreamReader,
+    n: int,
+    timeout: float
+) -> bytes:
+    """A wrapper for the StreamReader.readexactly method that adds a timeout support.
+
+    It returns exactly n bytes when they arrive within timeout seconds,
+    otherwise the (possibly empty) partial data received until the timeout
+    expired or the stream ended. Unlike read_with_timeout, the caller is
+    only woken up once all n bytes are available.
+    """
+    try:
+        return await asyncio.wait_for(reader.readexactly(n), timeout=timeout)
+    except asyncio.TimeoutError:
+        return await _take_buffered(reader, n)
+    except asyncio.IncompleteReadError as e:
+        return e.partial
+
+
+async def readuntil_with_timeout(
+    reader: asyncio.StreamReader,
+    separator: bytes = b'\n',
+    timeout: float = None
+) -> bytes:
+    """A wrapper for the StreamReader.readuntil method that adds a timeout support.
+
+    It returns the data up to and including separator when it arrives
+    within timeout seconds, otherwise the (possibly empty) partial data
+    received until the timeout expired or the stream ended.
+    asyncio.LimitOverrunError is raised like for StreamReader.readuntil.
+    """
+    try:
+        return await asyncio.wait_for(reader.readuntil(separator), timeout=timeout)
+    except asyncio.TimeoutError:
+        return await _take_buffered(reader)
+    except asyncio.IncompleteReadError as e:
+        return e.partial
+
+
+async def _take_buffered(reader, n=sys.maxsize):
+    """Consume up to n bytes already buffered in a StreamReader, without waiting for more."""
+    read = asyncio.ensure_future(reader.read(n))
+    # read() returns at its first step if the reader has data buffered
+    await asyncio.sleep(0)
+    if read.done():
+        return read.result()
+    read.cancel()
+    await asyncio.wait((read,))
+    return b''
 
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 # test
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Minimal inotify binding for watching device directories.
+#
+# This file is part of pySerial. https://github.com/pyserial/pyserial-asyncio
+# (C) 2015-2020 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Linux inotify through ctypes, just enough to learn about device nodes
+appearing and disappearing in a few directories. available() is False
+on other platforms, callers then fall back to polling.
+"""
+import ctypes
+import ctypes.util
+import errno
+import os
+import struct
+import sys
+
+IN_ATTRIB = 0x00000004
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_MASK_ADD = 0x20000000
+
+_EVENT = struct.Struct('iIII')
+
+_libc = None
+
+
+def _load_libc():
+    global _libc
+    if _libc is None:
+        _libc = False
+        if sys.platform.startswith('linux'):
+            try:
+                libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+                libc.inotify_init1.argtypes = [ctypes.c_int]
+                libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+                libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+            except (OSError, AttributeError):
+                pass
+            else:
+                _libc = libc
+    return _libc
+
+
+def available():
+    """True if inotify can be used on this platform."""
+    return bool(_load_libc())
+
+
+def _error():
+    code = ctypes.get_errno()
+    return OSError(code, os.strerror(code))
+
+
+class Inotify:
+    """A non-blocking inotify instance.
+
+    Register fd with loop.add_reader() and call read() when it is ready.
+    """
+
+    def __init__(self):
+        libc = _load_libc()
+        if not libc:
+            raise OSError(errno.ENOSYS, 'inotify is not available')
+        self._libc = libc
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise _error()
+        self._paths = {}
+
+    def add_watch(self, path, mask):
+        """Watch the directory path for the events in mask."""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise _error()
+        self._paths[wd] = path
+        return wd
+
+    def remove_watch(self, wd):
+        self._paths.pop(wd, None)
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self):
+        """Return the pending events as (directory, mask, name) tuples.
+
+        IN_Q_OVERFLOW is reported with directory None: events were lost.
+        """
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except (BlockingIOError, InterruptedError):
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                offset += length
+                events.append((self._paths.get(wd), mask, name))
+                if mask & IN_IGNORED:
+                    self._paths.pop(wd, None)
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+            self._paths.clear()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Checksums for framed protocols.
+#
+# This file is part of pySerial. https://github.com/pyserial/pyserial-asyncio
+# (C) 2015-2020 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Checksum trailers for the framers in serial_asyncio.framing.
+
+A checksum instance passed to a framer is appended to every frame that
+is encoded, and verified and stripped from every frame received.
+Frames with a wrong checksum are dropped and counted.
+"""
+import array
+import sys
+import zlib
+
+
+class Checksum:
+    """Base class of checksums trailing a frame.
+
+    Subclasses set size and byteorder of the trailer and implement
+    compute().
+    """
+
+    size = 0
+    byteorder = 'little'
+
+    def compute(self, data):
+        """Return the checksum of data, any bytes-like object."""
+        raise NotImplementedError
+
+    def append(self, payload):
+        """Return payload followed by its checksum."""
+        return bytes(payload) + self.compute(payload).to_bytes(self.size, self.byteorder)
+
+    def strip(self, frame):
+        """Return the payload of frame, or None if its checksum is wrong."""
+        size = self.size
+        if len(frame) < size:
+            return None
+        with memoryview(frame) as view:
+            payload = view[:len(frame) - size]
+            if self.compute(payload) != int.from_bytes(view[len(frame) - size:], self.byteorder):
+                return None
+            return payload.tobytes()
+
+
+def _crc16_table(polynomial):
+    """Table of a reflected CRC-16 for one byte."""
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ polynomial if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+class Crc16Modbus(Checksum):
+    """CRC-16/MODBUS, sent least significant byte first.
+
+    Data is processed two bytes at a time through a table of 65536
+    entries, built on first use, which folds two byte-wise steps of the
+    reflected CRC into a single lookup. In Python the cost is in the
+    loop iterations rather than in the table lookups, so this is about
+    twice as fast as the byte-wise table.
+    """
+
+    size = 2
+    byteorder = 'little'
+
+    _table = _crc16_table(0xA001)
+    _wide_table = None
+
+    @classmethod
+    def _get_wide_table(cls):
+        if cls._wide_table is None:
+            table = cls._table
+            cls._wide_table = [
+                (table[x & 0xff] >> 8) ^ table[((x >> 8) ^ table[x & 0xff]) & 0xff]
+                for x in range(65536)]
+        return cls._wide_table
+
+    def compute(self, data, crc=0xFFFF):
+        with memoryview(data) as view:
+            view = view.cast('B')
+            length = len(view)
+            words = array.array('H')
+            words.frombytes(view[:length & ~1])
+            if sys.byteorder == 'big':
+                words.byteswap()
+            wide_table = self._get_wide_table()
+            for word in words:
+                crc = wide_table[crc ^ word]
+            if length & 1:
+                crc = (crc >> 8) ^ self._table[(crc ^ view[length - 1]) & 0xff]
+        return crc
+
+
+class Crc32(Checksum):
+    """CRC-32 as used by Ethernet and zlib, sent least significant byte first.
+
+    Computed by zlib, whose C implementation processes several bytes
+    per step.
+    """
+
+    size = 4
+    byteorder = 'little'
+
+    def compute(self, data, crc=0):
+        return zlib.crc32(data, crc)
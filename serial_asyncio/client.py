@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Request/response client for command based devices.
+#
+# This file is part of pySerial. https://github.com/pyserial/pyserial-asyncio
+# (C) 2015-2020 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+A client for devices answering requests with responses, such as AT
+command modems, Modbus slaves or SCPI instruments.
+
+SerialClient is a protocol that frames the received data with one of
+the framers of serial_asyncio.framing and hands every response to the
+request it answers, without a StreamReader in between:
+
+    transport, client = await serial_asyncio.create_serial_connection(
+        loop, lambda: SerialClient(LineFramer(b'\\r\\n')), '/dev/ttyUSB0')
+    response = await client.request(b'AT+CSQ', timeout=0.5)
+"""
+import asyncio
+import collections
+import time
+
+import serial_asyncio
+
+
+class Transaction:
+    """A request and its response.
+
+    Times are time.monotonic_ns() values: sent_time is taken after the
+    request was handed to the transport, received_time is the receive
+    timestamp of the last data of the response. expired is True if the
+    request was sent but timed out or was cancelled.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.response = None
+        self.sent_time = None
+        self.received_time = None
+        self.expired = False
+        self._future = None
+
+    @property
+    def latency(self):
+        """Seconds from sending the request to receiving the response, or None."""
+        if self.received_time is None:
+            return None
+        return (self.received_time - self.sent_time) / 1e9
+
+    def __repr__(self):
+        return '{}(request={!r}, response={!r}, latency={!r})'.format(
+            self.__class__.__name__, self.request, self.response, self.latency)
+
+
+class SerialClient(asyncio.Protocol):
+    """Protocol sending requests and matching the responses to them.
+
+    framer, a serial_asyncio.framing.Framer, encodes the requests and
+    splits the received data into responses. Without a matcher every
+    response answers the oldest request still waiting for one, as
+    devices answering in order do. matcher(request, response) returns
+    True if response answers request; it is offered the waiting
+    requests oldest first. Responses answering no request are counted
+    in unsolicited and passed to on_unsolicited, if given.
+
+    Up to max_in_flight requests are sent before their responses
+    arrived; further requests wait for a response first. timeout is the
+    default deadline of a request in seconds, covering the wait for a
+    free slot as well as for the response.
+
+    Without a matcher, a request that timed out or was cancelled after
+    it was sent keeps its place in the order, so that a late response
+    to it does not answer a later request; such responses are counted
+    in late_responses and dropped. Until it arrives, or until no data
+    was received for resync_idle seconds, new requests are not sent.
+    """
+
+    def __init__(self, framer, max_in_flight=1, timeout=None, matcher=None,
+                 on_unsolicited=None, latency_samples=1024, resync_idle=0.1):
+        self.transport = None
+        self.framer = framer
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.matcher = matcher
+        self.on_unsolicited = on_unsolicited
+        self.resync_idle = resync_idle
+        #: Latencies of the most recent transactions, in seconds
+        self.latencies = collections.deque(maxlen=latency_samples)
+        self.transactions = 0
+        self.timeouts = 0
+        self.unsolicited = 0
+        self.late_responses = 0
+        self._pending = collections.deque()
+        # Expired transactions in _pending, the time the last one expired
+        # and a future resolved once none are left
+        self._expired = 0
+        self._expired_time = None
+        self._resync_waiter = None
+        self._in_flight = 0
+        self._slot_waiters = collections.deque()
+        self._last_rx_time = None
+        self._exception = None
+        # IdleGapFramer measures gaps with the receive timestamps
+        self._framer_timed_data_received = getattr(framer, 'timed_data_received', None)
+        framer.set_frame_handler(self._response_received)
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.framer.connection_made(transport)
+
+    def data_received(self, data):
+        self.timed_data_received(data, time.monotonic_ns())
+
+    def timed_data_received(self, data, rx_time):
+        self._last_rx_time = rx_time
+        if self._framer_timed_data_received is not None:
+            self._framer_timed_data_received(data, rx_time)
+        else:
+            self.framer.data_received(data)
+
+    def connection_lost(self, exc):
+        self.framer.connection_lost(exc)
+        self.transport = None
+        self._exception = exc
+        error = ConnectionResetError('Connection lost') if exc is None else exc
+        for transaction in self._pending:
+            if not transaction._future.done():
+                transaction._future.set_exception(error)
+        for waiter in self._slot_waiters:
+            if not waiter.done():
+                waiter.set_exception(error)
+        self._wake_resync_waiters()
+
+    async def request(self, payload, timeout=None):
+        """Send a request and return its response.
+
+        This method is a coroutine. asyncio.TimeoutError is raised if no
+        response arrived within timeout seconds, which defaults to the
+        timeout of the client.
+        """
+        transaction = await self.transaction(payload, timeout)
+        return transaction.response
+
+    async def transaction(self, payload, timeout=None):
+        """Send a request and return the completed Transaction.
+
+        This method is a coroutine, see request().
+        """
+        if self.transport is None:
+            raise ConnectionResetError('Connection lost') if self._exception is None else self._exception
+        if timeout is None:
+            timeout = self.timeout
+        loop = asyncio.get_event_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        await self._acquire_slot(loop, deadline)
+        transaction = Transaction(payload)
+        transaction._future = loop.create_future()
+        handle = None
+        try:
+            if self._expired:
+                await self._resync(loop, deadline)
+            self._pending.append(transaction)
+            self.framer.write_frame(payload)
+            transaction.sent_time = time.monotonic_ns()
+            if deadline is not None:
+                handle = loop.call_at(deadline, self._expire, transaction._future)
+            await transaction._future
+        finally:
+            if handle is not None:
+                handle.cancel()
+            if transaction.received_time is None:
+                if self.matcher is None and transaction.sent_time is not None and self.transport is not None:
+                    # Its response may still arrive, keep its place
+                    transaction.expired = True
+                    self._expired += 1
+                    self._expired_time = time.monotonic_ns()
+                else:
+                    try:
+                        self._pending.remove(transaction)
+                    except ValueError:
+                        pass
+            self._release_slot()
+        return transaction
+
+    def latency_summary(self):
+        """Return count, mean, p50, p90, p99 and max of the recent latencies, in seconds."""
+        samples = sorted(self.latencies)
+        if not samples:
+            return {'count': 0}
+
+        def pick(fraction):
+            return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+        return {
+            'count': len(samples),
+            'mean': sum(samples) / len(samples),
+            'p50': pick(0.50),
+            'p90': pick(0.90),
+            'p99': pick(0.99),
+            'max': samples[-1],
+        }
+
+    def _response_received(self, response):
+        pending = self._pending
+        transaction = None
+        if self.matcher is None:
+            if pending:
+                transaction = pending.popleft()
+        else:
+            for candidate in pending:
+                if self.matcher(candidate.request, response):
+                    transaction = candidate
+                    pending.remove(candidate)
+                    break
+        if transaction is None:
+            self.unsolicited += 1
+            if self.on_unsolicited is not None:
+                self.on_unsolicited(response)
+            return
+        if transaction.expired:
+            self.late_responses += 1
+            self._expired -= 1
+            if not self._expired:
+                self._wake_resync_waiters()
+            return
+        transaction.response = response
+        transaction.received_time = self._last_rx_time or time.monotonic_ns()
+        self.transactions += 1
+        self.latencies.append(transaction.latency)
+        if not transaction._future.done():
+            transaction._future.set_result(None)
+
+    def _expire(self, future):
+        if not future.done():
+            self.timeouts += 1
+            future.set_exception(asyncio.TimeoutError('no response within the deadline'))
+
+    async def _resync(self, loop, deadline):
+        """Wait until the expired requests were answered or the line went idle."""
+        while self._expired:
+            if self.transport is None:
+                raise ConnectionResetError('Connection lost') if self._exception is None else self._exception
+            quiet_since = max(self._expired_time, self._last_rx_time or 0)
+            delay = self.resync_idle - (time.monotonic_ns() - quiet_since) / 1e9
+            if delay <= 0:
+                # The device is not going to answer them anymore
+                self._pending = collections.deque(
+                    transaction for transaction in self._pending if not transaction.expired)
+                self._expired = 0
+                self._wake_resync_waiters()
+                return
+            if deadline is not None:
+                if loop.time() >= deadline:
+                    self.timeouts += 1
+                    raise asyncio.TimeoutError('no response within the deadline')
+                delay = min(delay, deadline - loop.time())
+            if self._resync_waiter is None:
+                self._resync_waiter = loop.create_future()
+            await asyncio.wait((self._resync_waiter,), timeout=delay)
+
+    def _wake_resync_waiters(self):
+        waiter, self._resync_waiter = self._resync_waiter, None
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def _acquire_slot(self, loop, deadline):
+        """Wait until fewer than max_in_flight requests are in flight."""
+        while self._in_flight >= self.max_in_flight or self._slot_waiters:
+            waiter = loop.create_future()
+            self._slot_waiters.append(waiter)
+            handle = None if deadline is None else loop.call_at(deadline, self._expire, waiter)
+            try:
+                await waiter
+            except BaseException:
+                if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                    # Woken up, but gone before taking the slot
+                    self._wake_slot_waiter()
+                raise
+            finally:
+                if handle is not None:
+                    handle.cancel()
+                try:
+                    self._slot_waiters.remove(waiter)
+                except ValueError:
+                    pass
+            if self._in_flight < self.max_in_flight:
+                break
+        self._in_flight += 1
+        if self._in_flight < self.max_in_flight:
+            self._wake_slot_waiter()
+
+    def _release_slot(self):
+        self._in_flight -= 1
+        self._wake_slot_waiter()
+
+    def _wake_slot_waiter(self):
+        for waiter in self._slot_waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+
+async def open_serial_client(framer, *, loop=None, max_in_flight=1, timeout=None, matcher=None,
+                             on_unsolicited=None, resync_idle=0.1, **kwargs):
+    """Open a serial port and return a SerialClient for it.
+
+    framer is a serial_asyncio.framing.Framer instance. The remaining
+    arguments are passed to create_serial_connection().
+
+    This function is a coroutine.
+    """
+    if loop is None:
+        loop = asyncio.get_event_loop()
+    _, client = await serial_asyncio.create_serial_connection(
+        loop,
+        lambda: SerialClient(framer, max_in_flight=max_in_flight, timeout=timeout, matcher=matcher,
+                             on_unsolicited=on_unsolicited, resync_idle=resync_idle),
+        **kwargs)
+    return client
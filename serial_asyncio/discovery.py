@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Port enumeration and hotplug events for the event loop.
+#
+# This file is part of pySerial. https://github.com/pyserial/pyserial-asyncio
+# (C) 2015-2020 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Serial port discovery without blocking the event loop.
+
+serial.tools.list_ports.comports() scans sysfs for every port, which
+takes long enough with hundreds of ports to stall an event loop. A
+PortWatcher enumerates the ports once in an executor and then keeps the
+list up to date from inotify events on the device directories, probing
+only the ports that changed:
+
+    watcher = await serial_asyncio.discovery.watch_ports()
+    print(watcher.ports())
+    async for event in watcher:
+        print(event.action, event.port.device)
+
+Without inotify, i.e. on other platforms than Linux, the ports are
+enumerated again every poll_interval seconds instead.
+"""
+import asyncio
+import collections
+import fnmatch
+import os
+import sys
+
+from serial.tools import list_ports, list_ports_common
+
+from serial_asyncio import _inotify
+
+if sys.platform.startswith('linux'):
+    from serial.tools.list_ports_linux import SysFS
+else:
+    SysFS = None
+
+ADDED = 'add'
+REMOVED = 'remove'
+
+#: The directories watched by default, with the patterns of the port
+#: names in them, those of serial.tools.list_ports on Linux.
+DEFAULT_ROOTS = {
+    '/dev': ('ttyS*', 'ttyUSB*', 'ttyXRUSB*', 'ttyACM*', 'ttyAMA*', 'rfcomm*', 'ttyAP*', 'ttyGS*'),
+    '/dev/serial/by-id': ('*',),
+}
+
+# Watches are shared by roots and ancestors of roots, hence IN_MASK_ADD
+_ROOT_EVENTS = (_inotify.IN_CREATE | _inotify.IN_DELETE | _inotify.IN_MOVED_FROM | _inotify.IN_MOVED_TO
+                | _inotify.IN_DELETE_SELF | _inotify.IN_ONLYDIR | _inotify.IN_MASK_ADD)
+_ANCESTOR_EVENTS = _inotify.IN_CREATE | _inotify.IN_MOVED_TO | _inotify.IN_ONLYDIR | _inotify.IN_MASK_ADD
+
+
+class PortEvent(collections.namedtuple('PortEvent', 'action port')):
+    """A port that was added or removed.
+
+    action is ADDED or REMOVED, port the ListPortInfo of the port.
+    """
+
+
+def port_info(path):
+    """Return the ListPortInfo of the device path, or None to skip it.
+
+    This function blocks, reading sysfs on Linux. Symlinks, such as
+    those in /dev/serial/by-id, are described by the device they point
+    to. Like comports(), ports of the "platform" subsystem, which are
+    not actually present, are skipped.
+    """
+    if not os.path.exists(path):
+        return None
+    if SysFS is None:
+        return list_ports_common.ListPortInfo(path)
+    target = os.path.realpath(path)
+    info = SysFS(target)
+    if info.subsystem == 'platform':
+        return None
+    if target != path:
+        info.device = path
+        info.hwid += ' LINK={}'.format(target)
+    return info
+
+
+async def comports(include_links=False, executor=None):
+    """serial.tools.list_ports.comports(), run in executor.
+
+    This function is a coroutine.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, list_ports.comports, include_links)
+
+
+class PortWatcher:
+    """The serial ports of the system, kept up to date.
+
+    roots maps the directories to watch to the glob patterns of the
+    port names in them, DEFAULT_ROOTS on Linux. A plain list of
+    directories watches everything in them. With roots None on other
+    platforms, serial.tools.list_ports.comports() is polled.
+
+    Directories that do not exist yet, such as /dev/serial/by-id
+    before the first USB adapter was plugged in, are watched for once
+    they are created.
+
+    Changes are yielded as PortEvent by asynchronous iteration, which
+    ends when the watcher is closed. ports() returns the current ports.
+    """
+
+    def __init__(self, roots=None, poll_interval=1.0, executor=None):
+        if roots is None and SysFS is not None:
+            roots = DEFAULT_ROOTS
+        if roots is not None:
+            if not isinstance(roots, dict):
+                roots = dict.fromkeys(roots, ('*',))
+            roots = {os.path.normpath(root): patterns for root, patterns in roots.items()}
+        self.roots = roots
+        self.poll_interval = poll_interval
+        self.executor = executor
+        self._loop = None
+        self._ports = {}
+        self._events = asyncio.Queue()
+        self._inotify = None
+        # Roots that do not exist yet, mapped to the watched ancestor
+        self._pending = {}
+        self._dirty = set()
+        self._rescan = False
+        self._wakeup = None
+        self._task = None
+        self._closed = False
+
+    async def start(self):
+        """Enumerate the ports and start watching for changes.
+
+        This method is a coroutine.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        if self.roots is not None and _inotify.available():
+            try:
+                self._inotify = _inotify.Inotify()
+            except OSError:
+                self._inotify = None
+            else:
+                self._loop.add_reader(self._inotify.fd, self._read_events)
+                for root in self.roots:
+                    self._watch_root(root)
+        self._ports = await self._loop.run_in_executor(self.executor, self._enumerate)
+        self._task = self._loop.create_task(self._run())
+
+    def ports(self):
+        """The ListPortInfo of the current ports, sorted by device."""
+        return sorted(self._ports.values())
+
+    def close(self):
+        """Stop watching and end the iteration."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._inotify is not None:
+            self._loop.remove_reader(self._inotify.fd)
+            self._inotify.close()
+            self._inotify = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._events.put_nowait(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._closed and self._events.empty():
+            raise StopAsyncIteration
+        event = await self._events.get()
+        if event is None:
+            self._events.put_nowait(None)
+            raise StopAsyncIteration
+        return event
+
+    def _matches(self, root, name):
+        return any(fnmatch.fnmatchcase(name, pattern) for pattern in self.roots[root])
+
+    def _enumerate(self):
+        """All ports, by device. Blocks."""
+        if self.roots is None:
+            return {info.device: info for info in list_ports.comports(include_links=True)}
+        ports = {}
+        for root in self.roots:
+            try:
+                names = os.listdir(root)
+            except OSError:
+                continue
+            for name in names:
+                if self._matches(root, name):
+                    path = os.path.join(root, name)
+                    info = port_info(path)
+                    if info is not None:
+                        ports[path] = info
+        return ports
+
+    def _probe(self, paths):
+        """The ListPortInfo of each of paths, None for those gone. Blocks."""
+        return {path: port_info(path) for path in paths}
+
+    def _watch_root(self, root):
+        """Watch root, or the closest of its ancestors that exists."""
+        path = root
+        while True:
+            try:
+                self._inotify.add_watch(path, _ROOT_EVENTS if path == root else _ANCESTOR_EVENTS)
+            except FileNotFoundError:
+                parent = os.path.dirname(path)
+                if not parent or parent == path:
+                    return
+                path = parent
+                continue
+            except OSError:
+                return
+            if path == root:
+                self._pending.pop(root, None)
+            else:
+                self._pending[root] = path
+            return
+
+    def _read_events(self):
+        for directory, mask, name in self._inotify.read():
+            if mask & _inotify.IN_Q_OVERFLOW:
+                self._rescan = True
+                continue
+            if directory in self.roots:
+                if mask & (_inotify.IN_DELETE_SELF | _inotify.IN_IGNORED):
+                    # Its entries were reported before, it had to be empty
+                    self._watch_root(directory)
+                elif self._matches(directory, name):
+                    self._dirty.add(os.path.join(directory, name))
+            if name:
+                created = os.path.join(directory, name)
+                for root, ancestor in list(self._pending.items()):
+                    if ancestor == directory and (root == created or root.startswith(created + os.sep)):
+                        self._watch_root(root)
+                        # It may have entries already
+                        self._rescan = True
+        if self._dirty or self._rescan:
+            self._wakeup.set()
+
+    async def _run(self):
+        """Probe the changed ports and report the changes."""
+        loop = self._loop
+        while True:
+            if self._inotify is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                rescan = True
+            else:
+                await self._wakeup.wait()
+                rescan = self._rescan
+            self._wakeup.clear()
+            self._rescan = False
+            dirty, self._dirty = self._dirty, set()
+            if rescan:
+                current = await loop.run_in_executor(self.executor, self._enumerate)
+                changes = {path: current.get(path) for path in set(current) | set(self._ports)}
+            else:
+                changes = await loop.run_in_executor(self.executor, self._probe, sorted(dirty))
+            for path, info in sorted(changes.items()):
+                old = self._ports.get(path)
+                if info is None:
+                    if old is not None:
+                        del self._ports[path]
+                        self._events.put_nowait(PortEvent(REMOVED, old))
+                elif old is None:
+                    self._ports[path] = info
+                    self._events.put_nowait(PortEvent(ADDED, info))
+                else:
+                    self._ports[path] = info
+
+
+async def watch_ports(roots=None, poll_interval=1.0, executor=None):
+    """Return a started PortWatcher.
+
+    This function is a coroutine.
+    """
+    watcher = PortWatcher(roots, poll_interval=poll_interval, executor=executor)
+    await watcher.start()
+    return watcher
@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Protocols splitting received data into frames.
+#
+# This file is part of pySerial. https://github.com/pyserial/pyserial-asyncio
+# (C) 2015-2020 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Protocols that split the received byte stream into frames.
+
+All framers are asyncio protocols, to be passed to
+create_serial_connection() or connection_for_serial(). Frames are
+passed to frame_received(), which by default queues them for
+asynchronous iteration:
+
+    transport, frames = await serial_asyncio.create_serial_connection(
+        loop, LineFramer, '/dev/ttyUSB0', baudrate=115200)
+    async for frame in frames:
+        ...
+
+The delimiter and length based framers only scan data that was not
+scanned before, and keep the received data in a single bytearray that
+is compacted once the frames at its start were consumed.
+IdleGapFramer delimits frames by line silence, as Modbus RTU does.
+"""
+import asyncio
+import collections
+import time
+
+import serial_asyncio
+
+
+class Framer(asyncio.Protocol):
+    """Base class of the framing protocols.
+
+    frame_received() is called with every complete frame. The default
+    implementation queues the frames for ``async for frame in framer``,
+    which ends when the connection is lost, raising the exception the
+    connection was lost with, if any. Reading is paused while
+    max_queued_frames are waiting to be iterated.
+
+    checksum, a serial_asyncio.checksum.Checksum, is verified and
+    stripped from every frame received, frames with a wrong checksum
+    are dropped. write_frame() appends it to the frames sent. Frames
+    received, dropped as malformed and dropped as corrupt are also
+    counted in the TransportStats of a SerialTransport.
+    """
+
+    def __init__(self, max_frame_size=65536, max_queued_frames=1024, checksum=None):
+        self.transport = None
+        self.max_frame_size = max_frame_size
+        self.checksum = checksum
+        #: Number of frames dropped because they were malformed or too long
+        self.errors = 0
+        #: Number of frames dropped because of a wrong checksum
+        self.corrupt_frames = 0
+        self._stats = None
+        self._buffer = bytearray()
+        # Start of the next frame, and how far _buffer was scanned for its end
+        self._start = 0
+        self._scan = 0
+        self._frames = collections.deque()
+        self._max_queued_frames = max_queued_frames
+        self._reading_paused = False
+        self._waiter = None
+        self._connection_lost = False
+        self._exception = None
+        self._frame_handler = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self._stats = transport.get_extra_info('stats')
+
+    def data_received(self, data):
+        if self._exception is not None:
+            return
+        self._buffer += data
+        next_frame = self._next_frame
+        frame = next_frame()
+        while frame is not None:
+            self._frame_complete(frame)
+            frame = next_frame()
+        self._compact()
+
+    def connection_lost(self, exc):
+        if self._exception is None:
+            self._exception = exc
+        self._connection_lost = True
+        self._wake_waiter()
+        self.transport = None
+
+    def frame_received(self, frame):
+        """Called with every complete frame.
+
+        Passes the frame to the handler set with set_frame_handler(),
+        or queues it for iteration.
+        """
+        if self._frame_handler is not None:
+            self._frame_handler(frame)
+            return
+        self._frames.append(frame)
+        self._wake_waiter()
+        if len(self._frames) >= self._max_queued_frames and not self._reading_paused:
+            if self.transport is not None:
+                self.transport.pause_reading()
+                self._reading_paused = True
+
+    def set_frame_handler(self, handler):
+        """Pass complete frames to handler instead of queuing them."""
+        self._frame_handler = handler
+
+    def write_frame(self, payload):
+        """Encode payload as a frame and write it to the transport."""
+        if self.checksum is not None:
+            payload = self.checksum.append(payload)
+        self.transport.write(self.encode(payload))
+
+    @staticmethod
+    def encode(payload):
+        """Return payload encoded as a frame."""
+        raise NotImplementedError
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self._frames:
+            if self._exception is not None:
+                raise self._exception
+            if self._connection_lost:
+                raise StopAsyncIteration
+            self._waiter = asyncio.get_event_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        frame = self._frames.popleft()
+        if self._reading_paused and len(self._frames) <= self._max_queued_frames // 2:
+            self._reading_paused = False
+            if self.transport is not None:
+                self.transport.resume_reading()
+        return frame
+
+    def _frame_complete(self, frame):
+        """Verify the checksum of a complete frame and pass it on."""
+        if self.checksum is not None:
+            frame = self.checksum.strip(frame)
+            if frame is None:
+                self.corrupt_frames += 1
+                if self._stats is not None:
+                    self._stats.corrupt_frames += 1
+                return
+        if self._stats is not None:
+            self._stats.frames_received += 1
+        self.frame_received(frame)
+
+    def _frame_dropped(self):
+        self.errors += 1
+        if self._stats is not None:
+            self._stats.frames_dropped += 1
+
+    def _wake_waiter(self):
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def _next_frame(self):
+        """Remove the next complete frame from _buffer and return it.
+
+        Returns None if there is no complete frame yet.
+        """
+        raise NotImplementedError
+
+    def _compact(self):
+        """Drop the consumed data at the start of _buffer."""
+        start = self._start
+        if not start:
+            return
+        if start == len(self._buffer):
+            self._buffer.clear()
+        elif start > len(self._buffer) >> 1:
+            # Frames are usually consumed in one piece, moving the few
+            # bytes of the next partial frame is cheaper than letting
+            # the buffer grow
+            del self._buffer[:start]
+        else:
+            return
+        self._scan -= start
+        self._start = 0
+
+    def _fail(self, exc):
+        """Stop framing for an error the stream can not recover from."""
+        self._exception = exc
+        self._start = self._scan = len(self._buffer)
+        self._wake_waiter()
+        if self.transport is not None:
+            self.transport.abort()
+
+
+class _DelimitedFramer(Framer):
+    """Frames ending with a delimiter, with the payload decoded by decode()."""
+
+    delimiter = None
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._discarding = False
+
+    def _next_frame(self):
+        buffer = self._buffer
+        delimiter = self.delimiter
+        while True:
+            end = buffer.find(delimiter, self._scan)
+            if end < 0:
+                self._scan = max(self._start, len(buffer) - len(delimiter) + 1)
+                if len(buffer) - self._start > self.max_frame_size:
+                    # Drop everything up to the next delimiter
+                    self._frame_dropped()
+                    self._discarding = True
+                    self._start = self._scan = len(buffer)
+                return None
+            start = self._start
+            self._start = self._scan = end + len(delimiter)
+            if self._discarding:
+                self._discarding = False
+                continue
+            if end - start > self.max_frame_size:
+                self._frame_dropped()
+                continue
+            try:
+                frame = self.decode(buffer[start:end])
+            except ValueError:
+                self._frame_dropped()
+                continue
+            if frame is not None:
+                return frame
+
+    def decode(self, data):
+        """Decode the data between two delimiters.
+
+        Returns the frame, or None to skip it. Raises ValueError for
+        malformed frames, which are counted in errors and dropped.
+        """
+        return bytes(data)
+
+
+class LineFramer(_DelimitedFramer):
+    """Frames terminated by a delimiter, a newline by default.
+
+    Frames are passed on without the delimiter.
+    """
+
+    def __init__(self, delimiter=b'\n', **kwargs):
+        super().__init__(**kwargs)
+        self.delimiter = delimiter
+
+    def encode(self, payload):
+        return bytes(payload) + self.delimiter
+
+
+class SlipFramer(_DelimitedFramer):
+    """Serial Line Internet Protocol framing (RFC 1055).
+
+    Empty frames, as sent to flush line noise before a frame, are
+    skipped.
+    """
+
+    END = b'\xc0'
+    ESC = b'\xdb'
+    ESC_END = b'\xdb\xdc'
+    ESC_ESC = b'\xdb\xdd'
+
+    delimiter = END
+
+    def decode(self, data):
+        if not data:
+            return None
+        if self.ESC in data:
+            data = data.replace(self.ESC_END, self.END).replace(self.ESC_ESC, self.ESC)
+        return bytes(data)
+
+    @classmethod
+    def encode(cls, payload):
+        return cls.END + bytes(payload).replace(cls.ESC, cls.ESC_ESC).replace(cls.END, cls.ESC_END) + cls.END
+
+
+def cobs_encode(data):
+    """Consistent Overhead Byte Stuffing of data, without the trailing zero."""
+    out = bytearray()
+    blocks = bytes(data).split(b'\x00')
+    last = len(blocks) - 1
+    for i, block in enumerate(blocks):
+        nonempty = bool(block)
+        while len(block) >= 254:
+            out.append(0xff)
+            out += block[:254]
+            block = block[254:]
+        # A group of 254 bytes at the very end needs no empty group after it
+        if block or i != last or not nonempty:
+            out.append(len(block) + 1)
+            out += block
+    return bytes(out)
+
+
+def cobs_decode(data):
+    """Decode COBS encoded data, raises ValueError if it is malformed."""
+    out = bytearray()
+    position = 0
+    length = len(data)
+    while position < length:
+        code = data[position]
+        end = position + code
+        if code == 0 or end > length:
+            raise ValueError('invalid COBS data')
+        out += data[position + 1:end]
+        position = end
+        if code != 0xff and position < length:
+            out.append(0)
+    return bytes(out)
+
+
+class CobsFramer(_DelimitedFramer):
+    """Frames encoded with Consistent Overhead Byte Stuffing, ending with a zero byte.
+
+    Empty frames are skipped.
+    """
+
+    delimiter = b'\x00'
+
+    def decode(self, data):
+        if not data:
+            return None
+        return cobs_decode(data)
+
+    @staticmethod
+    def encode(payload):
+        return cobs_encode(payload) + b'\x00'
+
+
+class LengthPrefixFramer(Framer):
+    """Frames preceded by their length, an unsigned integer of prefix_size bytes.
+
+    The length counts the payload only. A length above max_frame_size
+    can not be recovered from, the connection is aborted and iteration
+    raises ValueError.
+    """
+
+    def __init__(self, prefix_size=2, byteorder='big', **kwargs):
+        super().__init__(**kwargs)
+        self.prefix_size = prefix_size
+        self.byteorder = byteorder
+
+    def _next_frame(self):
+        buffer = self._buffer
+        start = self._start + self.prefix_size
+        if len(buffer) < start:
+            return None
+        length = int.from_bytes(buffer[self._start:start], self.byteorder)
+        if length > self.max_frame_size:
+            self._fail(ValueError('frame of {} bytes exceeds max_frame_size'.format(length)))
+            return None
+        end = start + length
+        if len(buffer) < end:
+            return None
+        self._start = self._scan = end
+        return bytes(buffer[start:end])
+
+    def encode(self, payload):
+        return len(payload).to_bytes(self.prefix_size, self.byteorder) + bytes(payload)
+
+
+class FixedLengthFramer(Framer):
+    """Frames of frame_size bytes each."""
+
+    def __init__(self, frame_size, **kwargs):
+        super().__init__(**kwargs)
+        self.frame_size = frame_size
+
+    def _next_frame(self):
+        start = self._start
+        end = start + self.frame_size
+        if len(self._buffer) < end:
+            return None
+        self._start = self._scan = end
+        return bytes(self._buffer[start:end])
+
+    def encode(self, payload):
+        if len(payload) != self.frame_size:
+            raise ValueError('frames must be {} bytes long'.format(self.frame_size))
+        return bytes(payload)
+
+
+class IdleGapFramer(Framer):
+    """Protocol delimiting frames by a silent line, as in Modbus RTU.
+
+    A frame ends once no data was received for the idle gap, by default
+    3.5 character times at the port's baudrate, bytesize, parity and
+    stopbits, but no less than 1.75 ms, as the Modbus specification
+    requires for baudrates above 19200.
+
+    Gaps are measured between the receive timestamps the transport
+    takes right after each read, so a late event loop does not merge
+    frames that arrived apart. Only the end of the last frame depends
+    on the timer, a single one that is re-armed rather than replaced
+    for every chunk of data. Bytes the driver returns in a single read
+    can not be told apart, so the event loop must keep up with the
+    line for the gaps to be seen.
+    """
+
+    def __init__(self, gap=None, gap_characters=3.5, min_gap=0.00175, **kwargs):
+        super().__init__(**kwargs)
+        self._gap = gap
+        self._gap_characters = gap_characters
+        self._min_gap = min_gap
+        self._gap_ns = None
+        self._last_rx_time = None
+        self._timer = None
+        self._in_frame = False
+        self._discarding = False
+
+    @property
+    def gap(self):
+        """The idle gap ending a frame, in seconds."""
+        return self._gap_ns / 1e9
+
+    def connection_made(self, transport):
+        super().connection_made(transport)
+        gap = self._gap
+        if gap is None:
+            character_time = serial_asyncio._character_time(transport.get_extra_info('serial'))
+            gap = max(self._gap_characters * character_time, self._min_gap)
+        self._gap_ns = int(gap * 1e9)
+
+    @staticmethod
+    def encode(payload):
+        # The silence after a frame sent is up to the caller, e.g.
+        # waiting for drain_to_wire() and the gap before the next one
+        return bytes(payload)
+
+    def data_received(self, data):
+        # Used by transports that do not take receive timestamps
+        self.timed_data_received(data, time.monotonic_ns())
+
+    def timed_data_received(self, data, rx_time):
+        if self._in_frame and rx_time - self._last_rx_time >= self._gap_ns:
+            # The timer fired late, the line was idle in between
+            self._end_frame()
+        self._in_frame = True
+        self._last_rx_time = rx_time
+        if not self._discarding:
+            self._buffer += data
+            if len(self._buffer) > self.max_frame_size:
+                # Drop the frame, up to the next gap
+                self._frame_dropped()
+                self._discarding = True
+                self._buffer.clear()
+        if self._timer is None:
+            self._timer = asyncio.get_event_loop().call_later(self._gap_ns / 1e9, self._check_gap)
+
+    def connection_lost(self, exc):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._in_frame:
+            self._end_frame()
+        super().connection_lost(exc)
+
+    def _check_gap(self):
+        self._timer = None
+        if not self._in_frame:
+            return
+        remaining = self._last_rx_time + self._gap_ns - time.monotonic_ns()
+        if remaining > 0:
+            # Data arrived since the timer was armed
+            self._timer = asyncio.get_event_loop().call_later(remaining / 1e9, self._check_gap)
+        else:
+            self._end_frame()
+
+    def _end_frame(self):
+        self._in_frame = False
+        if self._discarding:
+            self._discarding = False
+            return
+        frame = bytes(self._buffer)
+        self._buffer.clear()
+        self._frame_complete(frame)
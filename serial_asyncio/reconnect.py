@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Connections reopening serial ports that were lost.
+#
+# This file is part of pySerial. https://github.com/pyserial/pyserial-asyncio
+# (C) 2015-2020 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Serial connections surviving the loss of the port, e.g. a USB adapter
+being unplugged and plugged in again.
+
+create_reconnecting_connection() works like create_serial_connection(),
+but the transport it returns outlives the SerialTransport of the port:
+when the port is lost it is reopened with jittered exponential backoff,
+and data written meanwhile is sent once it is back. On Linux, local
+devices are reopened as soon as their device node reappears, found out
+through inotify rather than by polling.
+
+The protocol sees connection_made() and connection_lost() once, as
+usual. If it has the methods, connection_interrupted(exc) is called
+when the port was lost and connection_resumed() when it was reopened.
+"""
+import asyncio
+import collections
+import os
+import random
+
+import serial
+
+import serial_asyncio
+from serial_asyncio import _inotify
+
+QUEUE_POLICIES = ('keep', 'drop')
+
+
+class _Relay(asyncio.Protocol):
+    """The protocol of one SerialTransport, relaying to the ReconnectingTransport."""
+
+    def __init__(self, owner):
+        self._owner = owner
+        self._protocol = owner._protocol
+        self._transport = None
+
+    def connection_made(self, transport):
+        self._transport = transport
+        self._owner._port_connected(transport)
+
+    def data_received(self, data):
+        self._protocol.data_received(data)
+
+    def pause_writing(self):
+        self._owner._port_paused(True)
+
+    def resume_writing(self):
+        self._owner._port_paused(False)
+
+    def connection_lost(self, exc):
+        self._owner._port_lost(self._transport, exc)
+
+
+class _TimedRelay(_Relay):
+
+    def timed_data_received(self, data, rx_time):
+        self._protocol.timed_data_received(data, rx_time)
+
+
+class _BufferedRelay(_Relay, asyncio.BufferedProtocol):
+
+    def get_buffer(self, sizehint):
+        return self._protocol.get_buffer(sizehint)
+
+    def buffer_updated(self, nbytes):
+        self._protocol.buffer_updated(nbytes)
+
+
+class ReconnectingTransport(asyncio.Transport):
+    """A transport reopening its serial port whenever it is lost.
+
+    Create instances with create_reconnecting_connection().
+
+    reconnects counts how often the port was reopened, dropped_bytes
+    the written bytes discarded while the port was gone.
+    """
+
+    def __init__(self, loop, protocol, url, args, kwargs, initial_delay=0.05, max_delay=5.0, jitter=0.5,
+                 max_attempts=None, watch_device=True, queue_policy='keep', max_queued=64 * 1024):
+        super().__init__()
+        if queue_policy not in QUEUE_POLICIES:
+            raise ValueError('queue_policy must be one of {}, not {!r}'.format(QUEUE_POLICIES, queue_policy))
+        self._loop = loop
+        self._protocol = protocol
+        self._url = url
+        self._args = args
+        self._kwargs = kwargs
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.max_attempts = max_attempts
+        self.queue_policy = queue_policy
+        self.max_queued = max_queued
+        self._device_path = url if watch_device and serial_asyncio._is_local_device(url) else None
+        if isinstance(protocol, asyncio.BufferedProtocol):
+            self._relay_class = _BufferedRelay
+        elif hasattr(protocol, 'timed_data_received'):
+            self._relay_class = _TimedRelay
+        else:
+            self._relay_class = _Relay
+        self.reconnects = 0
+        self.dropped_bytes = 0
+        self._transport = None
+        self._connected_once = False
+        self._closing = False
+        self._protocol_lost = False
+        self._reconnect_task = None
+        self._queue = collections.deque()
+        self._queued = 0
+        self._reading_paused = False
+        self._write_buffer_limits = None
+        self._protocol_paused = False
+        self._port_writing_paused = False
+        self._lost_time = None
+
+    @property
+    def loop(self):
+        """The asyncio event loop used by this transport."""
+        return self._loop
+
+    @property
+    def serial(self):
+        """The Serial instance of the open port, or None while it is gone."""
+        return None if self._transport is None else self._transport.serial
+
+    def is_connected(self):
+        """True while the port is open."""
+        return self._transport is not None
+
+    def get_extra_info(self, name, default=None):
+        """Get optional transport information.
+
+        Names of the current SerialTransport are available while the
+        port is open, and "reconnects" always.
+        """
+        if name == 'reconnects':
+            return self.reconnects
+        if self._transport is None:
+            return default
+        return self._transport.get_extra_info(name, default)
+
+    def is_closing(self):
+        return self._closing
+
+    def close(self):
+        """Close the port, sending buffered data first, and stop reconnecting."""
+        self._shut_down(abort=False)
+
+    def abort(self):
+        """Close the port at once and stop reconnecting."""
+        self._shut_down(abort=True)
+
+    def write(self, data, priority=0):
+        """Write data to the port, or queue it while the port is gone.
+
+        Queued data is sent when the port was reopened, if queue_policy
+        is "keep", at most max_queued bytes of it, dropping the oldest.
+        With "drop" it is discarded.
+        """
+        if self._closing:
+            return
+        if self._transport is not None:
+            self._transport.write(data, priority)
+            return
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            raise TypeError('data argument must be a bytes-like object, '
+                            'not {!r}'.format(type(data).__name__))
+        self._enqueue([bytes(data)])
+
+    def can_write_eof(self):
+        return False
+
+    def pause_reading(self):
+        self._reading_paused = True
+        if self._transport is not None:
+            self._transport.pause_reading()
+
+    def resume_reading(self):
+        self._reading_paused = False
+        if self._transport is not None:
+            self._transport.resume_reading()
+
+    def is_reading(self):
+        return not self._reading_paused and not self._closing
+
+    def set_write_buffer_limits(self, high=None, low=None):
+        self._write_buffer_limits = (high, low)
+        if self._transport is not None:
+            self._transport.set_write_buffer_limits(high, low)
+
+    def get_write_buffer_size(self):
+        """Bytes buffered by the open port or queued while it is gone."""
+        size = self._queued
+        if self._transport is not None:
+            size += self._transport.get_write_buffer_size()
+        return size
+
+    def _enqueue(self, chunks):
+        if self.queue_policy == 'drop':
+            self.dropped_bytes += sum(len(chunk) for chunk in chunks)
+            return
+        queue = self._queue
+        for chunk in chunks:
+            queue.append(chunk)
+            self._queued += len(chunk)
+        while self._queued > self.max_queued:
+            dropped = queue.popleft()
+            self._queued -= len(dropped)
+            self.dropped_bytes += len(dropped)
+
+    async def _connect(self):
+        await serial_asyncio.create_serial_connection(
+            self._loop, lambda: self._relay_class(self), self._url, *self._args, **self._kwargs)
+
+    def _port_connected(self, transport):
+        if self._closing:
+            transport.abort()
+            return
+        self._transport = transport
+        self._port_writing_paused = False
+        if self._write_buffer_limits is not None:
+            transport.set_write_buffer_limits(*self._write_buffer_limits)
+        if self._reading_paused:
+            transport.pause_reading()
+        queue, self._queue = self._queue, collections.deque()
+        self._queued = 0
+        for chunk in queue:
+            transport.write(chunk)
+        if not self._connected_once:
+            self._connected_once = True
+            self._protocol.connection_made(self)
+        else:
+            self.reconnects += 1
+            connection_resumed = getattr(self._protocol, 'connection_resumed', None)
+            if connection_resumed is not None:
+                connection_resumed()
+        if self._protocol_paused and not self._port_writing_paused:
+            self._protocol_paused = False
+            self._protocol.resume_writing()
+
+    def _port_paused(self, paused):
+        self._port_writing_paused = paused
+        if paused != self._protocol_paused:
+            self._protocol_paused = paused
+            if paused:
+                self._protocol.pause_writing()
+            else:
+                self._protocol.resume_writing()
+
+    def _port_lost(self, transport, exc):
+        if transport is not self._transport:
+            return
+        self._transport = None
+        if self._closing:
+            self._call_connection_lost(exc)
+            return
+        self._enqueue(transport._unsent_chunks())
+        self._lost_time = self._loop.time()
+        connection_interrupted = getattr(self._protocol, 'connection_interrupted', None)
+        if connection_interrupted is not None:
+            connection_interrupted(exc)
+        if not self._closing:
+            self._reconnect_task = self._loop.create_task(self._reconnect())
+
+    def _shut_down(self, abort):
+        if self._closing:
+            return
+        self._closing = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        self._queue.clear()
+        self._queued = 0
+        if self._transport is not None:
+            if abort:
+                self._transport.abort()
+            else:
+                self._transport.close()
+        else:
+            self._loop.call_soon(self._call_connection_lost, None)
+
+    def _call_connection_lost(self, exc):
+        if not self._protocol_lost:
+            self._protocol_lost = True
+            self._protocol.connection_lost(exc)
+
+    async def _reconnect(self):
+        """Reopen the port, waiting longer after every failed attempt."""
+        delay = self.initial_delay
+        attempts = 0
+        while True:
+            await self._wait_for_device(delay * (1 - self.jitter * random.random()))
+            attempts += 1
+            try:
+                await self._connect()
+            except (serial.SerialException, OSError) as exc:
+                if self.max_attempts is not None and attempts >= self.max_attempts:
+                    self._give_up(exc)
+                    return
+                delay = min(delay * 2, self.max_delay)
+            except Exception as exc:
+                # Not a missing device, e.g. settings the new driver
+                # rejects; retrying will not help
+                self._give_up(exc)
+                return
+            else:
+                self._reconnect_task = None
+                return
+
+    def _give_up(self, exc):
+        self._reconnect_task = None
+        self._closing = True
+        self._queue.clear()
+        self._queued = 0
+        self._call_connection_lost(exc)
+
+    async def _wait_for_device(self, timeout):
+        """Wait timeout seconds, or less if the device node appears.
+
+        Without inotify, for URLs and for devices whose node is still
+        there, this simply sleeps.
+        """
+        path = self._device_path
+        if path is None or not _inotify.available() or os.path.exists(path):
+            await asyncio.sleep(timeout)
+            return
+        try:
+            inotify = _inotify.Inotify()
+        except OSError:
+            await asyncio.sleep(timeout)
+            return
+        loop = self._loop
+        name = os.path.basename(path)
+        appeared = loop.create_future()
+
+        def read_events():
+            for _, _, event_name in inotify.read():
+                if event_name == name and not appeared.done():
+                    appeared.set_result(None)
+
+        try:
+            inotify.add_watch(os.path.dirname(path) or '.',
+                              _inotify.IN_CREATE | _inotify.IN_MOVED_TO | _inotify.IN_ATTRIB | _inotify.IN_ONLYDIR)
+        except OSError:
+            # The directory is gone as well, e.g. /dev/serial/by-id
+            inotify.close()
+            await asyncio.sleep(timeout)
+            return
+        loop.add_reader(inotify.fd, read_events)
+        try:
+            # It may have appeared before the watch was in place
+            if not os.path.exists(path):
+                await asyncio.wait_for(appeared, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            loop.remove_reader(inotify.fd)
+            inotify.close()
+
+
+async def create_reconnecting_connection(loop, protocol_factory, url, *args, initial_delay=0.05, max_delay=5.0,
+                                         jitter=0.5, max_attempts=None, watch_device=True, queue_policy='keep',
+                                         max_queued=64 * 1024, **kwargs):
+    """Open a serial port that is reopened whenever it is lost.
+
+    After a loss the port is reopened after initial_delay seconds,
+    doubling the delay after each failed attempt up to max_delay. Each
+    delay is shortened by a random fraction of up to jitter, so that
+    many ports lost at once are not all reopened at once. After
+    max_attempts failed attempts, if not None, the protocol's
+    connection_lost() is called with the last error. Errors other than
+    SerialException and OSError end the connection the same way right
+    away.
+
+    With watch_device, local devices are reopened as soon as the device
+    node is created again, where inotify is available.
+
+    queue_policy decides what happens to the data written while the
+    port is gone, including what the lost port had not sent yet: "keep"
+    sends it after reopening, up to max_queued bytes, "drop" discards
+    it.
+
+    The remaining arguments are passed to create_serial_connection().
+    The first attempt to open the port raises its error. Returns a
+    (ReconnectingTransport, protocol) pair.
+
+    This function is a coroutine.
+    """
+    protocol = protocol_factory()
+    transport = ReconnectingTransport(
+        loop, protocol, url, args, kwargs, initial_delay=initial_delay, max_delay=max_delay, jitter=jitter,
+        max_attempts=max_attempts, watch_device=watch_device, queue_policy=queue_policy, max_queued=max_queued)
+    await transport._connect()
+    return transport, protocol
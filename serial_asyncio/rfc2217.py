@@ -0,0 +1,603 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# RFC 2217 client ports for the event loop.
+#
+# This file is part of pySerial. https://github.com/pyserial/pyserial-asyncio
+# (C) 2015-2020 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+RFC 2217 (Telnet Com Port Control) client ports served by SerialTransport.
+
+pySerial's rfc2217:// handler runs a reader thread per port and waits
+for the server's answers blocking. create_serial_connection() opens
+rfc2217:// URLs with the Serial class of this module instead: the
+connection and the option negotiation are done by the event loop, and
+the Telnet stream is decoded as the transport reads it, so the port
+needs no thread at all.
+
+    transport, protocol = await serial_asyncio.create_serial_connection(
+        loop, MyProtocol, 'rfc2217://terminal-server:4001', baudrate=115200)
+
+Changing a setting of the open port, e.g. transport.serial.baudrate,
+sends the request without waiting for the server to confirm it;
+Serial.wait_settings() waits for that.
+"""
+import asyncio
+import re
+import struct
+import urllib.parse
+
+import serial
+
+import serial_asyncio
+
+try:
+    import fcntl
+    import termios
+except ImportError:
+    fcntl = termios = None
+
+# Telnet commands
+SE = 240
+NOP = 241
+SB = 250
+WILL = 251
+WONT = 252
+DO = 253
+DONT = 254
+IAC = 255
+
+# Telnet options
+BINARY = 0
+ECHO = 1
+SGA = 3
+COM_PORT_OPTION = 44
+
+# Com port option commands of the client, the server answers with the
+# command plus SERVER_OFFSET
+SET_BAUDRATE = 1
+SET_DATASIZE = 2
+SET_PARITY = 3
+SET_STOPSIZE = 4
+SET_CONTROL = 5
+NOTIFY_LINESTATE = 6
+NOTIFY_MODEMSTATE = 7
+FLOWCONTROL_SUSPEND = 8
+FLOWCONTROL_RESUME = 9
+SET_LINESTATE_MASK = 10
+SET_MODEMSTATE_MASK = 11
+PURGE_DATA = 12
+SERVER_OFFSET = 100
+
+SET_CONTROL_USE_NO_FLOW_CONTROL = 1
+SET_CONTROL_USE_SW_FLOW_CONTROL = 2
+SET_CONTROL_USE_HW_FLOW_CONTROL = 3
+SET_CONTROL_BREAK_ON = 5
+SET_CONTROL_BREAK_OFF = 6
+SET_CONTROL_DTR_ON = 8
+SET_CONTROL_DTR_OFF = 9
+SET_CONTROL_RTS_ON = 11
+SET_CONTROL_RTS_OFF = 12
+
+PURGE_RECEIVE_BUFFER = 1
+PURGE_TRANSMIT_BUFFER = 2
+
+MODEMSTATE_MASK_CTS = 0x10
+MODEMSTATE_MASK_DSR = 0x20
+MODEMSTATE_MASK_RI = 0x40
+MODEMSTATE_MASK_CD = 0x80
+
+RFC2217_PARITY_MAP = {
+    serial.PARITY_NONE: 1,
+    serial.PARITY_ODD: 2,
+    serial.PARITY_EVEN: 3,
+    serial.PARITY_MARK: 4,
+    serial.PARITY_SPACE: 5,
+}
+
+RFC2217_STOPBIT_MAP = {
+    serial.STOPBITS_ONE: 1,
+    serial.STOPBITS_TWO: 2,
+    serial.STOPBITS_ONE_POINT_FIVE: 3,
+}
+
+# Options this client agrees to enable, on its side and on the server's
+_LOCAL_OPTIONS = frozenset((BINARY, SGA, COM_PORT_OPTION))
+_REMOTE_OPTIONS = frozenset((BINARY, SGA, ECHO))
+
+_SETTING_NAMES = {
+    SET_BAUDRATE: 'baudrate',
+    SET_DATASIZE: 'datasize',
+    SET_PARITY: 'parity',
+    SET_STOPSIZE: 'stopsize',
+    SET_CONTROL: 'control',
+}
+
+_IAC_BYTE = bytes((IAC,))
+_IAC_PATTERN = re.compile(re.escape(_IAC_BYTE))
+
+# States of the Telnet decoder
+_DATA, _COMMAND, _OPTION, _SUBNEGOTIATION, _SUBNEGOTIATION_COMMAND = range(5)
+
+
+def escape(data):
+    """Return data with every IAC byte doubled, as Telnet requires."""
+    return bytes(data).replace(_IAC_BYTE, _IAC_BYTE * 2)
+
+
+class Serial(serial_asyncio._SocketSerial):
+    """An RFC 2217 port on a socket connected by the event loop.
+
+    Received data is decoded incrementally: chunks without IAC bytes
+    are passed on as they are, others are split at the IAC bytes only.
+    Written data is escaped with a single bytes.replace() when it
+    contains IAC bytes, and sent as is otherwise.
+
+    The URL options are those of pySerial's handler, ign_set_control
+    and timeout, the seconds to wait for the server during open().
+    poll_modem and logging are accepted and ignored; the modem lines
+    reflect the server's notifications.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._state = _DATA
+        self._command = None
+        self._suboption = bytearray()
+        self._local_requested = set()
+        self._local_active = set()
+        self._remote_requested = set()
+        self._remote_active = set()
+        self._refused = set()
+        self._tx_pending = bytearray()
+        self._flush_handle = None
+        self._loop = None
+        self._sent_settings = {}
+        self._unconfirmed = {}
+        self._settings_error = None
+        self._settings_waiters = []
+        self._modemstate = 0
+        self._linestate = 0
+        self._remote_suspend_flow = False
+        self._ignore_set_control_answer = False
+        self._network_timeout = 3
+        super().__init__(*args, **kwargs)
+
+    def from_url(self, url):
+        """Extract host and port from a rfc2217:// URL."""
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme != 'rfc2217':
+            raise serial.SerialException(
+                'expected a string in the form '
+                '"rfc2217://<host>:<port>[?option[&option...]]": '
+                'not starting with rfc2217:// ({!r})'.format(parts.scheme))
+        try:
+            for option, values in urllib.parse.parse_qs(parts.query, True).items():
+                if option == 'ign_set_control':
+                    self._ignore_set_control_answer = True
+                elif option == 'timeout':
+                    self._network_timeout = float(values[0])
+                elif option not in ('poll_modem', 'logging'):
+                    raise ValueError('unknown option: {!r}'.format(option))
+            if not 0 <= parts.port < 65536:
+                raise ValueError('port not in range 0...65535')
+        except (ValueError, TypeError) as e:
+            raise serial.SerialException(
+                'expected a string in the form '
+                '"rfc2217://<host>:<port>[?option[&option...]]": {}'.format(e))
+        return (parts.hostname, parts.port)
+
+    async def _start(self, loop, sock):
+        """Negotiate the Telnet options and port settings on sock.
+
+        Data received before the settings were confirmed is discarded,
+        as pySerial's handler purges it as well.
+        """
+        self._loop = loop
+        self._socket = sock
+        self.is_open = True
+        try:
+            for option in sorted(_LOCAL_OPTIONS):
+                self._local_requested.add(option)
+                self._send_command(WILL, option)
+            for option in sorted(_REMOTE_OPTIONS):
+                self._remote_requested.add(option)
+                self._send_command(DO, option)
+            deadline = loop.time() + self._network_timeout
+            await self._receive_until(lambda: COM_PORT_OPTION in self._local_active, deadline)
+            self._reconfigure_port()
+            if not self._dsrdtr:
+                self._update_dtr_state()
+            if not self._rtscts:
+                self._update_rts_state()
+            self._send_subnegotiation(PURGE_DATA, bytes((PURGE_RECEIVE_BUFFER,)))
+            await self._receive_until(lambda: not self._unconfirmed, deadline)
+        except BaseException:
+            self.close()
+            raise
+
+    async def _receive_until(self, condition, deadline):
+        """Decode received data until condition() is true."""
+        loop = self._loop
+        while True:
+            if COM_PORT_OPTION in self._refused:
+                raise serial.SerialException('Remote does not support RFC 2217 (COM_PORT_OPTION refused)')
+            if self._settings_error is not None:
+                raise self._settings_error
+            if condition():
+                return
+            self._flush_tx()
+            try:
+                data = await asyncio.wait_for(loop.sock_recv(self._socket, 4096), deadline - loop.time())
+            except asyncio.TimeoutError:
+                raise serial.SerialException(
+                    'Remote did not answer the RFC 2217 negotiation within {} s'.format(self._network_timeout))
+            except OSError as e:
+                raise serial.SerialException('read failed: {}'.format(e))
+            if not data:
+                raise serial.SerialException('connection closed by the remote during negotiation')
+            self._decode(data)
+
+    async def wait_settings(self, timeout=None):
+        """Wait until the server confirmed all settings made so far.
+
+        This method is a coroutine. serial.SerialException is raised if
+        the server applied different settings.
+        """
+        if self._settings_error is not None:
+            error, self._settings_error = self._settings_error, None
+            raise error
+        if not self._unconfirmed:
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._settings_waiters.append(waiter)
+        await asyncio.wait_for(waiter, timeout)
+
+    # - - - data - - -
+
+    def read(self, size=1):
+        """Read and decode up to size bytes of what the server sent.
+
+        Returns b'' if the data contained only Telnet commands. Raises
+        BlockingIOError if the socket has no data.
+        """
+        if not self.is_open:
+            raise serial.PortNotOpenError()
+        try:
+            data = self._socket.recv(size)
+        except (BlockingIOError, InterruptedError):
+            raise
+        except OSError as e:
+            raise serial.SerialException('read failed: {}'.format(e))
+        if not data:
+            raise serial.SerialException('connection closed by the remote')
+        return self._decode(data)
+
+    def write(self, data):
+        """Send data, returns how many of its bytes were sent.
+
+        Nothing is sent while Telnet commands are still waiting for the
+        socket.
+        """
+        if not self.is_open:
+            raise serial.PortNotOpenError()
+        if self._tx_pending and not self._flush_tx():
+            return 0
+        view = memoryview(data).cast('B')
+        if _IAC_PATTERN.search(view) is None:
+            return self._send(view)
+        escaped = escape(view)
+        n = self._send(escaped)
+        # Every IAC of the data was doubled: the data sent is n minus
+        # one byte per pair, and an IAC cut off from its pair is
+        # completed before anything else is sent, even if nothing else
+        # is written.
+        iacs = escaped.count(_IAC_BYTE, 0, n)
+        if iacs % 2:
+            self._send_raw(_IAC_BYTE)
+        return n - iacs // 2
+
+    def _send(self, data):
+        try:
+            return self._socket.send(data)
+        except (BlockingIOError, InterruptedError):
+            return 0
+        except OSError as e:
+            raise serial.SerialException('write failed: {}'.format(e))
+
+    def _send_raw(self, data):
+        """Send Telnet commands, queueing what the socket does not accept."""
+        if not self._tx_pending:
+            data = memoryview(data)[self._send(data):]
+        self._tx_pending += data
+        if self._tx_pending and self._flush_handle is None and self._loop is not None:
+            # The transport only writes when it has data of its own
+            self._flush_handle = self._loop.call_later(0.01, self._retry_flush)
+
+    def _flush_tx(self):
+        """Send queued Telnet commands, True if none are left."""
+        if self._tx_pending:
+            del self._tx_pending[:self._send(self._tx_pending)]
+        return not self._tx_pending
+
+    def _retry_flush(self):
+        self._flush_handle = None
+        if self.is_open and not self._flush_tx():
+            self._flush_handle = self._loop.call_later(0.01, self._retry_flush)
+
+    @property
+    def in_waiting(self):
+        if not self.is_open:
+            raise serial.PortNotOpenError()
+        if fcntl is None:
+            return super().in_waiting
+        # Bytes in the socket, Telnet commands included
+        try:
+            return struct.unpack('I', fcntl.ioctl(self._socket.fileno(), termios.FIONREAD, b'\0' * 4))[0]
+        except OSError as e:
+            raise serial.SerialException('in_waiting failed: {}'.format(e))
+
+    @property
+    def out_waiting(self):
+        return super().out_waiting + len(self._tx_pending)
+
+    def reset_input_buffer(self):
+        """Ask the server to purge its receive buffer and drop what was received."""
+        if not self.is_open:
+            raise serial.PortNotOpenError()
+        self._send_subnegotiation(PURGE_DATA, bytes((PURGE_RECEIVE_BUFFER,)))
+        while True:
+            try:
+                data = self._socket.recv(4096)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                raise serial.SerialException('read failed: {}'.format(e))
+            if not data:
+                return
+            self._decode(data)
+
+    def reset_output_buffer(self):
+        """Ask the server to purge its transmit buffer."""
+        if not self.is_open:
+            raise serial.PortNotOpenError()
+        self._send_subnegotiation(PURGE_DATA, bytes((PURGE_TRANSMIT_BUFFER,)))
+
+    def close(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self.is_open and self._tx_pending:
+            self._flush_tx()
+        for waiter in self._settings_waiters:
+            if not waiter.done():
+                waiter.set_exception(serial.PortNotOpenError())
+        self._settings_waiters = []
+        super().close()
+
+    # - - - Telnet decoder - - -
+
+    def _decode(self, data):
+        """Process Telnet commands in data and return the data bytes in it."""
+        if self._state == _DATA and _IAC_BYTE not in data:
+            return data
+        view = memoryview(data)
+        out = bytearray()
+        i = 0
+        end = len(data)
+        while i < end:
+            state = self._state
+            if state == _DATA:
+                j = data.find(_IAC_BYTE, i)
+                if j < 0:
+                    out += view[i:]
+                    break
+                out += view[i:j]
+                i = j + 1
+                self._state = _COMMAND
+            elif state == _SUBNEGOTIATION:
+                j = data.find(_IAC_BYTE, i)
+                if j < 0:
+                    self._suboption += view[i:]
+                    break
+                self._suboption += view[i:j]
+                i = j + 1
+                self._state = _SUBNEGOTIATION_COMMAND
+            else:
+                byte = data[i]
+                i += 1
+                if state == _COMMAND:
+                    if byte == IAC:
+                        out.append(IAC)
+                        self._state = _DATA
+                    elif byte in (DO, DONT, WILL, WONT):
+                        self._command = byte
+                        self._state = _OPTION
+                    elif byte == SB:
+                        del self._suboption[:]
+                        self._state = _SUBNEGOTIATION
+                    else:
+                        # NOP, GA and the like carry no meaning here
+                        self._state = _DATA
+                elif state == _OPTION:
+                    self._state = _DATA
+                    self._negotiate(self._command, byte)
+                else:
+                    if byte == IAC:
+                        self._suboption.append(IAC)
+                        self._state = _SUBNEGOTIATION
+                    else:
+                        # SE, or a malformed subnegotiation ended by
+                        # another command
+                        self._state = _DATA
+                        self._subnegotiation(bytes(self._suboption))
+        return bytes(out)
+
+    def _negotiate(self, command, option):
+        """Answer a Telnet option command, without answering answers."""
+        if command == DO or command == DONT:
+            accepted, requested, active, yes, no = (
+                _LOCAL_OPTIONS, self._local_requested, self._local_active, WILL, WONT)
+        else:
+            accepted, requested, active, yes, no = (
+                _REMOTE_OPTIONS, self._remote_requested, self._remote_active, DO, DONT)
+        if command == DO or command == WILL:
+            if option not in accepted:
+                self._send_command(no, option)
+            elif option not in active:
+                active.add(option)
+                if option not in requested:
+                    self._send_command(yes, option)
+                requested.discard(option)
+        else:
+            was_active = option in active
+            if option in requested:
+                self._refused.add(option)
+            active.discard(option)
+            requested.discard(option)
+            if was_active:
+                self._send_command(no, option)
+
+    def _subnegotiation(self, suboption):
+        if len(suboption) < 2 or suboption[0] != COM_PORT_OPTION:
+            return
+        command = suboption[1] - SERVER_OFFSET
+        value = suboption[2:]
+        if command == NOTIFY_MODEMSTATE:
+            if value:
+                self._modemstate = value[0]
+        elif command == NOTIFY_LINESTATE:
+            if value:
+                self._linestate = value[0]
+        elif command == FLOWCONTROL_SUSPEND:
+            self._remote_suspend_flow = True
+        elif command == FLOWCONTROL_RESUME:
+            self._remote_suspend_flow = False
+        elif command in self._unconfirmed:
+            requested = self._unconfirmed.pop(command)
+            if value != requested and command != SET_CONTROL:
+                self._settings_error = serial.SerialException(
+                    'Remote does not accept parameter change ({}): {!r}'.format(
+                        _SETTING_NAMES[command], value))
+            if not self._unconfirmed or self._settings_error is not None:
+                self._wake_settings_waiters()
+
+    def _wake_settings_waiters(self):
+        error, waiters = self._settings_error, self._settings_waiters
+        self._settings_waiters = []
+        if error is not None and waiters:
+            self._settings_error = None
+        for waiter in waiters:
+            if not waiter.done():
+                if error is None:
+                    waiter.set_result(None)
+                else:
+                    waiter.set_exception(error)
+
+    def _send_command(self, command, option):
+        self._send_raw(bytes((IAC, command, option)))
+
+    def _send_subnegotiation(self, command, value):
+        self._send_raw(b''.join((bytes((IAC, SB, COM_PORT_OPTION, command)), escape(value),
+                                 bytes((IAC, SE)))))
+
+    # - - - port settings - - -
+
+    def _set(self, command, value, confirmed=True):
+        """Send a setting unless the server has it already."""
+        if self._sent_settings.get(command) == value:
+            return
+        self._sent_settings[command] = value
+        if confirmed:
+            self._unconfirmed[command] = value
+        self._send_subnegotiation(command, value)
+
+    def _reconfigure_port(self):
+        """Send the settings that changed to the server.
+
+        Called by pySerial whenever a setting is assigned, the timeouts
+        included, so unchanged settings are not sent again.
+        """
+        if self._socket is None:
+            raise serial.SerialException('Can only operate on open ports')
+        if not 0 < self._baudrate < 2 ** 32:
+            raise ValueError('invalid baudrate: {!r}'.format(self._baudrate))
+        self._set(SET_BAUDRATE, struct.pack('!I', self._baudrate))
+        self._set(SET_DATASIZE, bytes((self._bytesize,)))
+        self._set(SET_PARITY, bytes((RFC2217_PARITY_MAP[self._parity],)))
+        self._set(SET_STOPSIZE, bytes((RFC2217_STOPBIT_MAP[self._stopbits],)))
+        if self._rtscts:
+            flow = SET_CONTROL_USE_HW_FLOW_CONTROL
+        elif self._xonxoff:
+            flow = SET_CONTROL_USE_SW_FLOW_CONTROL
+        else:
+            flow = SET_CONTROL_USE_NO_FLOW_CONTROL
+        self._set(SET_CONTROL, bytes((flow,)), confirmed=not self._ignore_set_control_answer)
+
+    def _set_control(self, value):
+        # The answer to SET_CONTROL is not awaited, servers differ in
+        # what they answer
+        self._send_subnegotiation(SET_CONTROL, bytes((value,)))
+
+    def _update_break_state(self):
+        if not self.is_open:
+            raise serial.PortNotOpenError()
+        self._set_control(SET_CONTROL_BREAK_ON if self._break_state else SET_CONTROL_BREAK_OFF)
+
+    def _update_rts_state(self):
+        if not self.is_open:
+            raise serial.PortNotOpenError()
+        self._set_control(SET_CONTROL_RTS_ON if self._rts_state else SET_CONTROL_RTS_OFF)
+
+    def _update_dtr_state(self):
+        if not self.is_open:
+            raise serial.PortNotOpenError()
+        self._set_control(SET_CONTROL_DTR_ON if self._dtr_state else SET_CONTROL_DTR_OFF)
+
+    @property
+    def cts(self):
+        if not self.is_open:
+            raise serial.PortNotOpenError()
+        return bool(self._modemstate & MODEMSTATE_MASK_CTS)
+
+    @property
+    def dsr(self):
+        if not self.is_open:
+            raise serial.PortNotOpenError()
+        return bool(self._modemstate & MODEMSTATE_MASK_DSR)
+
+    @property
+    def ri(self):
+        if not self.is_open:
+            raise serial.PortNotOpenError()
+        return bool(self._modemstate & MODEMSTATE_MASK_RI)
+
+    @property
+    def cd(self):
+        if not self.is_open:
+            raise serial.PortNotOpenError()
+        return bool(self._modemstate & MODEMSTATE_MASK_CD)
+
+    def get_modem_state(self):
+        """The last modem state notified by the server, as a bit mask."""
+        return self._modemstate
+
+
+async def open_port(loop, url, *args, **kwargs):
+    """Connect to an RFC 2217 server and negotiate the port settings.
+
+    Returns an open Serial instance. The remaining arguments are those
+    of serial.Serial, the socket options of socket:// URLs are supported
+    as well.
+
+    This function is a coroutine.
+    """
+    url, nodelay, keepalive = serial_asyncio._socket_options(url)
+    kwargs.pop('do_not_open', None)
+    port = Serial(None, *args, **kwargs)
+    port.port = url
+    host, port_number = port.from_url(url)
+    sock = await serial_asyncio._connect_socket(loop, url, host, port_number, nodelay, keepalive)
+    await port._start(loop, sock)
+    return port
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Share one serial port with several TCP clients.
+#
+# This file is part of pySerial. https://github.com/pyserial/pyserial-asyncio
+# (C) 2015-2020 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+A TCP server sharing one serial port with several clients.
+
+Everything received from the port is sent to every connected client,
+and what clients send is written to the port. The received chunks are
+immutable bytes objects shared by all clients: a client that keeps up
+sends them straight from the socket, one that falls behind queues
+references to them, never copies, up to client_buffer_size bytes. What
+happens when a client exceeds that is chosen by drop_policy:
+
+- "disconnect" closes the client's connection (the default)
+- "drop-oldest" discards the oldest queued data to make room
+- "drop-newest" discards the new data
+
+write_policy arbitrates the writes to the port: "all" clients may
+write, the data of each client read is written as one piece, only the
+"first", i.e. longest connected, client may write, or "none" for a
+read-only server. While the port does not accept more data, reading
+from the clients is paused.
+
+    server = await serial_asyncio.server.start_server('/dev/ttyUSB0', '0.0.0.0', 7000, baudrate=115200)
+    await server.wait_closed()
+
+The module can be run as a program as well:
+
+    $ python -m serial_asyncio.server /dev/ttyUSB0 --port 7000 --baudrate 115200
+"""
+import argparse
+import asyncio
+import collections
+import sys
+
+import serial
+
+import serial_asyncio
+
+DROP_POLICIES = ('disconnect', 'drop-oldest', 'drop-newest')
+WRITE_POLICIES = ('all', 'first', 'none')
+
+
+class FanoutClient(asyncio.Protocol):
+    """A TCP client of a FanoutServer.
+
+    bytes_sent counts the bytes handed to the connection, bytes_dropped
+    those discarded by the drop policy and bytes_rejected those the
+    write policy did not pass on to the port.
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.peername = None
+        self.bytes_sent = 0
+        self.bytes_dropped = 0
+        self.bytes_rejected = 0
+        self._queue = collections.deque()
+        self._queued = 0
+        self._paused = False
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.peername = transport.get_extra_info('peername')
+        # Keep asyncio's own buffer, which copies, small: data beyond it
+        # waits in the queue of shared chunks.
+        transport.set_write_buffer_limits(high=self.server.client_write_limit)
+        self.server._client_connected(self)
+
+    def data_received(self, data):
+        self.server._client_data_received(self, data)
+
+    def connection_lost(self, exc):
+        self._queue.clear()
+        self._queued = 0
+        self.server._client_lost(self)
+
+    def pause_writing(self):
+        self._paused = True
+
+    def resume_writing(self):
+        self._paused = False
+        queue = self._queue
+        while queue and not self._paused:
+            chunk = queue.popleft()
+            self._queued -= len(chunk)
+            self._write(chunk)
+
+    def close(self):
+        """Close the connection once the queued data was sent."""
+        if self.transport is None or self.transport.is_closing():
+            return
+        # asyncio buffers what the socket does not take
+        while self._queue:
+            self._write(self._queue.popleft())
+        self._queued = 0
+        self.transport.close()
+
+    def get_queued_size(self):
+        """Bytes waiting in the queue of this client."""
+        return self._queued
+
+    def send(self, chunk):
+        """Send a received chunk, queueing it if the client is behind."""
+        if self.transport is None or self.transport.is_closing():
+            return
+        if not self._paused and not self._queue:
+            self._write(chunk)
+            return
+        limit = self.server.client_buffer_size
+        if self._queued + len(chunk) > limit:
+            policy = self.server.drop_policy
+            if policy == 'disconnect':
+                self.bytes_dropped += self._queued + len(chunk)
+                self._queue.clear()
+                self._queued = 0
+                self.transport.abort()
+                return
+            if policy == 'drop-oldest':
+                queue = self._queue
+                while queue and self._queued + len(chunk) > limit:
+                    dropped = queue.popleft()
+                    self._queued -= len(dropped)
+                    self.bytes_dropped += len(dropped)
+            if self._queued + len(chunk) > limit:
+                self.bytes_dropped += len(chunk)
+                return
+        self._queue.append(chunk)
+        self._queued += len(chunk)
+
+    def _write(self, chunk):
+        self.bytes_sent += len(chunk)
+        self.transport.write(chunk)
+
+
+class _PortProtocol(asyncio.Protocol):
+    """The protocol on the serial port, relaying to the FanoutServer."""
+
+    def __init__(self, server):
+        self.server = server
+
+    def data_received(self, data):
+        self.server._port_data_received(data)
+
+    def pause_writing(self):
+        self.server._set_clients_reading(False)
+
+    def resume_writing(self):
+        self.server._set_clients_reading(True)
+
+    def connection_lost(self, exc):
+        self.server._port_lost(exc)
+
+
+class FanoutServer:
+    """A serial port shared by the TCP clients of a server.
+
+    Create instances with start_server().
+    """
+
+    def __init__(self, loop, drop_policy='disconnect', write_policy='all', client_buffer_size=256 * 1024,
+                 client_write_limit=64 * 1024, max_clients=None):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError('drop_policy must be one of {}, not {!r}'.format(DROP_POLICIES, drop_policy))
+        if write_policy not in WRITE_POLICIES:
+            raise ValueError('write_policy must be one of {}, not {!r}'.format(WRITE_POLICIES, write_policy))
+        self.loop = loop
+        self.drop_policy = drop_policy
+        self.write_policy = write_policy
+        self.client_buffer_size = client_buffer_size
+        self.client_write_limit = client_write_limit
+        self.max_clients = max_clients
+        #: The connected clients, longest connected first
+        self.clients = []
+        #: The exception the port was lost with, if any
+        self.exception = None
+        self.port_transport = None
+        self._server = None
+        self._port_writable = True
+        self._closed = loop.create_future()
+
+    @property
+    def sockets(self):
+        """The listening sockets."""
+        return () if self._server is None else self._server.sockets
+
+    def close(self):
+        """Stop serving and close the port and all client connections."""
+        if self._server is not None:
+            self._server.close()
+        for client in list(self.clients):
+            client.close()
+        if self.port_transport is not None and not self.port_transport.is_closing():
+            self.port_transport.close()
+
+    async def wait_closed(self):
+        """Wait until the port was closed, either by close() or because it was lost.
+
+        This method is a coroutine.
+        """
+        await asyncio.shield(self._closed)
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    def _port_data_received(self, data):
+        # data is bytes, shared by all clients
+        for client in self.clients:
+            client.send(data)
+
+    def _port_lost(self, exc):
+        self.exception = exc
+        self.port_transport = None
+        self.close()
+        if not self._closed.done():
+            self._closed.set_result(None)
+
+    def _set_clients_reading(self, reading):
+        self._port_writable = reading
+        for client in self.clients:
+            if reading:
+                client.transport.resume_reading()
+            else:
+                client.transport.pause_reading()
+
+    def _client_connected(self, client):
+        if self.port_transport is None or (self.max_clients is not None and len(self.clients) >= self.max_clients):
+            client.transport.abort()
+            return
+        self.clients.append(client)
+        if not self._port_writable:
+            client.transport.pause_reading()
+
+    def _client_lost(self, client):
+        try:
+            self.clients.remove(client)
+        except ValueError:
+            pass
+
+    def _client_data_received(self, client, data):
+        policy = self.write_policy
+        if (policy == 'none' or (policy == 'first' and self.clients[:1] != [client])
+                or self.port_transport is None):
+            client.bytes_rejected += len(data)
+            return
+        self.port_transport.write(data)
+
+
+async def start_server(url, host='127.0.0.1', port=0, *, loop=None, drop_policy='disconnect',
+                       write_policy='all', client_buffer_size=256 * 1024, max_clients=None, **kwargs):
+    """Open the serial port url and serve it to TCP clients on host and port.
+
+    Returns a FanoutServer. The remaining arguments are passed to
+    create_serial_connection().
+
+    This function is a coroutine.
+    """
+    if loop is None:
+        loop = asyncio.get_event_loop()
+    server = FanoutServer(loop, drop_policy=drop_policy, write_policy=write_policy,
+                          client_buffer_size=client_buffer_size, max_clients=max_clients)
+    server.port_transport, _ = await serial_asyncio.create_serial_connection(
+        loop, lambda: _PortProtocol(server), url, **kwargs)
+    try:
+        server._server = await loop.create_server(lambda: FanoutClient(server), host, port)
+    except BaseException:
+        server.port_transport.abort()
+        raise
+    return server
+
+
+async def _serve(args):
+    server = await start_server(
+        args.url, args.bind, args.port, baudrate=args.baudrate, drop_policy=args.drop_policy,
+        write_policy=args.write_policy, client_buffer_size=args.buffer_size, max_clients=args.max_clients)
+    for sock in server.sockets:
+        sys.stderr.write('Serving {} on {}\n'.format(args.url, sock.getsockname()))
+    await server.wait_closed()
+    if server.exception is not None:
+        sys.stderr.write('Port lost: {}\n'.format(server.exception))
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m serial_asyncio.server',
+                                     description='Share a serial port with several TCP clients.')
+    parser.add_argument('url', help='serial port name or URL')
+    parser.add_argument('--bind', default='127.0.0.1', help='address to listen on (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=7000, help='TCP port to listen on (default: %(default)s)')
+    parser.add_argument('--baudrate', type=int, default=9600, help='baud rate (default: %(default)s)')
+    parser.add_argument('--drop-policy', choices=DROP_POLICIES, default='disconnect',
+                        help='what to do with clients falling behind (default: %(default)s)')
+    parser.add_argument('--write-policy', choices=WRITE_POLICIES, default='all',
+                        help='which clients may write to the port (default: %(default)s)')
+    parser.add_argument('--buffer-size', type=int, default=256 * 1024,
+                        help='bytes queued per client before the drop policy applies (default: %(default)s)')
+    parser.add_argument('--max-clients', type=int, help='maximum number of clients')
+    args = parser.parse_args(argv)
+    try:
+        return asyncio.run(_serve(args))
+    except (serial.SerialException, OSError) as e:
+        sys.stderr.write('{}\n'.format(e))
+        return 1
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
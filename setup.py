@@ -11,8 +11,8 @@ import os
 import re
 import sys
 
-if sys.version_info < (3, 5):
-    raise RuntimeError("pyserial-asyncio requires at least Python 3.5")
+if sys.version_info < (3, 8):
+    raise RuntimeError("pyserial-asyncio requires at least Python 3.8")
 
 from setuptools import setup
 
@@ -55,6 +55,7 @@ setup(
     author="pySerial-team",
     url="https://github.com/pyserial/pyserial-asyncio",
     packages=['serial_asyncio'],
+    python_requires='>=3.8',
     install_requires=[
         'pyserial',
     ],
@@ -76,9 +77,6 @@ Async I/O extension package for the Python Serial Port Extension for OSX, Linux,
         'Operating System :: MacOS :: MacOS X',
         'Programming Language :: Python',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6',
-        'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
         'Topic :: Communications',
         'Topic :: Software Development :: Libraries',
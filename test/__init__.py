@@ -1 +1,127 @@
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Helpers shared by the tests: raw pty pairs standing in for serial
+ports, and a protocol recording what its transport does to it.
+"""
 
+import asyncio
+import os
+import unittest
+
+import serial
+
+import serial_asyncio
+
+try:
+    import tty
+except ImportError:
+    tty = None
+
+requires_pty = unittest.skipIf(os.name != 'posix' or tty is None, "pty pairs not supported on platform")
+
+
+def open_pty_pair(**settings):
+    """Open a raw pty pair.
+
+    Returns the non-blocking master fd and a Serial instance, opened
+    with settings, for the slave side.
+    """
+    master, slave = os.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    try:
+        port = serial.serial_for_url(os.ttyname(slave), **settings)
+    finally:
+        os.close(slave)
+    os.set_blocking(master, False)
+    return master, port
+
+
+class Recorder(asyncio.Protocol):
+    """Records the data received, flow control and the loss of the connection.
+
+    received holds all data received, chunks each piece of it as
+    delivered.
+    """
+
+    def __init__(self):
+        self.transport = None
+        self.received = bytearray()
+        self.chunks = []
+        self.actions = []
+        self.exception = None
+        self.closed = asyncio.Event()
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        self.received += data
+        self.chunks.append(data)
+
+    def pause_writing(self):
+        self.actions.append('pause')
+
+    def resume_writing(self):
+        self.actions.append('resume')
+
+    def connection_lost(self, exc):
+        self.exception = exc
+        self.closed.set()
+
+
+class PtyTestCase(unittest.IsolatedAsyncioTestCase):
+    """Tests of a SerialTransport on the slave side of a pty pair.
+
+    The transport is aborted and the master side closed after each
+    test.
+    """
+
+    def open_pty(self, **settings):
+        """open_pty_pair(), closing the master fd after the test."""
+        master, port = open_pty_pair(**settings)
+        self.addCleanup(os.close, master)
+        return master, port
+
+    async def connect(self, protocol_factory=Recorder, settings=None, **kwargs):
+        """Connect a protocol to a new pty pair.
+
+        settings are passed to serial.serial_for_url(), kwargs to
+        connection_for_serial(). Sets and returns self.transport and
+        self.protocol, self.master is the master fd.
+        """
+        self.master, port = self.open_pty(**(settings or {}))
+        loop = asyncio.get_running_loop()
+        self.transport, self.protocol = await serial_asyncio.connection_for_serial(
+            loop, protocol_factory, port, **kwargs)
+        self.addAsyncCleanup(self._abort, self.transport)
+        await asyncio.sleep(0)
+        return self.transport, self.protocol
+
+    async def _abort(self, transport):
+        if not transport.is_closing():
+            transport.abort()
+        await asyncio.sleep(0.01)
+
+    async def read_master(self, n, timeout=2.0):
+        """Read n bytes from the master side, fewer if timeout passes first."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        data = bytearray()
+        while len(data) < n and loop.time() < deadline:
+            try:
+                data += os.read(self.master, n - len(data))
+            except BlockingIOError:
+                await asyncio.sleep(0.001)
+        return bytes(data)
+
+    async def wait_for(self, predicate, timeout=2.0):
+        """Wait until predicate() is true or timeout passed."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not predicate() and loop.time() < deadline:
+            await asyncio.sleep(0.001)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test asyncio.BufferedProtocol support of SerialTransport using pty pairs.
+"""
+
+import asyncio
+import os
+import unittest
+
+from test import PtyTestCase, Recorder, requires_pty
+
+
+class BufferedRecorder(asyncio.BufferedProtocol):
+
+    def __init__(self, size=64):
+        self.buffer = bytearray(size)
+        self.received = bytearray()
+        self.calls = 0
+        self.lost = None
+        self.closed = asyncio.Event()
+
+    def get_buffer(self, sizehint):
+        return self.buffer
+
+    def buffer_updated(self, nbytes):
+        self.calls += 1
+        self.received += self.buffer[:nbytes]
+
+    def connection_lost(self, exc):
+        self.lost = exc
+        self.closed.set()
+
+
+@requires_pty
+class TestBufferedProtocol(PtyTestCase):
+
+    async def test_reads_into_protocol_buffer(self):
+        protocol = BufferedRecorder()
+        transport, _ = await self.connect(lambda: protocol)
+        payload = bytes(range(256)) * 4
+        os.write(self.master, payload)
+        await self.wait_for(lambda: len(protocol.received) >= len(payload))
+        self.assertEqual(bytes(protocol.received), payload)
+        # a 64 byte buffer can not take more than 64 bytes per call
+        self.assertGreaterEqual(protocol.calls, len(payload) // 64)
+        transport.close()
+        await protocol.closed.wait()
+        self.assertIsNone(protocol.lost)
+
+    async def test_empty_buffer_is_fatal(self):
+        protocol = BufferedRecorder(size=0)
+        transport, _ = await self.connect(lambda: protocol)
+        errors = []
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        os.write(self.master, b'x')
+        await asyncio.wait_for(protocol.closed.wait(), 2)
+        self.assertIsInstance(protocol.lost, RuntimeError)
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(transport.is_closing())
+
+    async def test_plain_protocol_unchanged(self):
+        protocol = Recorder()
+        transport, _ = await self.connect(lambda: protocol)
+        os.write(self.master, b'hello')
+        await self.wait_for(lambda: len(protocol.received) >= 5)
+        self.assertEqual(bytes(protocol.received), b'hello')
+
+
+if __name__ == '__main__':
+    unittest.main()
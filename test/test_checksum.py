@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test the checksums and their use by the framers.
+"""
+
+import asyncio
+import os
+import unittest
+
+from serial_asyncio import checksum, framing
+from test import PtyTestCase, requires_pty
+
+
+def crc16_bitwise(data):
+    crc = 0xFFFF
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+    return crc
+
+
+class TestChecksums(unittest.TestCase):
+
+    def test_check_values(self):
+        self.assertEqual(checksum.Crc16Modbus().compute(b'123456789'), 0x4B37)
+        self.assertEqual(checksum.Crc32().compute(b'123456789'), 0xCBF43926)
+
+    def test_crc16_matches_bitwise(self):
+        crc16 = checksum.Crc16Modbus()
+        data = bytes(range(256)) * 3
+        for length in (0, 1, 2, 3, 17, 255, 256, len(data)):
+            self.assertEqual(crc16.compute(data[:length]), crc16_bitwise(data[:length]), length)
+        self.assertEqual(crc16.compute(bytearray(data)), crc16_bitwise(data))
+        self.assertEqual(crc16.compute(memoryview(data)[1:]), crc16_bitwise(data[1:]))
+
+    def test_modbus_frame(self):
+        crc16 = checksum.Crc16Modbus()
+        frame = crc16.append(b'\x01\x03\x00\x00\x00\x0a')
+        self.assertEqual(frame, b'\x01\x03\x00\x00\x00\x0a\xc5\xcd')
+        self.assertEqual(crc16.strip(frame), b'\x01\x03\x00\x00\x00\x0a')
+        self.assertIsNone(crc16.strip(frame[:-1] + b'\xce'))
+        self.assertIsNone(crc16.strip(b'\x01'))
+
+    def test_crc32_frame(self):
+        crc32 = checksum.Crc32()
+        frame = crc32.append(b'payload')
+        self.assertEqual(len(frame), 11)
+        self.assertEqual(crc32.strip(bytearray(frame)), b'payload')
+        self.assertIsNone(crc32.strip(b'x' + frame[1:]))
+
+
+class TestFramerChecksum(unittest.TestCase):
+
+    def test_corrupt_frames_are_dropped(self):
+        framer = framing.CobsFramer(checksum=checksum.Crc32())
+        frames = [framer.encode(framer.checksum.append(payload)) for payload in (b'one', b'two', b'three')]
+        frames[1] = frames[1].replace(b'two', b'tw0')
+        for frame in frames:
+            framer.data_received(frame)
+        self.assertEqual(list(framer._frames), [b'one', b'three'])
+        self.assertEqual(framer.corrupt_frames, 1)
+        self.assertEqual(framer.errors, 0)
+
+
+@requires_pty
+class TestModbusRtu(PtyTestCase):
+
+    async def test_stats(self):
+        crc16 = checksum.Crc16Modbus()
+        transport, frames = await self.connect(lambda: framing.IdleGapFramer(gap=0.02, checksum=crc16),
+                                               settings={'baudrate': 9600})
+
+        frames.write_frame(b'\x01\x03\x00\x00\x00\x0a')
+        self.assertEqual(await self.read_master(8), b'\x01\x03\x00\x00\x00\x0a\xc5\xcd')
+        response = crc16.append(b'\x01\x03\x02\x12\x34')
+        os.write(self.master, response[:-1] + b'\x00')
+        await asyncio.sleep(0.1)
+        os.write(self.master, response)
+        self.assertEqual(await frames.__anext__(), b'\x01\x03\x02\x12\x34')
+
+        stats = transport.get_extra_info('stats')
+        self.assertEqual(stats.frames_received, 1)
+        self.assertEqual(stats.corrupt_frames, 1)
+        self.assertEqual(stats.snapshot()['corrupt_frames'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
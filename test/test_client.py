@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test the request/response client against a simulated device on a pty pair.
+"""
+
+import asyncio
+import os
+import unittest
+
+import serial_asyncio
+from serial_asyncio.client import SerialClient
+from serial_asyncio.framing import LineFramer
+from test import PtyTestCase, requires_pty
+
+
+class Device:
+    """Answers the lines written to the master side of a pty.
+
+    respond(line) returns the response line and the delay before it is
+    sent, or None to stay silent.
+    """
+
+    def __init__(self, loop, fd, respond):
+        self.loop = loop
+        self.fd = fd
+        self.respond = respond
+        self.requests = []
+        self.outstanding = 0
+        self.max_outstanding = 0
+        self._buffer = b''
+        os.set_blocking(fd, False)
+        loop.add_reader(fd, self._read_ready)
+
+    def _read_ready(self):
+        try:
+            self._buffer += os.read(self.fd, 4096)
+        except (BlockingIOError, OSError):
+            return
+        *lines, self._buffer = self._buffer.split(b'\n')
+        for line in lines:
+            self.requests.append(line)
+            answer = self.respond(line)
+            if answer is not None:
+                response, delay = answer
+                self.outstanding += 1
+                self.max_outstanding = max(self.max_outstanding, self.outstanding)
+                self.loop.call_later(delay, self._send, response)
+
+    def _send(self, response):
+        self.outstanding -= 1
+        self.send(response)
+
+    def send(self, line):
+        os.write(self.fd, line + b'\n')
+
+    def close(self):
+        self.loop.remove_reader(self.fd)
+
+
+@requires_pty
+class TestSerialClient(PtyTestCase):
+
+    async def connect(self, respond, **kwargs):
+        self.master, port = self.open_pty()
+        loop = asyncio.get_running_loop()
+        self.device = Device(loop, self.master, respond)
+        self.addCleanup(self.device.close)
+        self.transport, self.client = await serial_asyncio.connection_for_serial(
+            loop, lambda: SerialClient(LineFramer(), **kwargs), port)
+        self.addAsyncCleanup(self._abort, self.transport)
+        await asyncio.sleep(0)
+        return self.client
+
+    async def test_request(self):
+        client = await self.connect(lambda line: (line.lower(), 0))
+        self.assertEqual(await client.request(b'AT'), b'at')
+        self.assertEqual(await client.request(b'ATI'), b'ati')
+        self.assertEqual(client.transactions, 2)
+
+    async def test_pipelining(self):
+        client = await self.connect(lambda line: (b're ' + line, 0.05), max_in_flight=3)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        responses = await asyncio.gather(*(client.request(str(i).encode()) for i in range(6)))
+        elapsed = loop.time() - start
+        self.assertEqual(responses, [b're ' + str(i).encode() for i in range(6)])
+        self.assertEqual(self.device.max_outstanding, 3)
+        # two rounds of three requests, not six sequential ones
+        self.assertLess(elapsed, 0.25)
+
+    async def test_matcher(self):
+        # the device answers later requests first
+        client = await self.connect(lambda line: (line + b' done', 0.1 - int(line[-1:]) * 0.02),
+                                    max_in_flight=4, matcher=lambda request, response: response.startswith(request))
+        responses = await asyncio.gather(*(client.request(b'id' + str(i).encode()) for i in range(4)))
+        self.assertEqual(responses, [b'id0 done', b'id1 done', b'id2 done', b'id3 done'])
+
+    async def test_timeout(self):
+        client = await self.connect(lambda line: None if line == b'SILENT' else (b'OK', 0))
+        with self.assertRaises(asyncio.TimeoutError):
+            await client.request(b'SILENT', timeout=0.05)
+        self.assertEqual(client.timeouts, 1)
+        self.assertEqual(await client.request(b'AT', timeout=1), b'OK')
+
+    async def test_late_response_does_not_answer_next_request(self):
+        client = await self.connect(lambda line: (b'reply-to-' + line, 0.05 if line == b'A' else 0), resync_idle=1)
+        with self.assertRaises(asyncio.TimeoutError):
+            await client.request(b'A', timeout=0.01)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        self.assertEqual(await client.request(b'B', timeout=2), b'reply-to-B')
+        # sent as soon as the late response arrived, not after resync_idle
+        self.assertLess(loop.time() - start, 0.5)
+        self.assertEqual(client.late_responses, 1)
+        self.assertEqual(client.unsolicited, 0)
+        self.assertEqual(len(client._pending), 0)
+
+    async def test_resync_after_unanswered_request(self):
+        client = await self.connect(lambda line: None if line == b'SILENT' else (b'OK', 0), resync_idle=0.05)
+        with self.assertRaises(asyncio.TimeoutError):
+            await client.request(b'SILENT', timeout=0.01)
+        self.assertEqual(await client.request(b'AT', timeout=1), b'OK')
+        self.assertEqual(client.late_responses, 0)
+        self.assertEqual(len(client._pending), 0)
+
+    async def test_timeout_covers_waiting_for_a_slot(self):
+        client = await self.connect(lambda line: (b'OK', 0.2))
+        first = asyncio.ensure_future(client.request(b'slow'))
+        await asyncio.sleep(0)
+        with self.assertRaises(asyncio.TimeoutError):
+            await client.request(b'queued', timeout=0.05)
+        self.assertEqual(await first, b'OK')
+        self.assertEqual(self.device.requests, [b'slow'])
+
+    async def test_cancellation(self):
+        client = await self.connect(lambda line: None if line == b'SILENT' else (b'OK', 0))
+        task = asyncio.ensure_future(client.request(b'SILENT'))
+        waiting = asyncio.ensure_future(client.request(b'AT'))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(await asyncio.wait_for(waiting, 1), b'OK')
+        self.assertEqual(len(client._pending), 0)
+        self.assertEqual(client._in_flight, 0)
+
+    async def test_latency(self):
+        client = await self.connect(lambda line: (b'OK', 0.02))
+        for _ in range(5):
+            transaction = await client.transaction(b'AT')
+            self.assertGreaterEqual(transaction.latency, 0.015)
+        summary = client.latency_summary()
+        self.assertEqual(summary['count'], 5)
+        self.assertGreaterEqual(summary['p50'], 0.015)
+        self.assertLessEqual(summary['p50'], summary['max'])
+
+    async def test_unsolicited(self):
+        received = []
+        client = await self.connect(lambda line: (b'OK', 0), on_unsolicited=received.append)
+        self.device.send(b'RING')
+        await asyncio.sleep(0.02)
+        self.assertEqual(await client.request(b'ATA'), b'OK')
+        self.assertEqual(received, [b'RING'])
+        self.assertEqual(client.unsolicited, 1)
+
+    async def test_connection_lost(self):
+        client = await self.connect(lambda line: None)
+        task = asyncio.ensure_future(client.request(b'AT'))
+        await asyncio.sleep(0.01)
+        self.transport.abort()
+        with self.assertRaises(ConnectionResetError):
+            await task
+        with self.assertRaises(ConnectionResetError):
+            await client.request(b'AT')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test the port watcher on a temporary directory standing in for /dev.
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from serial_asyncio import _inotify, discovery
+
+
+class Test_port_watcher(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.dev = tempfile.mkdtemp()
+        self.touch('ttyUSB0')
+        self.touch('null')
+
+    async def asyncTearDown(self):
+        shutil.rmtree(self.dev)
+
+    def touch(self, *names):
+        path = os.path.join(self.dev, *names)
+        with open(path, 'w'):
+            pass
+        return path
+
+    async def watch(self, roots=None, **kwargs):
+        if roots is None:
+            roots = {self.dev: ('ttyUSB*', 'ttyACM*')}
+        watcher = await discovery.watch_ports(roots, **kwargs)
+        self.addCleanup(watcher.close)
+        return watcher
+
+    async def next_event(self, watcher):
+        return await asyncio.wait_for(watcher.__anext__(), 5)
+
+    async def test_initial_enumeration(self):
+        watcher = await self.watch()
+        self.assertEqual([info.device for info in watcher.ports()], [os.path.join(self.dev, 'ttyUSB0')])
+
+    @unittest.skipUnless(_inotify.available(), 'inotify not available')
+    async def test_hotplug_events(self):
+        watcher = await self.watch()
+        path = self.touch('ttyACM0')
+        self.touch('ttyS99')  # not matching the patterns
+        event = await self.next_event(watcher)
+        self.assertEqual(event.action, discovery.ADDED)
+        self.assertEqual(event.port.device, path)
+        os.unlink(path)
+        event = await self.next_event(watcher)
+        self.assertEqual((event.action, event.port.device), (discovery.REMOVED, path))
+        self.assertEqual(len(watcher.ports()), 1)
+
+    @unittest.skipUnless(_inotify.available(), 'inotify not available')
+    async def test_root_created_later(self):
+        by_id = os.path.join(self.dev, 'serial', 'by-id')
+        watcher = await self.watch({by_id: ('*',)})
+        self.assertEqual(watcher.ports(), [])
+        os.makedirs(by_id)
+        target = os.path.join(self.dev, 'ttyUSB0')
+        link = os.path.join(by_id, 'usb-FTDI_TEST-if00-port0')
+        os.symlink(target, link)
+        event = await self.next_event(watcher)
+        self.assertEqual(event.action, discovery.ADDED)
+        self.assertEqual(event.port.device, link)
+        os.unlink(link)
+        os.rmdir(by_id)
+        event = await self.next_event(watcher)
+        self.assertEqual(event.action, discovery.REMOVED)
+        # and again, once the directory is back
+        os.makedirs(by_id)
+        os.symlink(target, link)
+        event = await self.next_event(watcher)
+        self.assertEqual((event.action, event.port.device), (discovery.ADDED, link))
+
+    async def test_polling_without_inotify(self):
+        with mock.patch.object(_inotify, 'available', return_value=False):
+            watcher = await self.watch(poll_interval=0.01)
+        path = self.touch('ttyUSB1')
+        event = await self.next_event(watcher)
+        self.assertEqual((event.action, event.port.device), (discovery.ADDED, path))
+
+    async def test_close_ends_iteration(self):
+        watcher = await self.watch()
+        asyncio.get_running_loop().call_later(0.01, watcher.close)
+        events = [event async for event in watcher]
+        self.assertEqual(events, [])
+
+    async def test_comports(self):
+        ports = await discovery.comports()
+        self.assertIsInstance(ports, list)
+
+
+if __name__ == '__main__':
+    unittest.main()
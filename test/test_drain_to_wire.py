@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test waiting for written data to leave the port.
+
+The loop:// URL handler reports its queue as out_waiting, which makes the
+driver's output queue observable: it only empties while reading.
+"""
+
+import asyncio
+import unittest
+
+import serial
+
+import serial_asyncio
+from test import Recorder
+
+
+class TestDrainToWire(unittest.IsolatedAsyncioTestCase):
+
+    def test_character_time(self):
+        port = serial.serial_for_url('loop://', baudrate=9600, do_not_open=True)
+        self.assertAlmostEqual(serial_asyncio._character_time(port), 10 / 9600)
+        port.parity = serial.PARITY_EVEN
+        port.stopbits = serial.STOPBITS_TWO
+        self.assertAlmostEqual(serial_asyncio._character_time(port), 12 / 9600)
+
+    async def test_waits_for_driver_queue(self):
+        loop = asyncio.get_running_loop()
+        transport, protocol = await serial_asyncio.create_serial_connection(
+            loop, Recorder, 'loop://', baudrate=115200)
+        await asyncio.sleep(0)
+        transport.pause_reading()
+        transport.write(b'x' * 100)
+        drained = asyncio.ensure_future(transport.drain_to_wire())
+        await asyncio.sleep(0.05)
+        self.assertFalse(drained.done())
+        self.assertEqual(transport.get_write_buffer_size(), 0)
+        transport.resume_reading()
+        await asyncio.wait_for(drained, 1)
+        self.assertEqual(len(protocol.received), 100)
+        transport.abort()
+        await asyncio.sleep(0.01)
+
+    async def test_abort_fails_waiters(self):
+        loop = asyncio.get_running_loop()
+        transport, protocol = await serial_asyncio.create_serial_connection(
+            loop, Recorder, 'loop://', baudrate=115200)
+        transport.write(b'x' * 100)
+        drained = asyncio.ensure_future(transport.drain_to_wire())
+        await asyncio.sleep(0)
+        transport.abort()
+        with self.assertRaises(ConnectionResetError):
+            await asyncio.wait_for(drained, 1)
+
+    async def test_stream_writer(self):
+        reader, writer = await serial_asyncio.open_serial_connection(url='loop://', baudrate=115200)
+        writer.write(b'hello\n')
+        await asyncio.wait_for(serial_asyncio.drain_to_wire(writer), 1)
+        self.assertEqual(await reader.readline(), b'hello\n')
+        writer.close()
+        await asyncio.sleep(0.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
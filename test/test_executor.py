@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test which operations of pySerial-asyncio are run in an executor.
+"""
+
+import asyncio
+import concurrent.futures
+import unittest
+
+import serial_asyncio
+from test import PtyTestCase, Recorder, requires_pty
+
+
+class CountingExecutor(concurrent.futures.ThreadPoolExecutor):
+
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.calls = []
+
+    def submit(self, fn, *args, **kwargs):
+        self.calls.append(getattr(fn, '__name__', fn))
+        return super().submit(fn, *args, **kwargs)
+
+
+class TestExecutor(PtyTestCase):
+
+    async def asyncSetUp(self):
+        self.default_executor = CountingExecutor()
+        asyncio.get_running_loop().set_default_executor(self.default_executor)
+
+    async def test_url_handler_uses_executor(self):
+        loop = asyncio.get_running_loop()
+        executor = CountingExecutor()
+        transport, protocol = await serial_asyncio.create_serial_connection(
+            loop, Recorder, 'loop://', executor=executor)
+        self.assertEqual(len(executor.calls), 1)
+        transport.close()
+        await asyncio.wait_for(protocol.closed.wait(), 2)
+        await asyncio.sleep(0.01)
+        self.assertEqual(executor.calls[1:], ['flush', 'close'])
+        self.assertEqual(self.default_executor.calls, [])
+        executor.shutdown()
+
+    @requires_pty
+    async def test_local_device_needs_no_thread(self):
+        loop = asyncio.get_running_loop()
+        self.master, port = self.open_pty()
+        executor = CountingExecutor()
+        transport, protocol = await serial_asyncio.create_serial_connection(
+            loop, Recorder, port.port, baudrate=115200, executor=executor)
+        port.close()
+        self.assertEqual(transport.serial.baudrate, 115200)
+        transport.write(b'hello')
+        transport.close()
+        await asyncio.wait_for(protocol.closed.wait(), 2)
+        await asyncio.sleep(0.01)
+        self.assertEqual(await self.read_master(5), b'hello')
+        self.assertEqual(executor.calls, [])
+        self.assertEqual(self.default_executor.calls, [])
+        executor.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
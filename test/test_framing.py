@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test the delimiter and length based framers.
+"""
+
+import asyncio
+import os
+import unittest
+
+import serial
+
+from serial_asyncio import framing
+from test import PtyTestCase, requires_pty
+
+
+def feed(framer, data, chunk_size=1):
+    for i in range(0, len(data), chunk_size):
+        framer.data_received(data[i:i + chunk_size])
+    return list(framer._frames)
+
+
+class FakeTransport:
+
+    def __init__(self):
+        self.actions = []
+
+    def get_extra_info(self, name, default=None):
+        return default
+
+    def pause_reading(self):
+        self.actions.append('pause')
+
+    def resume_reading(self):
+        self.actions.append('resume')
+
+    def abort(self):
+        self.actions.append('abort')
+
+
+class TestLineFramer(unittest.TestCase):
+
+    def test_split_across_chunks(self):
+        data = b'first\nsecond line\n\nlast'
+        for chunk_size in (1, 3, len(data)):
+            framer = framing.LineFramer()
+            self.assertEqual(feed(framer, data, chunk_size), [b'first', b'second line', b''])
+            self.assertEqual(bytes(framer._buffer[framer._start:]), b'last')
+
+    def test_multi_byte_delimiter(self):
+        framer = framing.LineFramer(delimiter=b'\r\n')
+        self.assertEqual(feed(framer, b'a\rb\r\nc\r\n'), [b'a\rb', b'c'])
+        self.assertEqual(framer.encode(b'x'), b'x\r\n')
+
+    def test_buffer_is_compacted(self):
+        framer = framing.LineFramer()
+        for _ in range(1000):
+            framer.data_received(b'0123456789\n01234')
+            framer.data_received(b'56789\n')
+        self.assertEqual(len(framer._frames), 2000)
+        self.assertEqual(len(framer._buffer), 0)
+
+    def test_overlong_frames_are_dropped(self):
+        framer = framing.LineFramer(max_frame_size=8)
+        frames = feed(framer, b'short\n' + b'x' * 20 + b'\nnext\n', 4)
+        self.assertEqual(frames, [b'short', b'next'])
+        self.assertEqual(framer.errors, 1)
+
+    def test_overlong_frame_in_one_chunk_is_dropped(self):
+        framer = framing.LineFramer(max_frame_size=4)
+        data = b'0123456789abcdef\nnext\n'
+        self.assertEqual(feed(framer, data, len(data)), [b'next'])
+        self.assertEqual(framer.errors, 1)
+
+
+class TestSlipFramer(unittest.TestCase):
+
+    def test_round_trip(self):
+        payloads = [b'plain', b'\xc0\xdb', b'\xdb\xdc', b'\xdb\xdd\xdc', bytes(range(256))]
+        framer = framing.SlipFramer()
+        self.assertEqual(feed(framer, b''.join(map(framer.encode, payloads)), 7), payloads)
+
+    def test_encoding(self):
+        self.assertEqual(framing.SlipFramer.encode(b'a\xc0b\xdb'), b'\xc0a\xdb\xdcb\xdb\xdd\xc0')
+
+    def test_empty_frames_are_skipped(self):
+        self.assertEqual(feed(framing.SlipFramer(), b'\xc0\xc0\xc0abc\xc0\xc0'), [b'abc'])
+
+
+class TestCobsFramer(unittest.TestCase):
+
+    vectors = [
+        (b'', b'\x01'),
+        (b'\x00', b'\x01\x01'),
+        (b'\x00\x00', b'\x01\x01\x01'),
+        (b'\x11\x22\x00\x33', b'\x03\x11\x22\x02\x33'),
+        (b'\x11\x22\x33\x44', b'\x05\x11\x22\x33\x44'),
+        (b'\x11\x00\x00\x00', b'\x02\x11\x01\x01\x01'),
+        (bytes(range(1, 255)), b'\xff' + bytes(range(1, 255))),
+        (bytes(range(0, 255)), b'\x01\xff' + bytes(range(1, 255))),
+        (bytes(range(1, 256)), b'\xff' + bytes(range(1, 255)) + b'\x02\xff'),
+        (bytes(range(1, 255)) + b'\x00', b'\xff' + bytes(range(1, 255)) + b'\x01\x01'),
+    ]
+
+    def test_vectors(self):
+        for decoded, encoded in self.vectors:
+            self.assertEqual(framing.cobs_encode(decoded), encoded)
+            self.assertEqual(framing.cobs_decode(encoded), decoded)
+
+    def test_frames(self):
+        payloads = [decoded for decoded, _ in self.vectors if decoded]
+        framer = framing.CobsFramer()
+        self.assertEqual(feed(framer, b''.join(map(framer.encode, payloads)), 13), payloads)
+
+    def test_malformed_frames_are_dropped(self):
+        framer = framing.CobsFramer()
+        self.assertEqual(feed(framer, b'\x05\x11\x00\x02\x11\x00'), [b'\x11'])
+        self.assertEqual(framer.errors, 1)
+
+
+class TestLengthFramers(unittest.TestCase):
+
+    def test_length_prefix(self):
+        framer = framing.LengthPrefixFramer()
+        payloads = [b'', b'a', b'x' * 1000]
+        self.assertEqual(feed(framer, b''.join(map(framer.encode, payloads)), 5), payloads)
+        framer = framing.LengthPrefixFramer(prefix_size=4, byteorder='little')
+        self.assertEqual(framer.encode(b'ab'), b'\x02\x00\x00\x00ab')
+
+    def test_length_prefix_too_long(self):
+        framer = framing.LengthPrefixFramer(max_frame_size=10)
+        framer.connection_made(FakeTransport())
+        self.assertEqual(feed(framer, b'\x00\x02ab\x00\x0bmore data'), [b'ab'])
+        self.assertEqual(framer.transport.actions, ['abort'])
+
+        async def iterate():
+            return [frame async for frame in framer]
+
+        with self.assertRaises(ValueError):
+            asyncio.run(iterate())
+
+    def test_fixed_length(self):
+        framer = framing.FixedLengthFramer(3)
+        self.assertEqual(feed(framer, b'abcdefgh', 2), [b'abc', b'def'])
+        with self.assertRaises(ValueError):
+            framer.encode(b'ab')
+
+
+class TestIteration(unittest.IsolatedAsyncioTestCase):
+
+    async def test_reading_is_paused_while_frames_queue_up(self):
+        framer = framing.LineFramer(max_queued_frames=4)
+        framer.connection_made(FakeTransport())
+        framer.data_received(b'1\n2\n3\n4\n5\n')
+        self.assertEqual(framer.transport.actions, ['pause'])
+        frames = [await framer.__anext__() for _ in range(3)]
+        self.assertEqual(frames, [b'1', b'2', b'3'])
+        self.assertEqual(framer.transport.actions, ['pause', 'resume'])
+
+    async def test_iteration_ends_with_connection(self):
+        framer = framing.LineFramer()
+        framer.data_received(b'a\n')
+        framer.connection_lost(None)
+        self.assertEqual([frame async for frame in framer], [b'a'])
+
+    async def test_iteration_raises_connection_error(self):
+        framer = framing.LineFramer()
+        framer.connection_lost(serial.SerialException('gone'))
+        with self.assertRaises(serial.SerialException):
+            await framer.__anext__()
+
+
+@requires_pty
+class TestFramedConnection(PtyTestCase):
+
+    async def test_async_for(self):
+        transport, frames = await self.connect(framing.SlipFramer)
+
+        frames.write_frame(b'ping\xc0')
+        self.assertEqual(await self.read_master(8), b'\xc0ping\xdb\xdc\xc0')
+        os.write(self.master, b''.join(framing.SlipFramer.encode(bytes([i]) * i) for i in range(1, 50)))
+        received = []
+        async for frame in frames:
+            received.append(frame)
+            if len(received) == 49:
+                transport.close()
+        self.assertEqual(received, [bytes([i]) * i for i in range(1, 50)])
+
+
+if __name__ == '__main__':
+    unittest.main()
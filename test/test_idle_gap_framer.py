@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test the idle gap framer using pty pairs and scripted timing.
+"""
+
+import asyncio
+import os
+import unittest
+
+import serial
+
+from serial_asyncio.framing import IdleGapFramer
+from test import PtyTestCase, requires_pty
+
+
+class FrameRecorder(IdleGapFramer):
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.frames = []
+
+    def frame_received(self, frame):
+        self.frames.append(frame)
+
+
+class TestGap(unittest.TestCase):
+
+    def gap_for(self, **settings):
+        framer = FrameRecorder()
+        port = serial.serial_for_url('loop://', do_not_open=True, **settings)
+
+        class Transport:
+            def get_extra_info(self, name, default=None):
+                return port if name == 'serial' else default
+
+        framer.connection_made(Transport())
+        return framer.gap
+
+    def test_gap_from_port_settings(self):
+        # 10 bits per character
+        self.assertAlmostEqual(self.gap_for(baudrate=9600), 3.5 * 10 / 9600)
+        # start bit, 8 data bits, parity and 2 stop bits
+        self.assertAlmostEqual(self.gap_for(baudrate=9600, parity=serial.PARITY_EVEN,
+                                            stopbits=serial.STOPBITS_TWO), 3.5 * 12 / 9600)
+        # fixed 1.75 ms above 19200 baud
+        self.assertAlmostEqual(self.gap_for(baudrate=115200), 0.00175)
+
+    def test_explicit_gap(self):
+        framer = FrameRecorder(gap=0.01)
+        framer.connection_made(asyncio.Transport())
+        self.assertEqual(framer.gap, 0.01)
+
+
+@requires_pty
+class TestIdleGapFramer(PtyTestCase):
+
+    async def asyncSetUp(self):
+        # 3.5 characters at 1200 baud are about 29 ms
+        await self.connect(FrameRecorder, settings={'baudrate': 1200})
+
+    async def send(self, *script):
+        """Write the given chunks, sleeping the seconds given between them."""
+        for step in script:
+            if isinstance(step, bytes):
+                os.write(self.master, step)
+            else:
+                await asyncio.sleep(step)
+
+    async def test_frames_split_by_silence(self):
+        await self.send(b'\x01\x03', 0.003, b'\x00\x00', 0.003, b'\x00\x0a',
+                        0.1,
+                        b'\x02\x06\x00', 0.003, b'\x01',
+                        0.1)
+        self.assertEqual(self.protocol.frames, [b'\x01\x03\x00\x00\x00\x0a', b'\x02\x06\x00\x01'])
+
+    async def test_frame_ends_after_gap(self):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await self.send(b'abc')
+        await self.wait_for(lambda: self.protocol.frames, timeout=1)
+        self.assertEqual(self.protocol.frames, [b'abc'])
+        self.assertGreaterEqual(loop.time() - start, self.protocol.gap)
+
+    async def test_late_timer_does_not_merge_frames(self):
+        # read both frames, then let the timer run; their receive
+        # times still tell them apart
+        await self.send(b'one', 0.05, b'two')
+        await asyncio.sleep(0.02)
+        self.assertEqual(self.protocol.frames, [b'one'])
+        self.protocol._timer.cancel()
+        self.protocol._timer = None
+        self.protocol.timed_data_received(b'three', self.protocol._last_rx_time + 10 ** 8)
+        self.assertEqual(self.protocol.frames, [b'one', b'two'])
+
+    async def test_partial_frame_on_close(self):
+        await self.send(b'partial')
+        await asyncio.sleep(0.005)
+        self.transport.close()
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.protocol.frames, [b'partial'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test the polling mode of SerialTransport with the loop:// URL handler.
+"""
+
+import asyncio
+import gc
+import unittest
+import weakref
+
+import serial_asyncio
+from test import Recorder
+
+
+class TestPolling(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        loop = asyncio.get_running_loop()
+        self.transport, self.protocol = await serial_asyncio.create_serial_connection(
+            loop, Recorder, 'loop://', baudrate=115200)
+        await asyncio.sleep(0)
+
+    async def asyncTearDown(self):
+        self.transport.close()
+        await asyncio.wait_for(self.protocol.closed.wait(), 2)
+
+    async def wait_for(self, predicate, timeout=2.0):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not predicate() and loop.time() < deadline:
+            await asyncio.sleep(0.001)
+
+    async def test_selects_polling(self):
+        self.assertTrue(self.transport.get_extra_info('polling'))
+
+    async def test_echo(self):
+        self.transport.write(b'Hello, World!\n')
+        await self.wait_for(lambda: len(self.protocol.received) >= 14)
+        self.assertEqual(bytes(self.protocol.received), b'Hello, World!\n')
+
+    async def test_transfer_larger_than_loop_buffer(self):
+        payload = bytes(range(256)) * 64
+        self.transport.write(payload)
+        await self.wait_for(lambda: len(self.protocol.received) >= len(payload), timeout=5.0)
+        self.assertEqual(bytes(self.protocol.received), payload)
+        self.assertEqual(self.transport.get_write_buffer_size(), 0)
+
+    async def test_idle_port_backs_off(self):
+        await asyncio.sleep(0.3)
+        self.assertEqual(self.transport._poll_read_interval, self.transport._max_poll_wait_time)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        self.transport.write(b'ping')
+        await self.wait_for(lambda: len(self.protocol.received) >= 4)
+        self.assertEqual(bytes(self.protocol.received), b'ping')
+        self.assertLess(loop.time() - start, self.transport._max_poll_wait_time)
+
+
+class TestPollScheduler(unittest.IsolatedAsyncioTestCase):
+
+    async def test_ports_share_one_scheduler(self):
+        loop = asyncio.get_running_loop()
+        connections = [await serial_asyncio.create_serial_connection(loop, Recorder, 'loop://')
+                       for _ in range(20)]
+        scheduler = serial_asyncio._get_poll_scheduler(loop)
+        self.assertTrue(all(transport._poller is scheduler for transport, _ in connections))
+        await asyncio.sleep(0.5)
+        ticks = scheduler.ticks
+        await asyncio.sleep(0.5)
+        # idle ports have backed off to 50 ms, whereas polling every port
+        # at the minimum interval would mean 20000 wakeups per second
+        self.assertLess(scheduler.ticks - ticks, 100)
+
+        busy_transport, busy_protocol = connections[0]
+        busy_transport.write(b'ping')
+        for _ in range(100):
+            if busy_protocol.received:
+                break
+            await asyncio.sleep(0.001)
+        self.assertEqual(bytes(busy_protocol.received), b'ping')
+        self.assertTrue(all(not protocol.received for _, protocol in connections[1:]))
+
+        for transport, protocol in connections:
+            transport.close()
+            await asyncio.wait_for(protocol.closed.wait(), 2)
+        self.assertEqual(scheduler._readers, {})
+        self.assertEqual(scheduler._writers, set())
+        self.assertEqual(scheduler._reader_heap, [])
+
+
+class TestPollSchedulerLifetime(unittest.TestCase):
+
+    def test_loops_are_not_kept_alive(self):
+        loops = []
+
+        async def use_port():
+            loop = asyncio.get_running_loop()
+            loops.append(weakref.ref(loop))
+            transport, protocol = await serial_asyncio.create_serial_connection(loop, Recorder, 'loop://')
+            transport.write(b'ping')
+            await asyncio.sleep(0.01)
+            transport.close()
+            await asyncio.wait_for(protocol.closed.wait(), 2)
+
+        for _ in range(5):
+            asyncio.run(use_port())
+        gc.collect()
+        self.assertEqual([ref() for ref in loops], [None] * 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test batched delivery of received data by SerialTransport using pty pairs.
+"""
+
+import asyncio
+import os
+import unittest
+
+from test import PtyTestCase, Recorder, requires_pty
+
+
+class TimeRecorder(Recorder):
+
+    def __init__(self):
+        super().__init__()
+        self.times = []
+
+    def data_received(self, data):
+        super().data_received(data)
+        self.times.append(asyncio.get_running_loop().time())
+
+
+@requires_pty
+class TestReadBatching(PtyTestCase):
+
+    async def connect(self, **kwargs):
+        await super().connect(TimeRecorder, **kwargs)
+
+    async def test_latency_budget(self):
+        await self.connect(batch_latency=0.05)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for i in range(5):
+            os.write(self.master, b'ab')
+            await asyncio.sleep(0.002)
+        while not self.protocol.chunks and loop.time() - start < 2:
+            await asyncio.sleep(0.001)
+        self.assertEqual(self.protocol.chunks, [b'ababababab'])
+        self.assertGreaterEqual(self.protocol.times[0] - start, 0.045)
+        self.assertGreater(self.transport.get_extra_info('stats').read_calls, 1)
+        self.assertEqual(self.transport.get_extra_info('stats').data_received_count, 1)
+
+    async def test_size_threshold(self):
+        await self.connect(batch_size=100, batch_latency=10)
+        for i in range(5):
+            os.write(self.master, bytes([0x61 + i]) * 50)
+            await asyncio.sleep(0.01)
+        self.assertEqual(b''.join(self.protocol.chunks), b'a' * 50 + b'b' * 50 + b'c' * 50 + b'd' * 50)
+        self.assertTrue(all(len(data) >= 100 for data in self.protocol.chunks))
+        # the rest is delivered before the connection is lost
+        self.transport.close()
+        await asyncio.wait_for(self.protocol.closed.wait(), 2)
+        self.assertEqual(self.protocol.chunks[-1], b'e' * 50)
+
+    async def test_paused_batch_is_held(self):
+        await self.connect(batch_latency=0.01)
+        os.write(self.master, b'xyz')
+        while not self.transport.get_extra_info('stats').bytes_read:
+            await asyncio.sleep(0.001)
+        self.transport.pause_reading()
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.protocol.chunks, [])
+        self.transport.resume_reading()
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.protocol.chunks, [b'xyz'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test the read strategies of SerialTransport.
+"""
+
+import os
+import unittest
+
+import serial_asyncio
+from test import PtyTestCase, requires_pty
+
+
+class FakeSerial:
+    in_waiting = 0
+
+
+class TestReadStrategies(unittest.TestCase):
+
+    def test_named_strategies(self):
+        self.assertIsInstance(serial_asyncio._make_read_strategy(None, None),
+                              serial_asyncio.FixedReadStrategy)
+        self.assertIsInstance(serial_asyncio._make_read_strategy('in_waiting', None),
+                              serial_asyncio.InWaitingReadStrategy)
+        strategy = serial_asyncio._make_read_strategy('adaptive', 4096)
+        self.assertIsInstance(strategy, serial_asyncio.AdaptiveReadStrategy)
+        self.assertEqual(strategy.max_read_size, 4096)
+        with self.assertRaises(ValueError):
+            serial_asyncio._make_read_strategy('bogus', None)
+        with self.assertRaises(ValueError):
+            serial_asyncio._make_read_strategy(strategy, 16)
+        self.assertIs(serial_asyncio._make_read_strategy(strategy, None), strategy)
+
+    def test_fixed(self):
+        strategy = serial_asyncio.FixedReadStrategy()
+        self.assertEqual(strategy.read_size(FakeSerial()), 1024)
+        strategy.update(1024, 256)
+        strategy.update(1024, 768)
+        self.assertEqual(strategy.reads, 2)
+        self.assertEqual(strategy.bytes_read, 1024)
+        self.assertAlmostEqual(strategy.average_fill, 0.5)
+
+    def test_in_waiting(self):
+        strategy = serial_asyncio.InWaitingReadStrategy(max_read_size=100)
+        port = FakeSerial()
+        self.assertEqual(strategy.read_size(port), 1)
+        port.in_waiting = 42
+        self.assertEqual(strategy.read_size(port), 42)
+        port.in_waiting = 1000
+        self.assertEqual(strategy.read_size(port), 100)
+
+    def test_adaptive_grows_and_shrinks(self):
+        strategy = serial_asyncio.AdaptiveReadStrategy(max_read_size=8192, min_read_size=128, shrink_after=2)
+        port = FakeSerial()
+        self.assertEqual(strategy.read_size(port), 1024)
+        for _ in range(5):
+            size = strategy.read_size(port)
+            strategy.update(size, size)
+        self.assertEqual(strategy.read_size(port), 8192)
+        for _ in range(20):
+            strategy.update(strategy.read_size(port), 1)
+        self.assertEqual(strategy.read_size(port), 128)
+
+
+@requires_pty
+class TestReadStrategyTransport(PtyTestCase):
+
+    async def test_in_waiting_reads_everything(self):
+        transport, protocol = await self.connect(read_strategy='in_waiting')
+        os.write(self.master, b'x' * 3000)
+        await self.wait_for(lambda: len(protocol.received) >= 3000)
+        strategy = transport.get_extra_info('read_strategy')
+        self.assertIsInstance(strategy, serial_asyncio.InWaitingReadStrategy)
+        self.assertEqual(strategy.bytes_read, 3000)
+        self.assertEqual(strategy.reads, len(protocol.chunks))
+        self.assertAlmostEqual(strategy.average_fill, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,12 +2,13 @@ import unittest
 import asyncio
 import time
 
-from serial_asyncio import read_with_timeout
+from serial_asyncio import read_with_timeout, readexactly_with_timeout, readuntil_with_timeout
 
 class DummyStreamReader:
-    def __init__(self, data: bytes, delay: float = 0):
+    def __init__(self, data: bytes, delay: float = 0, chunk_size: int = None):
         self._data = data
         self._delay = delay
+        self._chunk_size = chunk_size
         self._index = 0
 
     async def read(self, n: int):
@@ -15,11 +16,22 @@ class DummyStreamReader:
             await asyncio.sleep(self._delay)
             return b''
         await asyncio.sleep(self._delay)
+        if self._chunk_size is not None:
+            n = min(n, self._chunk_size)
         chunk = self._data[self._index:self._index + n]
         self._index += n
         return chunk
 
 
+def feed_later(reader, chunks, interval):
+    """Feed chunks into a StreamReader, one every interval seconds."""
+    async def feeder():
+        for chunk in chunks:
+            await asyncio.sleep(interval)
+            reader.feed_data(chunk)
+    return asyncio.ensure_future(feeder())
+
+
 class TestReadWithTimeout(unittest.IsolatedAsyncioTestCase):
     async def test_reads_all_bytes_before_timeout(self):
         reader = DummyStreamReader(b'abcdef', delay=0)
@@ -27,7 +39,7 @@ class TestReadWithTimeout(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(result, b'abcdef')
 
     async def test_reads_partial_bytes_due_to_timeout(self):
-        reader = DummyStreamReader(b'abcdef', delay=0.01)
+        reader = DummyStreamReader(b'abcdef', delay=0.01, chunk_size=1)
         start = time.time()
         result = await read_with_timeout(reader, 6, 0.03)
         elapsed = time.time() - start
@@ -49,5 +61,124 @@ class TestReadWithTimeout(unittest.IsolatedAsyncioTestCase):
         result = await read_with_timeout(reader, 5, 0.1)
         self.assertEqual(result, b'')
 
+    async def test_returns_partial_data_at_eof(self):
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'abc')
+        reader.feed_eof()
+        result = await read_with_timeout(reader, 5, 1)
+        self.assertEqual(result, b'abc')
+
+    async def test_deadline_is_not_exceeded(self):
+        reader = asyncio.StreamReader()
+        feeder = feed_later(reader, [b'x'] * 100, 0.01)
+        start = time.monotonic()
+        result = await read_with_timeout(reader, 100, 0.1)
+        elapsed = time.monotonic() - start
+        feeder.cancel()
+        self.assertLess(len(result), 100)
+        self.assertLess(elapsed, 0.15)
+
+    async def test_throughput_buffered_64k(self):
+        reader = asyncio.StreamReader(limit=2 ** 20)
+        payload = bytes(range(256)) * 256
+        reader.feed_data(payload)
+        start = time.monotonic()
+        for _ in range(100):
+            result = await read_with_timeout(reader, len(payload), 1)
+            self.assertEqual(result, payload)
+            reader.feed_data(payload)
+        elapsed = time.monotonic() - start
+        # 100 x 64 KiB, one read per call; byte-wise reading takes seconds
+        self.assertLess(elapsed, 0.5)
+
+    async def test_throughput_streamed_64k(self):
+        reader = asyncio.StreamReader(limit=2 ** 20)
+        payload = bytes(range(256)) * 256
+        feeder = feed_later(reader, [payload[i:i + 1024] for i in range(0, len(payload), 1024)], 0)
+        start = time.monotonic()
+        result = await read_with_timeout(reader, len(payload), 1)
+        elapsed = time.monotonic() - start
+        await feeder
+        self.assertEqual(result, payload)
+        self.assertLess(elapsed, 0.5)
+
+
+class TestReadExactlyWithTimeout(unittest.IsolatedAsyncioTestCase):
+    async def test_reads_exactly(self):
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'abcdef')
+        self.assertEqual(await readexactly_with_timeout(reader, 4, 0.1), b'abcd')
+        self.assertEqual(await readexactly_with_timeout(reader, 2, 0.1), b'ef')
+
+    async def test_returns_partial_on_timeout(self):
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'abc')
+        start = time.monotonic()
+        result = await readexactly_with_timeout(reader, 6, 0.05)
+        elapsed = time.monotonic() - start
+        self.assertEqual(result, b'abc')
+        self.assertLess(elapsed, 0.1)
+        reader.feed_data(b'def')
+        self.assertEqual(await readexactly_with_timeout(reader, 3, 0.05), b'def')
+
+    async def test_returns_partial_at_eof(self):
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'ab')
+        reader.feed_eof()
+        self.assertEqual(await readexactly_with_timeout(reader, 6, 1), b'ab')
+
+    async def test_reads_again_after_timeout_without_data(self):
+        reader = asyncio.StreamReader()
+        self.assertEqual(await readexactly_with_timeout(reader, 3, 0.01), b'')
+        feeder = feed_later(reader, [b'abc'], 0.01)
+        self.assertEqual(await readexactly_with_timeout(reader, 3, 1), b'abc')
+        await feeder
+
+    async def test_throughput_64k(self):
+        reader = asyncio.StreamReader(limit=2 ** 20)
+        payload = bytes(range(256)) * 256
+        feeder = feed_later(reader, [payload[i:i + 1024] for i in range(0, len(payload), 1024)], 0)
+        start = time.monotonic()
+        result = await readexactly_with_timeout(reader, len(payload), 1)
+        elapsed = time.monotonic() - start
+        await feeder
+        self.assertEqual(result, payload)
+        self.assertLess(elapsed, 0.5)
+
+
+class TestReadUntilWithTimeout(unittest.IsolatedAsyncioTestCase):
+    async def test_reads_until_separator(self):
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'OK\r\nERROR\r\n')
+        self.assertEqual(await readuntil_with_timeout(reader, b'\r\n', 0.1), b'OK\r\n')
+        self.assertEqual(await readuntil_with_timeout(reader, b'\r\n', 0.1), b'ERROR\r\n')
+
+    async def test_returns_partial_on_timeout(self):
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'no newline')
+        start = time.monotonic()
+        result = await readuntil_with_timeout(reader, b'\n', 0.05)
+        elapsed = time.monotonic() - start
+        self.assertEqual(result, b'no newline')
+        self.assertLess(elapsed, 0.1)
+
+    async def test_returns_partial_at_eof(self):
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'tail')
+        reader.feed_eof()
+        self.assertEqual(await readuntil_with_timeout(reader, b'\n', 1), b'tail')
+
+    async def test_throughput_64k(self):
+        reader = asyncio.StreamReader(limit=2 ** 20)
+        payload = b'x' * (64 * 1024 - 1) + b'\n'
+        feeder = feed_later(reader, [payload[i:i + 1024] for i in range(0, len(payload), 1024)], 0)
+        start = time.monotonic()
+        result = await readuntil_with_timeout(reader, b'\n', 1)
+        elapsed = time.monotonic() - start
+        await feeder
+        self.assertEqual(result, payload)
+        self.assertLess(elapsed, 0.5)
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test the reconnecting transport with pty pairs behind a symlink that is
+removed and recreated, as udev does with /dev/serial/by-id links.
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+
+from serial_asyncio import _inotify
+from serial_asyncio.reconnect import create_reconnecting_connection
+from test import PtyTestCase, Recorder, open_pty_pair, requires_pty
+
+
+class EventRecorder(Recorder):
+
+    def __init__(self):
+        super().__init__()
+        self.events = []
+        self.resumed = None
+
+    def connection_made(self, transport):
+        super().connection_made(transport)
+        self.events.append('made')
+
+    def connection_interrupted(self, exc):
+        self.events.append('interrupted')
+        self.resumed = asyncio.get_event_loop().create_future()
+
+    def connection_resumed(self):
+        self.events.append('resumed')
+        self.resumed.set_result(None)
+
+    def connection_lost(self, exc):
+        self.events.append('lost')
+        super().connection_lost(exc)
+
+
+@requires_pty
+class Test_reconnect(PtyTestCase):
+
+    async def asyncSetUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.link = os.path.join(self.directory, 'ttyTEST')
+        self.master = None
+        self.plug()
+
+    async def asyncTearDown(self):
+        self.unplug()
+        shutil.rmtree(self.directory)
+
+    def plug(self):
+        self.master, port = open_pty_pair()
+        os.symlink(port.port, self.link)
+        port.close()
+
+    def unplug(self):
+        if self.master is not None:
+            os.close(self.master)
+            self.master = None
+        if os.path.lexists(self.link):
+            os.unlink(self.link)
+
+    async def open(self, **kwargs):
+        transport, protocol = await create_reconnecting_connection(
+            asyncio.get_running_loop(), EventRecorder, self.link, **kwargs)
+        await asyncio.sleep(0.01)
+        self.addAsyncCleanup(self._close, transport)
+        return transport, protocol
+
+    async def _close(self, transport):
+        transport.abort()
+        await asyncio.sleep(0.01)
+
+    async def unplug_and_wait(self, transport):
+        self.unplug()
+        while transport.is_connected():
+            await asyncio.sleep(0.005)
+
+    @unittest.skipUnless(_inotify.available(), 'inotify not available')
+    async def test_reconnects_when_device_reappears(self):
+        # The backoff alone would take seconds, inotify makes it immediate
+        transport, protocol = await self.open(initial_delay=5)
+        await self.unplug_and_wait(transport)
+        self.assertEqual(protocol.events, ['made', 'interrupted'])
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        self.plug()
+        await asyncio.wait_for(protocol.resumed, 2)
+        self.assertLess(loop.time() - start, 1)
+        self.assertEqual(transport.reconnects, 1)
+        os.write(self.master, b'back')
+        await asyncio.sleep(0.02)
+        self.assertEqual(protocol.received, b'back')
+
+    async def test_polling_and_queued_writes(self):
+        transport, protocol = await self.open(initial_delay=0.01, watch_device=False)
+        await self.unplug_and_wait(transport)
+        transport.write(b'queued ')
+        transport.write(b'data')
+        self.assertEqual(transport.get_write_buffer_size(), 11)
+        self.plug()
+        await asyncio.wait_for(protocol.resumed, 5)
+        self.assertEqual(await self.read_master(11), b'queued data')
+        self.assertEqual(protocol.events, ['made', 'interrupted', 'resumed'])
+
+    async def test_drop_policy(self):
+        transport, protocol = await self.open(initial_delay=0.01, watch_device=False, queue_policy='drop')
+        await self.unplug_and_wait(transport)
+        transport.write(b'lost')
+        self.assertEqual(transport.dropped_bytes, 4)
+        self.plug()
+        await asyncio.wait_for(protocol.resumed, 5)
+        transport.write(b'sent')
+        self.assertEqual(await self.read_master(4), b'sent')
+
+    async def test_max_queued(self):
+        transport, _ = await self.open(initial_delay=10, watch_device=False, max_queued=8)
+        await self.unplug_and_wait(transport)
+        for chunk in (b'aaaa', b'bbbb', b'cccc'):
+            transport.write(chunk)
+        self.assertEqual(transport.get_write_buffer_size(), 8)
+        self.assertEqual(transport.dropped_bytes, 4)
+
+    async def test_gives_up(self):
+        transport, protocol = await self.open(initial_delay=0.01, watch_device=False, max_attempts=2)
+        await self.unplug_and_wait(transport)
+        await asyncio.wait_for(protocol.closed.wait(), 5)
+        self.assertIsNotNone(protocol.exception)
+        self.assertTrue(transport.is_closing())
+
+    async def test_gives_up_on_other_errors(self):
+        transport, protocol = await self.open(initial_delay=0.01, watch_device=False)
+        await self.unplug_and_wait(transport)
+        # settings the reopened port rejects
+        transport._kwargs['baudrate'] = -1
+        self.plug()
+        await asyncio.wait_for(protocol.closed.wait(), 5)
+        self.assertIsInstance(protocol.exception, ValueError)
+        self.assertTrue(transport.is_closing())
+        self.assertEqual(protocol.events, ['made', 'interrupted', 'lost'])
+
+    async def test_close_while_reconnecting(self):
+        transport, protocol = await self.open(initial_delay=10)
+        await self.unplug_and_wait(transport)
+        transport.close()
+        await asyncio.wait_for(protocol.closed.wait(), 1)
+        self.assertIsNone(protocol.exception)
+        self.assertEqual(protocol.events, ['made', 'interrupted', 'lost'])
+
+    async def test_close(self):
+        transport, protocol = await self.open()
+        transport.write(b'bye')
+        transport.close()
+        await asyncio.wait_for(protocol.closed.wait(), 5)
+        self.assertIsNone(protocol.exception)
+        self.assertEqual(await self.read_master(3), b'bye')
+        self.assertEqual(protocol.events, ['made', 'lost'])
+
+
+if __name__ == '__main__':
+    unittest.main()
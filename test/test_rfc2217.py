@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test rfc2217:// ports against a local RFC 2217 stand-in server.
+"""
+
+import asyncio
+import os
+import struct
+import unittest
+
+import serial
+
+import serial_asyncio
+from serial_asyncio import rfc2217
+from serial_asyncio.rfc2217 import IAC, SB, SE, WILL, WONT, DO, DONT, COM_PORT_OPTION
+
+
+class StandInServer(asyncio.Protocol):
+    """Echoes data and confirms every com port option, byte by byte."""
+
+    def __init__(self, refuse_com_port=False, baudrate_answer=None):
+        self.refuse_com_port = refuse_com_port
+        self.baudrate_answer = baudrate_answer
+        self.transport = None
+        self.settings = []
+        self.options = []
+        self._state = 'data'
+        self._command = None
+        self._suboption = bytearray()
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        echo = bytearray()
+        for byte in data:
+            if self._state == 'data':
+                if byte == IAC:
+                    self._state = 'iac'
+                else:
+                    echo.append(byte)
+            elif self._state == 'iac':
+                if byte == IAC:
+                    echo.append(byte)
+                    self._state = 'data'
+                elif byte in (WILL, WONT, DO, DONT):
+                    self._command = byte
+                    self._state = 'option'
+                elif byte == SB:
+                    self._suboption = bytearray()
+                    self._state = 'sb'
+                else:
+                    self._state = 'data'
+            elif self._state == 'option':
+                self._state = 'data'
+                self.options.append((self._command, byte))
+                if self._command == WILL and byte == COM_PORT_OPTION:
+                    self.transport.write(bytes((IAC, DONT if self.refuse_com_port else DO, byte)))
+                elif self._command == DO:
+                    self.transport.write(bytes((IAC, WILL, byte)))
+            elif self._state == 'sb':
+                if byte == IAC:
+                    self._state = 'sb-iac'
+                else:
+                    self._suboption.append(byte)
+            elif self._state == 'sb-iac':
+                if byte == IAC:
+                    self._suboption.append(byte)
+                    self._state = 'sb'
+                else:
+                    self._state = 'data'
+                    self._com_port_option(bytes(self._suboption))
+        if echo:
+            self.transport.write(bytes(echo).replace(b'\xff', b'\xff\xff'))
+
+    def _com_port_option(self, suboption):
+        command, value = suboption[1], suboption[2:]
+        self.settings.append((command, value))
+        if command == rfc2217.SET_BAUDRATE and self.baudrate_answer is not None:
+            value = struct.pack('!I', self.baudrate_answer)
+        self.send_com_port_option(command + rfc2217.SERVER_OFFSET, value)
+
+    def send_com_port_option(self, command, value):
+        self.transport.write(bytes((IAC, SB, COM_PORT_OPTION, command)) +
+                             value.replace(b'\xff', b'\xff\xff') + bytes((IAC, SE)))
+
+
+class Collector(asyncio.Protocol):
+
+    def __init__(self):
+        self.transport = None
+        self.received = bytearray()
+        self.waiter = None
+        self.expected = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        self.received += data
+        if self.waiter is not None and len(self.received) >= self.expected and not self.waiter.done():
+            self.waiter.set_result(None)
+
+    def expect(self, n):
+        self.expected = n
+        self.waiter = asyncio.get_running_loop().create_future()
+        return self.waiter
+
+
+class FakeSocket:
+    """Accepts a fixed number of bytes per send(), at most budget in total."""
+
+    def __init__(self, accept, budget=None):
+        self.accept = accept
+        self.budget = budget
+        self.sent = bytearray()
+
+    def send(self, data):
+        n = min(self.accept, len(data))
+        if self.budget is not None:
+            n = min(n, self.budget - len(self.sent))
+        self.sent += memoryview(data)[:n]
+        return n
+
+    def close(self):
+        pass
+
+
+class Test_telnet_codec(unittest.TestCase):
+
+    def _port(self):
+        port = rfc2217.Serial()
+        port._socket = FakeSocket(0)
+        port.is_open = True
+        return port
+
+    def test_decode_split_anywhere(self):
+        port = self._port()
+        stream = (b'ab\xff\xffc' + bytes((IAC, SB, COM_PORT_OPTION, 107, 0x30, IAC, SE)) +
+                  b'd' + bytes((IAC, 241)) + b'\xff\xffe')
+        for split in range(1, len(stream)):
+            port._modemstate = 0
+            data = port._decode(stream[:split]) + port._decode(stream[split:])
+            self.assertEqual(data, b'ab\xffcd\xffe', split)
+            self.assertTrue(port.cts and port.dsr and not port.cd)
+
+    def test_plain_data_is_not_copied(self):
+        port = self._port()
+        data = b'x' * 100
+        self.assertIs(port._decode(data), data)
+
+    def test_partial_write_of_escaped_data(self):
+        port = self._port()
+        for accept in range(1, 6):
+            port._socket = FakeSocket(accept)
+            port._tx_pending.clear()
+            data = b'a\xff\xffb'
+            sent = 0
+            while sent < len(data):
+                sent += port.write(data[sent:])
+            self.assertEqual(port._socket.sent, b'a\xff\xff\xff\xffb', accept)
+
+    def test_split_iac_is_completed_without_another_write(self):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        port = self._port()
+        port._loop = loop
+        port._socket = FakeSocket(3, budget=3)
+        self.assertEqual(port.write(b'ab\xff'), 3)
+        self.assertEqual(port._socket.sent, b'ab\xff')
+        self.assertEqual(port._tx_pending, b'\xff')
+        port._socket.budget = None
+        loop.run_until_complete(asyncio.sleep(0.05))
+        self.assertEqual(port._socket.sent, b'ab\xff\xff')
+        self.assertEqual(port._tx_pending, b'')
+
+
+@unittest.skipIf(os.name != 'posix', 'rfc2217:// ports use the event loop only on POSIX')
+class Test_rfc2217(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.servers = []
+        self.server_options = {}
+        loop = asyncio.get_running_loop()
+        self.server = await loop.create_server(self._server_factory, '127.0.0.1', 0)
+        self.url = 'rfc2217://127.0.0.1:{}'.format(self.server.sockets[0].getsockname()[1])
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def _server_factory(self):
+        server = StandInServer(**self.server_options)
+        self.servers.append(server)
+        return server
+
+    async def _open(self, **kwargs):
+        transport, protocol = await serial_asyncio.create_serial_connection(
+            asyncio.get_running_loop(), Collector, self.url, **kwargs)
+        self.addAsyncCleanup(self._close, transport)
+        return transport, protocol
+
+    async def _close(self, transport):
+        if not transport.is_closing():
+            transport.abort()
+        await asyncio.sleep(0)
+
+    async def test_negotiates_settings(self):
+        transport, _ = await self._open(baudrate=115200, parity=serial.PARITY_EVEN)
+        self.assertIsInstance(transport.serial, rfc2217.Serial)
+        server, = self.servers
+        self.assertIn((WILL, COM_PORT_OPTION), server.options)
+        settings = dict(server.settings)
+        self.assertEqual(settings[rfc2217.SET_BAUDRATE], struct.pack('!I', 115200))
+        self.assertEqual(settings[rfc2217.SET_DATASIZE], b'\x08')
+        self.assertEqual(settings[rfc2217.SET_PARITY], b'\x03')
+        self.assertEqual(settings[rfc2217.SET_STOPSIZE], b'\x01')
+        self.assertEqual(settings[rfc2217.PURGE_DATA], b'\x01')
+
+    async def test_echo_with_iac_bytes(self):
+        transport, protocol = await self._open()
+        payload = bytes(range(256)) * 64
+        waiter = protocol.expect(len(payload))
+        transport.write(payload)
+        await asyncio.wait_for(waiter, 5)
+        self.assertEqual(protocol.received, payload)
+        self.assertEqual(transport.get_extra_info('stats').bytes_written, len(payload))
+
+    async def test_change_settings_while_open(self):
+        transport, _ = await self._open()
+        server, = self.servers
+        count = len(server.settings)
+        port = transport.serial
+        port.baudrate = 0x1ff  # contains an IAC byte
+        await asyncio.wait_for(port.wait_settings(), 5)
+        self.assertEqual(server.settings[count:], [(rfc2217.SET_BAUDRATE, struct.pack('!I', 0x1ff))])
+        port.timeout = 0
+        port.dtr = False
+        await asyncio.sleep(0.01)
+        self.assertEqual(server.settings[count + 1:], [(rfc2217.SET_CONTROL, bytes((rfc2217.SET_CONTROL_DTR_OFF,)))])
+
+    async def test_modem_state_notification(self):
+        transport, _ = await self._open()
+        server, = self.servers
+        self.assertFalse(transport.serial.cts)
+        server.send_com_port_option(rfc2217.NOTIFY_MODEMSTATE + rfc2217.SERVER_OFFSET,
+                                    bytes((rfc2217.MODEMSTATE_MASK_CTS | rfc2217.MODEMSTATE_MASK_CD,)))
+        await asyncio.sleep(0.01)
+        self.assertTrue(transport.serial.cts)
+        self.assertTrue(transport.serial.cd)
+        self.assertFalse(transport.serial.dsr)
+
+    async def test_refused_com_port_option(self):
+        self.server_options['refuse_com_port'] = True
+        with self.assertRaises(serial.SerialException):
+            await serial_asyncio.create_serial_connection(asyncio.get_running_loop(), Collector, self.url)
+
+    async def test_rejected_setting(self):
+        self.server_options['baudrate_answer'] = 9600
+        with self.assertRaises(serial.SerialException):
+            await serial_asyncio.create_serial_connection(
+                asyncio.get_running_loop(), Collector, self.url, baudrate=115200)
+
+
+if __name__ == '__main__':
+    unittest.main()
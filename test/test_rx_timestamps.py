@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test the receive timestamps of SerialTransport using pty pairs.
+"""
+
+import asyncio
+import os
+import time
+import unittest
+
+from test import PtyTestCase, Recorder, requires_pty
+
+
+class TimeRecorder(Recorder):
+
+    def __init__(self):
+        super().__init__()
+        self.timestamped = []
+
+    def data_received(self, data):
+        self.timestamped.append((data, time.monotonic_ns()))
+
+
+class TimedRecorder(TimeRecorder):
+
+    def timed_data_received(self, data, rx_time):
+        self.timestamped.append((data, rx_time))
+
+
+@requires_pty
+class TestRxTimestamps(PtyTestCase):
+
+    async def wait_for_chunks(self, n):
+        await self.wait_for(lambda: len(self.protocol.timestamped) >= n)
+
+    async def test_last_rx_time(self):
+        await self.connect(TimeRecorder)
+        self.assertIsNone(self.transport.get_extra_info('last_rx_time'))
+        before = time.monotonic_ns()
+        os.write(self.master, b'abc')
+        await self.wait_for_chunks(1)
+        (data, delivered), = self.protocol.timestamped
+        self.assertEqual(data, b'abc')
+        rx_time = self.transport.get_extra_info('last_rx_time')
+        self.assertLessEqual(before, rx_time)
+        self.assertLessEqual(rx_time, delivered)
+
+    async def test_timed_data_received(self):
+        await self.connect(TimedRecorder)
+        times = []
+        for chunk in (b'a', b'b'):
+            before = time.monotonic_ns()
+            os.write(self.master, chunk)
+            await self.wait_for_chunks(len(times) + 1)
+            data, rx_time = self.protocol.timestamped[-1]
+            self.assertEqual(data, chunk)
+            self.assertLessEqual(before, rx_time)
+            times.append(rx_time)
+        self.assertLess(times[0], times[1])
+        self.assertEqual(self.transport.get_extra_info('last_rx_time'), times[1])
+
+    async def test_batches_carry_time_of_first_chunk(self):
+        await self.connect(TimedRecorder, batch_latency=0.05)
+        before = time.monotonic_ns()
+        os.write(self.master, b'a')
+        await asyncio.sleep(0.01)
+        second = time.monotonic_ns()
+        os.write(self.master, b'b')
+        await self.wait_for_chunks(1)
+        (data, rx_time), = self.protocol.timestamped
+        self.assertEqual(data, b'ab')
+        self.assertLessEqual(before, rx_time)
+        self.assertLess(rx_time, second)
+        self.assertGreater(self.transport.get_extra_info('last_rx_time'), second)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test the TCP fan-out server using pty pairs.
+"""
+
+import asyncio
+import os
+import unittest
+
+from serial_asyncio import server as fanout
+from test import PtyTestCase, requires_pty
+
+
+class FakeTransport:
+
+    def __init__(self):
+        self.written = []
+        self.aborted = False
+
+    def write(self, data):
+        self.written.append(data)
+
+    def is_closing(self):
+        return self.aborted
+
+    def abort(self):
+        self.aborted = True
+
+
+class FakeServer:
+
+    def __init__(self, drop_policy, client_buffer_size=10):
+        self.drop_policy = drop_policy
+        self.client_buffer_size = client_buffer_size
+
+
+class Test_client_queue(unittest.TestCase):
+
+    def _client(self, drop_policy):
+        client = fanout.FanoutClient(FakeServer(drop_policy))
+        client.transport = FakeTransport()
+        client.pause_writing()
+        return client
+
+    def test_queue_shares_chunks(self):
+        client = self._client('disconnect')
+        chunk = b'abcd'
+        client.send(chunk)
+        client.send(chunk)
+        self.assertEqual(client.get_queued_size(), 8)
+        client.resume_writing()
+        self.assertIs(client.transport.written[0], chunk)
+        self.assertIs(client.transport.written[1], chunk)
+        self.assertEqual(client.bytes_sent, 8)
+
+    def test_disconnect(self):
+        client = self._client('disconnect')
+        for chunk in (b'aaaa', b'bbbb', b'cccc'):
+            client.send(chunk)
+        self.assertTrue(client.transport.aborted)
+        self.assertEqual(client.bytes_dropped, 12)
+
+    def test_drop_oldest(self):
+        client = self._client('drop-oldest')
+        for chunk in (b'aaaa', b'bbbb', b'cccc'):
+            client.send(chunk)
+        client.resume_writing()
+        self.assertEqual(client.transport.written, [b'bbbb', b'cccc'])
+        self.assertEqual(client.bytes_dropped, 4)
+
+    def test_drop_newest(self):
+        client = self._client('drop-newest')
+        for chunk in (b'aaaa', b'bbbb', b'cccc'):
+            client.send(chunk)
+        client.resume_writing()
+        self.assertEqual(client.transport.written, [b'aaaa', b'bbbb'])
+        self.assertEqual(client.bytes_dropped, 4)
+
+    def test_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            fanout.FanoutServer(None, drop_policy='keep')
+
+
+@requires_pty
+class Test_fanout_server(PtyTestCase):
+
+    async def start(self, **kwargs):
+        self.master, port = self.open_pty()
+        self.server = await fanout.start_server(port.port, **kwargs)
+        port.close()
+        self.address = self.server.sockets[0].getsockname()
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await asyncio.wait_for(self.server.wait_closed(), 5)
+
+    async def connect(self, count):
+        streams = [await asyncio.open_connection(*self.address) for _ in range(count)]
+        while len(self.server.clients) < count:
+            await asyncio.sleep(0.001)
+        self.addAsyncCleanup(self._close_streams, streams)
+        return streams
+
+    async def _close_streams(self, streams):
+        for _, writer in streams:
+            writer.close()
+
+    async def test_broadcast(self):
+        await self.start()
+        streams = await self.connect(3)
+        os.write(self.master, b'hello all\n')
+        for reader, _ in streams:
+            self.assertEqual(await asyncio.wait_for(reader.readline(), 5), b'hello all\n')
+
+    async def test_clients_write_to_port(self):
+        await self.start()
+        (_, first), (_, second) = await self.connect(2)
+        first.write(b'one\n')
+        await first.drain()
+        self.assertEqual(await self.read_master(4), b'one\n')
+        second.write(b'two\n')
+        await second.drain()
+        self.assertEqual(await self.read_master(4), b'two\n')
+
+    async def test_first_client_writes_only(self):
+        await self.start(write_policy='first')
+        (_, first), (_, second) = await self.connect(2)
+        second.write(b'ignored\n')
+        await second.drain()
+        await asyncio.sleep(0.02)
+        first.write(b'first\n')
+        await first.drain()
+        self.assertEqual(await self.read_master(6), b'first\n')
+        self.assertEqual(self.server.clients[1].bytes_rejected, 8)
+
+    async def test_max_clients(self):
+        await self.start(max_clients=1)
+        await self.connect(1)
+        reader, writer = await asyncio.open_connection(*self.address)
+        self.assertEqual(await asyncio.wait_for(reader.read(), 5), b'')
+        writer.close()
+        self.assertEqual(len(self.server.clients), 1)
+
+    async def test_close_disconnects_clients(self):
+        await self.start()
+        (reader, _), = await self.connect(1)
+        self.server.close()
+        await asyncio.wait_for(self.server.wait_closed(), 5)
+        self.assertEqual(await asyncio.wait_for(reader.read(), 5), b'')
+        self.assertIsNone(self.server.exception)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test socket:// ports against a local asyncio echo server.
+"""
+
+import asyncio
+import os
+import socket
+import unittest
+
+import serial
+
+import serial_asyncio
+
+
+class Collector(asyncio.Protocol):
+
+    def __init__(self):
+        self.transport = None
+        self.received = bytearray()
+        self.lost = None
+        self.waiter = None
+        self.expected = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        self.received += data
+        if self.waiter is not None and len(self.received) >= self.expected and not self.waiter.done():
+            self.waiter.set_result(None)
+
+    def connection_lost(self, exc):
+        self.lost = exc
+
+    def expect(self, n):
+        self.expected = n
+        self.waiter = asyncio.get_running_loop().create_future()
+        return self.waiter
+
+
+@unittest.skipIf(os.name != 'posix', 'socket:// ports use the event loop only on POSIX')
+class Test_socket_transport(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.connections = 0
+        self.writers = []
+        self.server = await asyncio.start_server(self._echo, '127.0.0.1', 0)
+        self.url = 'socket://127.0.0.1:{}'.format(self.server.sockets[0].getsockname()[1])
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _echo(self, reader, writer):
+        self.connections += 1
+        self.writers.append(writer)
+        while True:
+            data = await reader.read(4096)
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+        writer.close()
+
+    async def _open(self, url=None):
+        transport, protocol = await serial_asyncio.create_serial_connection(
+            asyncio.get_running_loop(), Collector, url or self.url)
+        self.addAsyncCleanup(self._close, transport)
+        return transport, protocol
+
+    async def _close(self, transport):
+        if not transport.is_closing():
+            transport.abort()
+        await asyncio.sleep(0)
+
+    async def test_connects_once_and_echoes(self):
+        transport, protocol = await self._open()
+        self.assertIsInstance(transport, serial_asyncio.SerialTransport)
+        waiter = protocol.expect(11)
+        transport.write(b'hello world')
+        await asyncio.wait_for(waiter, 5)
+        self.assertEqual(protocol.received, b'hello world')
+        self.assertEqual(self.connections, 1)
+
+    async def test_serial_transport_api(self):
+        transport, protocol = await self._open()
+        port = transport.serial
+        self.assertIs(transport.get_extra_info('serial'), port)
+        self.assertTrue(port.is_open)
+        self.assertEqual(port.port, self.url)
+        transport.write(b'x' * 1000)
+        transport.flush()
+        waiter = protocol.expect(1000)
+        await asyncio.wait_for(waiter, 5)
+        transport.close()
+        await asyncio.sleep(0.01)
+        self.assertIsNone(protocol.lost)
+        self.assertFalse(port.is_open)
+
+    async def test_socket_options(self):
+        transport, _ = await self._open(self.url + '?keepalive=30,5,4')
+        sock = transport.serial._socket
+        self.assertTrue(sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY))
+        self.assertTrue(sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE))
+        if hasattr(socket, 'TCP_KEEPIDLE'):
+            self.assertEqual(sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE), 30)
+        if hasattr(socket, 'TCP_KEEPINTVL'):
+            self.assertEqual(sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL), 5)
+        if hasattr(socket, 'TCP_KEEPCNT'):
+            self.assertEqual(sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT), 4)
+
+    async def test_nodelay_off(self):
+        transport, _ = await self._open(self.url + '?nodelay=0')
+        sock = transport.serial._socket
+        self.assertFalse(sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY))
+        self.assertFalse(sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE))
+
+    async def test_connection_refused(self):
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        url = 'socket://127.0.0.1:{}'.format(sock.getsockname()[1])
+        sock.close()
+        with self.assertRaises(serial.SerialException):
+            await serial_asyncio.create_serial_connection(asyncio.get_running_loop(), Collector, url)
+
+    async def test_server_closes(self):
+        transport, protocol = await self._open()
+        await asyncio.sleep(0.01)
+        for writer in self.writers:
+            writer.close()
+        await asyncio.sleep(0.05)
+        self.assertTrue(transport.is_closing())
+        self.assertIsInstance(protocol.lost, serial.SerialException)
+
+
+if __name__ == '__main__':
+    unittest.main()
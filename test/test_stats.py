@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test the performance counters of SerialTransport using pty pairs.
+"""
+
+import asyncio
+import os
+import unittest
+
+import serial_asyncio
+from test import PtyTestCase, requires_pty
+
+
+class TestTransportStats(unittest.TestCase):
+
+    def test_histogram(self):
+        stats = serial_asyncio.TransportStats()
+        stats.add_data_received_duration(1000)          # 1 us
+        stats.add_data_received_duration(2000000)       # 2 ms
+        stats.add_data_received_duration(10 ** 10)      # 10 s
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot['data_received_count'], 3)
+        buckets = snapshot['data_received_buckets']
+        self.assertEqual(buckets[1e-5], 1)
+        self.assertEqual(buckets[1e-3], 1)
+        self.assertEqual(buckets[5e-3], 2)
+        self.assertEqual(buckets[float('inf')], 3)
+
+    def test_paused_time(self):
+        stats = serial_asyncio.TransportStats()
+        stats.paused()
+        self.assertGreaterEqual(stats.snapshot()['paused_time'], 0)
+        stats.resumed()
+        self.assertEqual(stats.pause_writing, 1)
+        self.assertEqual(stats.resume_writing, 1)
+        self.assertIsNone(stats.paused_since)
+
+
+@requires_pty
+class TestTransportStatsPty(PtyTestCase):
+
+    async def asyncSetUp(self):
+        await self.connect()
+        self.stats = self.transport.get_extra_info('stats')
+
+    async def test_read_counters(self):
+        os.write(self.master, b'x' * 100)
+        await self.wait_for(lambda: len(self.protocol.received) >= 100)
+        snapshot = self.stats.snapshot()
+        self.assertEqual(snapshot['bytes_read'], 100)
+        self.assertGreaterEqual(snapshot['read_calls'], 1)
+        self.assertEqual(snapshot['data_received_count'], snapshot['read_calls'])
+
+    async def test_write_counters(self):
+        self.transport.set_write_buffer_limits(high=4096)
+        payload = b'y' * 65536
+        for _ in range(8):
+            self.transport.write(payload)
+        snapshot = self.stats.snapshot()
+        self.assertEqual(snapshot['pause_writing'], 1)
+        self.assertGreater(snapshot['peak_write_buffer_size'], 4096)
+        self.assertGreaterEqual(snapshot['partial_writes'], 1)
+
+        self.assertEqual(len(await self.read_master(len(payload) * 8)), len(payload) * 8)
+        await asyncio.sleep(0.01)
+        snapshot = self.stats.snapshot()
+        self.assertEqual(snapshot['bytes_written'], len(payload) * 8)
+        self.assertEqual(snapshot['resume_writing'], 1)
+        self.assertGreater(snapshot['paused_time'], 0)
+        self.assertGreaterEqual(snapshot['write_calls'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test the write buffer of SerialTransport against a pseudo terminal pair.
+"""
+
+import asyncio
+import unittest
+
+from test import PtyTestCase, requires_pty
+
+
+@requires_pty
+class TestWriteBuffer(PtyTestCase):
+
+    async def asyncSetUp(self):
+        await self.connect()
+
+    def fill_port(self):
+        """Write until the pty stops accepting data, return the amount written."""
+        self.transport.set_write_buffer_limits(high=2 ** 30)
+        block = b'\0' * 65536
+        written = 0
+        while not self.transport.get_write_buffer_size():
+            self.transport.write(block)
+            written += len(block)
+        return written
+
+    async def test_eager_write_skips_writer(self):
+        self.transport.write(b'abc')
+        self.assertEqual(self.transport.get_write_buffer_size(), 0)
+        self.assertFalse(self.transport._has_writer)
+        self.assertEqual(await self.read_master(3), b'abc')
+
+    async def test_buffer_size_is_tracked(self):
+        written = self.fill_port()
+        self.assertTrue(self.transport._has_writer)
+        queued = self.transport.get_write_buffer_size()
+        self.transport.write(b'abc')
+        self.transport.write(bytearray(b'defg'))
+        self.transport.write(memoryview(b'hi'))
+        self.transport.write(b'')
+        self.assertEqual(self.transport.get_write_buffer_size(), queued + 9)
+        data = await self.read_master(written + 9)
+        self.assertTrue(data.endswith(b'\0abcdefghi'))
+        self.assertEqual(self.transport.get_write_buffer_size(), 0)
+
+    async def test_mutable_buffers_are_copied(self):
+        written = self.fill_port()
+        data = bytearray(b'1234')
+        self.transport.write(data)
+        data[:] = b'xxxx'
+        self.assertTrue((await self.read_master(written + 4)).endswith(b'\0' + b'1234'))
+
+    async def test_rejects_non_bytes(self):
+        with self.assertRaises(TypeError):
+            self.transport.write('text')
+
+    async def test_partial_writes_keep_order(self):
+        self.transport.set_write_buffer_limits(high=1024)
+        chunks = [bytes([i % 256]) * 1000 for i in range(200)]
+        for chunk in chunks:
+            self.transport.write(chunk)
+        self.assertGreater(self.transport.get_write_buffer_size(), 0)
+        self.assertEqual(self.protocol.actions, ['pause'])
+        self.assertEqual(await self.read_master(200000, timeout=10.0), b''.join(chunks))
+        await asyncio.sleep(0.01)
+        self.assertEqual(self.transport.get_write_buffer_size(), 0)
+        self.assertEqual(self.protocol.actions, ['pause', 'resume'])
+
+    async def test_flush_resets_buffer(self):
+        self.transport.write(b'x' * 100)
+        self.transport.flush()
+        self.assertEqual(self.transport.get_write_buffer_size(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
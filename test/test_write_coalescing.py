@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test cork()/uncork() and the coalescing window of SerialTransport using pty pairs.
+"""
+
+import asyncio
+import os
+import unittest
+
+from test import PtyTestCase, requires_pty
+
+
+@requires_pty
+class TestWriteCoalescing(PtyTestCase):
+
+    async def connect(self, **kwargs):
+        await super().connect(**kwargs)
+        self.stats = self.transport.get_extra_info('stats')
+
+    def read_available(self):
+        try:
+            return os.read(self.master, 65536)
+        except BlockingIOError:
+            return b''
+
+    async def test_cork(self):
+        await self.connect()
+        self.transport.cork()
+        self.assertTrue(self.transport.is_corked())
+        for i in range(10):
+            self.transport.write(bytes([0x30 + i]))
+        await asyncio.sleep(0.01)
+        self.assertEqual(self.read_available(), b'')
+        self.assertEqual(self.transport.get_write_buffer_size(), 10)
+        self.assertEqual(self.stats.write_calls, 0)
+
+        self.transport.uncork()
+        self.assertFalse(self.transport.is_corked())
+        self.assertEqual(self.transport.get_write_buffer_size(), 0)
+        self.assertEqual(self.read_available(), b'0123456789')
+        self.assertEqual(self.stats.write_calls, 1)
+        self.assertEqual(self.stats.coalesced_writes, 10)
+        self.assertEqual(self.stats.coalesced_flushes, 1)
+
+        # uncorked writes go out right away again
+        self.transport.write(b'x')
+        self.assertEqual(self.read_available(), b'x')
+        self.assertEqual(self.stats.write_calls, 2)
+
+    async def test_cork_while_sending(self):
+        await self.connect()
+        payload = bytes(range(256)) * 800
+        self.transport.write(payload)
+        self.assertGreater(self.transport.get_write_buffer_size(), 0)
+        self.transport.cork()
+        self.transport.write(b'CORKED')
+        self.transport.write(b'URGENT', priority=1)
+        # The data written before cork() still goes out, the rest waits
+        received = b''
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + 5
+        while len(received) < len(payload) and loop.time() < deadline:
+            received += self.read_available()
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.01)
+        received += self.read_available()
+        self.assertEqual(received, payload)
+        self.assertTrue(self.transport.is_corked())
+        self.assertEqual(self.transport.get_write_buffer_size(), 12)
+
+        self.transport.uncork()
+        self.assertEqual(self.read_available(), b'URGENTCORKED')
+        self.assertEqual(self.transport.get_write_buffer_size(), 0)
+
+    async def test_coalescing_window(self):
+        await self.connect(coalesce_window=0.005)
+        for _ in range(3):
+            for i in range(20):
+                self.transport.write(b'ab')
+            self.assertEqual(self.read_available(), b'')
+            await asyncio.sleep(0.05)
+            self.assertEqual(self.read_available(), b'ab' * 20)
+        self.assertEqual(self.stats.write_calls, 3)
+        self.assertEqual(self.stats.coalesced_writes, 60)
+        self.assertEqual(self.stats.coalesced_flushes, 3)
+
+    async def test_uncork_ends_window(self):
+        await self.connect(coalesce_window=10)
+        self.transport.cork()
+        self.transport.write(b'abc')
+        self.transport.uncork()
+        self.assertEqual(self.read_available(), b'abc')
+
+    async def test_close_sends_held_data(self):
+        await self.connect(coalesce_window=10)
+        self.transport.cork()
+        self.transport.write(b'abc')
+        self.transport.close()
+        await asyncio.wait_for(self.protocol.closed.wait(), 2)
+        self.assertEqual(self.read_available(), b'abc')
+
+    async def test_flush_discards_held_data(self):
+        await self.connect(coalesce_window=0.001)
+        self.transport.write(b'abc')
+        self.transport.flush()
+        await asyncio.sleep(0.01)
+        self.assertEqual(self.read_available(), b'')
+        self.assertEqual(self.stats.coalesced_flushes, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test write pacing of SerialTransport.
+"""
+
+import asyncio
+import time
+import unittest
+
+import serial
+
+import serial_asyncio
+from test import PtyTestCase, Recorder, requires_pty
+
+
+class FakeSerial:
+    baudrate = 9600
+    bytesize = 8
+    parity = serial.PARITY_NONE
+    stopbits = 1
+    out_waiting = 0
+
+
+class TestWritePacer(unittest.TestCase):
+
+    def test_max_out_waiting(self):
+        pacer = serial_asyncio.WritePacer(max_out_waiting=100)
+        port = FakeSerial()
+        self.assertEqual(pacer.allowance(port), 100)
+        port.out_waiting = 150
+        self.assertEqual(pacer.allowance(port), 0)
+        self.assertAlmostEqual(pacer.delay(port), 51 * 10 / 9600)
+
+    def test_token_bucket(self):
+        pacer = serial_asyncio.WritePacer(rate='baudrate', burst=50)
+        port = FakeSerial()
+        self.assertEqual(pacer.allowance(port), 50)
+        pacer.consumed(50)
+        self.assertEqual(pacer.allowance(port), 0)
+        self.assertGreater(pacer.delay(port), 0)
+        self.assertLessEqual(pacer.delay(port), 10 / 9600)
+
+    def test_unlimited(self):
+        self.assertIsNone(serial_asyncio.WritePacer().allowance(FakeSerial()))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            serial_asyncio.WritePacer(max_out_waiting=0)
+        with self.assertRaises(ValueError):
+            serial_asyncio.WritePacer(rate=-1)
+
+
+class TestWritePacingTransport(PtyTestCase):
+
+    async def test_driver_queue_is_capped(self):
+        loop = asyncio.get_running_loop()
+        transport, protocol = await serial_asyncio.create_serial_connection(
+            loop, Recorder, 'loop://', write_pacer=serial_asyncio.WritePacer(max_out_waiting=100))
+        await asyncio.sleep(0)
+        transport.pause_reading()
+        transport.write(b'x' * 1000)
+        await asyncio.sleep(0.05)
+        self.assertEqual(transport.serial.out_waiting, 100)
+        self.assertEqual(transport.get_write_buffer_size(), 900)
+        transport.flush()
+        transport.resume_reading()
+        await asyncio.sleep(0.05)
+        self.assertEqual(len(protocol.received), 100)
+        transport.abort()
+        await asyncio.sleep(0.01)
+
+    @requires_pty
+    async def test_rate_follows_baudrate(self):
+        transport, _ = await self.connect(settings={'baudrate': 9600},
+                                          write_pacer=serial_asyncio.WritePacer(rate='baudrate', burst=96))
+        start = time.monotonic()
+        transport.write(b'y' * 384)
+        self.assertEqual(transport.get_write_buffer_size(), 384 - 96)
+        self.assertEqual(len(await self.read_master(384)), 384)
+        elapsed = time.monotonic() - start
+        # 288 bytes beyond the burst at 960 bytes per second
+        self.assertGreater(elapsed, 0.25)
+        self.assertLess(elapsed, 1.0)
+        # the pacer cut the writes short, the pty accepted all it was offered
+        self.assertEqual(transport.get_extra_info('stats').partial_writes, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
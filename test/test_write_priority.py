@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial-asyncio - Cross platform serial port support for Python
+# (C) 2016 pySerial-team
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test priority writes of SerialTransport using pty pairs.
+"""
+
+import asyncio
+import time
+import unittest
+
+import serial_asyncio
+from test import PtyTestCase, requires_pty
+
+
+class Writer(asyncio.Protocol):
+
+    def __init__(self):
+        self.can_write = None
+
+    def pause_writing(self):
+        self.can_write = asyncio.get_event_loop().create_future()
+
+    def resume_writing(self):
+        self.can_write.set_result(None)
+        self.can_write = None
+
+
+@requires_pty
+class TestWritePriority(PtyTestCase):
+
+    async def connect(self, **kwargs):
+        await super().connect(Writer, settings={'baudrate': 115200}, **kwargs)
+
+    async def test_urgent_data_overtakes_queued_data(self):
+        await self.connect(write_pacer=serial_asyncio.WritePacer(rate=1000000, burst=100))
+        # the first chunk partially goes out right away, the rest is queued
+        self.transport.write(b'a' * 1000)
+        self.transport.write(b'b' * 1000)
+        self.transport.write(b'URGENT', priority=1)
+        self.transport.write(b'!', priority=2)
+        self.assertEqual(self.transport.get_write_buffer_size(), 2007 - 100)
+        data = await self.read_master(2007)
+        # the partially written chunk is completed first
+        self.assertEqual(data, b'a' * 1000 + b'!' + b'URGENT' + b'b' * 1000)
+        self.assertEqual(self.transport.get_write_buffer_size(), 0)
+
+    async def test_flow_control_counts_all_lanes(self):
+        await self.connect(write_pacer=serial_asyncio.WritePacer(rate=1000000, burst=1))
+        self.transport.set_write_buffer_limits(high=1000)
+        self.transport.write(b'x' * 600)
+        self.assertIsNone(self.protocol.can_write)
+        self.transport.write(b'y' * 600, priority=5)
+        self.assertIsNotNone(self.protocol.can_write)
+        self.assertEqual(len(await self.read_master(1200)), 1200)
+        await asyncio.sleep(0.01)
+        self.assertIsNone(self.protocol.can_write)
+
+    async def test_urgent_latency_under_saturated_bulk_lane(self):
+        # a 10 KiB/s link saturated by 50 KiB of bulk data in 256 byte blocks
+        await self.connect(write_pacer=serial_asyncio.WritePacer(rate=10240, burst=256))
+        self.transport.set_write_buffer_limits(high=2 ** 20)
+        for _ in range(200):
+            self.transport.write(b'b' * 256)
+        await asyncio.sleep(0.1)
+
+        start = time.monotonic()
+        self.transport.write(b'\x02CMD\x03', priority=1)
+        received = bytearray()
+        while b'\x02CMD\x03' not in received:
+            received += await self.read_master(1, timeout=1.0)
+            self.assertLess(time.monotonic() - start, 1.0)
+        latency = time.monotonic() - start
+        # the bulk lane would take about 5 s, the command waits for one block at most
+        self.assertLess(latency, 0.1)
+        self.assertGreater(self.transport.get_write_buffer_size(), 30000)
+
+
+if __name__ == '__main__':
+    unittest.main()